@@ -5,6 +5,8 @@ from collections import deque
 import matplotlib.pyplot as plt
 import tensorflow as tf
 from envs.aquaculture_env import AquacultureEnv
+from envs.action_mask import ActionPruner
+from utils.profiler import StageProfiler
 
 class DiscretizedDynaQAgent:
     def __init__(
@@ -20,7 +22,11 @@ class DiscretizedDynaQAgent:
         exploration_initial_eps=1.0,
         exploration_final_eps=0.01,
         exploration_fraction=0.2,
-        total_timesteps=300 * 180
+        total_timesteps=300 * 180,
+        profile=False,
+        q_dtype=np.float64,
+        prune_actions=False,
+        prune_feed=False
     ):
         self.env = env
         self.alpha = alpha
@@ -41,6 +47,9 @@ class DiscretizedDynaQAgent:
         self.epsilon = exploration_initial_eps
         self.global_step = 0
 
+        # Opt-in timing of the train loop phases
+        self.profiler = StageProfiler(["act", "env", "update", "replay", "planning"]) if profile else None
+
         # Discretize action space
         self.feed_bins = 40
         self.temp_bins = 16
@@ -52,7 +61,9 @@ class DiscretizedDynaQAgent:
             for air in np.linspace(env.action_space.low[2], env.action_space.high[2], self.air_bins)
         ]
 
-        self.q_table = defaultdict(lambda: np.zeros(len(self.action_space)))
+        # Q rows are dense over the 6400 actions; float32 rows halve the table's memory
+        self.q_dtype = np.dtype(q_dtype)
+        self.q_table = defaultdict(lambda: np.zeros(len(self.action_space), dtype=self.q_dtype))
         self.model = {}
 
         self.obs_space_low = env.observation_space.low
@@ -62,16 +73,39 @@ class DiscretizedDynaQAgent:
             for i in range(env.observation_space.shape[0])
         ]
 
+        # Opt-in restriction of exploration, argmax and TD targets to non-dominated actions
+        self.pruner = None
+        if prune_actions:
+            self.pruner = ActionPruner(
+                self.action_space, prune_setpoints=getattr(env, "substeps", 1) == 1, prune_feed=prune_feed
+            )
+            # Lowest tank temperature (°C) of each temperature bin of the state; the small margin
+            # covers float32 rounding of the observation, so a setpoint is only pruned when it is safe
+            T_low, T_high = float(env.obs_low[2]), float(env.obs_high[2])
+            edges = np.concatenate([[-np.inf], self.obs_space_bins[2]])
+            self.allowed_by_temp_bin = [self.pruner.surviving(T_low + e * (T_high - T_low) - 1e-3) for e in edges]
+
     def discretize_obs(self, obs):
         return tuple(int(np.digitize(obs[i], self.obs_space_bins[i])) for i in range(len(obs)))
 
+    def allowed_actions(self, state):
+        return self.allowed_by_temp_bin[state[2]]
+
     def choose_action(self, state):
+        if self.pruner is not None:
+            allowed = self.allowed_actions(state)
+            if random.random() < self.epsilon:
+                return int(allowed[random.randrange(len(allowed))])
+            return int(allowed[np.argmax(self.q_table[state][allowed])])
         if random.random() < self.epsilon:
             return random.randint(0, len(self.action_space) - 1)
         return np.argmax(self.q_table[state])
 
     def update_q(self, state, action_idx, reward, next_state):
-        best_next = np.max(self.q_table[next_state])
+        if self.pruner is not None:
+            best_next = np.max(self.q_table[next_state][self.allowed_actions(next_state)])
+        else:
+            best_next = np.max(self.q_table[next_state])
         td_target = reward + self.gamma * best_next
         self.q_table[state][action_idx] += self.alpha * (td_target - self.q_table[state][action_idx])
 
@@ -102,18 +136,31 @@ class DiscretizedDynaQAgent:
             done = False
             truncated = False
 
+            prof = self.profiler
             while not (done or truncated):
+                if prof is not None:
+                    t = prof.start()
                 action_idx = self.choose_action(state)
                 action = np.array(self.action_space[action_idx], dtype=np.float32)
+                if prof is not None:
+                    t = prof.lap("act", t)
                 next_obs, reward, done, truncated, _ = self.env.step(action)
                 next_state = self.discretize_obs(next_obs)
+                if prof is not None:
+                    t = prof.lap("env", t)
 
                 self.update_q(state, action_idx, reward, next_state)
                 self.learn_model(state, action_idx, reward, next_state)
                 self.experience_buffer.append((state, action_idx, reward, next_state))
+                if prof is not None:
+                    t = prof.lap("update", t)
                 if self.global_step % self.replay_freq == 0:
                     self.sample_and_update()
+                if prof is not None:
+                    t = prof.lap("replay", t)
                 self.planning()
+                if prof is not None:
+                    prof.lap("planning", t)
 
                 state = next_state
                 total_reward += reward
@@ -133,12 +180,19 @@ class DiscretizedDynaQAgent:
             print(f"\nTotal Cumulative Reward after {episodes} Episodes: {sum(rewards):.2f}")
             print(f"Average Reward per Episode: {np.mean(rewards):.2f}")
             print(f"Reward Variation (Std Dev): {np.std(rewards):.2f}")
+            if self.profiler is not None:
+                print(self.profiler.summary())
 
         if plot:
             self.plot_rewards(rewards)
 
         return rewards
 
+    def get_profile_stats(self):
+        if self.profiler is None:
+            return {}
+        return self.profiler.stats()
+
     def plot_rewards(self, rewards):
         region_name = getattr(self.env, "region", "unknown").capitalize()
         plt.figure(figsize=(10, 5))
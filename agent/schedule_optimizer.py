@@ -0,0 +1,130 @@
+import time
+import numpy as np
+
+from envs.differentiable_simulator import DifferentiableSimulator
+
+
+class ScheduleOptimizer:
+    """
+    Open-loop optimization of the remaining feed/temperature/aeration
+    schedule by projected Adam on DifferentiableSimulator gradients.
+
+    The schedule is optimized in coordinates scaled to [0, 1] per action
+    dimension, and every step is projected back onto the action bounds.
+    The schedule that scored best on the exact (non-smoothed) dynamics is
+    kept, and `predict` replays it day by day.
+
+    By default the plan uses the region's mean seasonal temperature. With
+    `weather_samples` > 0 it maximizes the mean profit over that many
+    sampled traces (seasonal curve plus the env's N(0, 1) daily noise),
+    drawn from `seed`. `weather="oracle"` plans on the episode's actual
+    trace. That is an upper bound with perfect weather foresight, not a
+    policy an agent could run.
+    """
+
+    def __init__(
+        self,
+        env,
+        iterations=200,
+        lr=0.05,
+        betas=(0.9, 0.999),
+        heat_sharpness=4.0,
+        heater_sharpness=4.0,
+        time_budget=None,
+        weather="seasonal",
+        weather_samples=0,
+        seed=None,
+        verbose=False
+    ):
+        if weather_samples and not (isinstance(weather, str) and weather == "seasonal"):
+            raise ValueError("weather_samples perturbs the seasonal curve; use it with weather='seasonal'")
+        self.env = env
+        self.iterations = iterations
+        self.lr = lr
+        self.betas = betas
+        self.time_budget = time_budget  # seconds per optimize() call; None means no limit
+        self.verbose = verbose
+        self.weather_samples = weather_samples
+        self.rng = np.random.default_rng(seed)
+        self.sim = DifferentiableSimulator(env, heat_sharpness, heater_sharpness, weather=weather)
+        self.traces = None
+        self.low = self.sim.action_low
+        self.high = self.sim.action_high
+        self.schedule = None
+        self.start_day = 0
+        self._last_day = -1
+        self.history = []
+
+    def _evaluate(self, schedule, grad=False):
+        # Exact profit, or smoothed profit and gradient, averaged over the planning traces
+        if self.traces is None:
+            if grad:
+                return self.sim.profit_and_grad(schedule)
+            return self.sim.simulate(schedule, smooth=False).sum()
+        results = []
+        for trace in self.traces:
+            self.sim.ambient = trace
+            results.append(self.sim.profit_and_grad(schedule) if grad
+                           else self.sim.simulate(schedule, smooth=False).sum())
+        if grad:
+            return np.mean([r[0] for r in results]), np.mean([r[1] for r in results], axis=0)
+        return float(np.mean(results))
+
+    def optimize(self, initial=None):
+        """
+        Optimize from the env's current state. `initial` is an (H, 3) schedule
+        or a single action repeated; the default is the middle of the action box.
+        Returns the best schedule found, shape (H, 3).
+        """
+        start = time.perf_counter()
+        self.sim.load_env_state()
+        H = self.sim.horizon
+        if self.weather_samples:
+            # Same daily noise as TemperatureModel.generate_ambient_trace
+            self.traces = self.sim.ambient + self.rng.normal(0, 1, size=(self.weather_samples, H))
+        scale = self.high - self.low
+        if initial is None:
+            initial = (self.low + self.high) / 2
+        x = (np.broadcast_to(np.asarray(initial, dtype=np.float64), (H, 3)) - self.low) / scale
+        x = np.clip(x, 0.0, 1.0)
+
+        m = np.zeros_like(x)
+        v = np.zeros_like(x)
+        b1, b2 = self.betas
+        best_profit, best_x = -np.inf, x.copy()
+        self.history = []
+        for it in range(1, self.iterations + 1):
+            schedule = self.low + x * scale
+            exact = self._evaluate(schedule)
+            if exact > best_profit:
+                best_profit, best_x = exact, x.copy()
+            profit, grad = self._evaluate(schedule, grad=True)
+            self.history.append(exact)
+
+            # Gradient ascent in scaled coordinates, then projection onto the box
+            g = grad * scale
+            m = b1 * m + (1 - b1) * g
+            v = b2 * v + (1 - b2) * g * g
+            step = self.lr * (m / (1 - b1**it)) / (np.sqrt(v / (1 - b2**it)) + 1e-8)
+            x = np.clip(x + step, 0.0, 1.0)
+
+            if self.verbose and it % 20 == 0:
+                print(f"iter {it}: profit {exact:.2f} (smoothed {profit:.2f}), best {best_profit:.2f}")
+            if self.time_budget is not None and time.perf_counter() - start >= self.time_budget:
+                break
+
+        exact = self._evaluate(self.low + x * scale)
+        if exact > best_profit:
+            best_profit, best_x = exact, x
+        self.schedule = self.low + best_x * scale
+        self.start_day = self.sim.day
+        self.best_profit = float(best_profit)
+        return self.schedule
+
+    def predict(self, observation=None, state=None, episode_start=None, deterministic=True):
+        # Replays the optimized schedule; a new episode (day went backwards) triggers a fresh optimization
+        day = self.env.day
+        if self.schedule is None or day <= self._last_day or day - self.start_day >= len(self.schedule):
+            self.optimize()
+        self._last_day = day
+        return self.schedule[day - self.start_day].astype(np.float32), None
@@ -0,0 +1,283 @@
+import copy
+import random
+import time
+import numpy as np
+
+from envs.batch_simulator import BatchSimulator
+
+
+class ModelBasedValueIteration:
+    """
+    Planning on the discretized MDP seen by DiscretizedDynaQAgent, with a model
+    estimated from the simulator rather than learned from experience.
+
+    Starting from the cells of env states sampled along random-action episodes, `build_model` runs a
+    breadth-first expansion over the reachable cells of the agent's `obs_bins`
+    grid. Every cell keeps up to `samples_per_cell` concrete simulator states
+    (the first ones that reached it). Each cell is expanded by stepping all of
+    its samples under every action of the agent's lattice in one
+    BatchSimulator call. The estimated model is stored sparsely:
+    transitions as COO arrays over (cell * n_actions + action) -> next cell
+    with empirical probabilities, and the mean reward per (cell, action).
+    Probability mass that terminates has no entry. Cells left unexpanded once
+    `max_states` is reached are treated as terminal.
+
+    `solve` runs vectorized value iteration or (modified) policy iteration to
+    convergence. It then writes the resulting Q rows into `agent.q_table`, so
+    the agent's greedy `choose_action` follows the computed policy.
+    """
+
+    def __init__(
+        self,
+        agent,
+        env=None,
+        samples_per_cell=4,
+        n_start_states=64,
+        fish_subsample=10,
+        max_states=2000,
+        gamma=None,
+        seed=None,
+        verbose=True
+    ):
+        self.agent = agent
+        self.env = env if env is not None else agent.env
+        # DiscretizedDynaQAgent.env may be the discrete wrapper; the simulator needs the continuous env
+        self.base_env = getattr(self.env, "base_env", self.env)
+        self.samples_per_cell = samples_per_cell
+        self.n_start_states = n_start_states
+        self.fish_subsample = fish_subsample
+        self.max_states = max_states
+        self.gamma = agent.gamma if gamma is None else gamma
+        self.seed = seed
+        self.verbose = verbose
+
+        self.actions = np.array(agent.action_space, dtype=np.float64)
+        self.n_actions = len(self.actions)
+        self.bins = agent.obs_space_bins
+        # np.digitize against obs_bins edges yields indices 0..obs_bins per dimension
+        self.grid_shape = tuple(len(b) + 1 for b in self.bins)
+
+        self.sim = BatchSimulator(self.base_env, n_members=1, seed=seed)
+        self.cells = []          # cell index -> observation tuple, as agent.discretize_obs returns it
+        self.cell_index = {}     # flat grid key -> cell index
+        self.samples = []        # cell index -> dict of member arrays (at most samples_per_cell rows)
+        self.rows = self.cols = self.probs = None
+        self.rewards = None
+        self.expanded = None
+
+    # Simulator members ----------------------------------------------------
+
+    def _read_members(self):
+        sim = self.sim
+        members = {
+            "weights": sim.weights.copy(),
+            "day": sim.day.copy(),
+            "temperature": sim.temperature.copy(),
+            "dissolved_oxygen": sim.dissolved_oxygen.copy(),
+            "uia": sim.uia.copy(),
+            "uia_acc": np.array(sim.uia_model.UIA, dtype=np.float64).copy(),
+            "prev_biomass": sim.prev_biomass.copy(),
+        }
+        if sim.age is not None:
+            members["age"] = sim.age.copy()
+        return members
+
+    def _write_members(self, members, repeats):
+        # Every sample is repeated once per action: member k = sample * n_actions + action
+        sim = self.sim
+        sim.n_members = len(members["day"]) * repeats
+        sim.weights = np.repeat(members["weights"], repeats, axis=0)
+        sim.day = np.repeat(members["day"], repeats)
+        sim.temperature = np.repeat(members["temperature"], repeats)
+        sim.dissolved_oxygen = np.repeat(members["dissolved_oxygen"], repeats)
+        sim.uia = np.repeat(members["uia"], repeats)
+        sim.uia_model.UIA = np.repeat(members["uia_acc"], repeats)
+        sim.prev_biomass = np.repeat(members["prev_biomass"], repeats)
+        if "age" in members:
+            sim.age = np.repeat(members["age"], repeats, axis=0)
+
+    def _discretize(self, obs):
+        codes = np.stack([np.digitize(obs[:, i], self.bins[i]) for i in range(obs.shape[1])], axis=1)
+        return codes, np.ravel_multi_index(codes.T, self.grid_shape)
+
+    def _add_samples(self, members, codes, keys, queue):
+        # Register newly reached cells and top up their samples until they are expanded
+        for key in np.unique(keys):
+            idx = self.cell_index.get(key)
+            if idx is None:
+                if len(self.cells) >= self.max_states:
+                    continue
+                idx = len(self.cells)
+                self.cell_index[key] = idx
+                first = np.flatnonzero(keys == key)[0]
+                self.cells.append(tuple(int(c) for c in codes[first]))
+                self.samples.append(None)
+                queue.append(idx)
+            if self.expanded is not None and self.expanded[idx]:
+                continue
+            have = 0 if self.samples[idx] is None else len(self.samples[idx]["day"])
+            take = np.flatnonzero(keys == key)[:self.samples_per_cell - have]
+            if len(take) == 0:
+                continue
+            new = {field: values[take] for field, values in members.items()}
+            if self.samples[idx] is None:
+                self.samples[idx] = new
+            else:
+                self.samples[idx] = {f: np.concatenate([self.samples[idx][f], new[f]]) for f in new}
+
+    # Model estimation -----------------------------------------------------
+
+    def _private_env(self):
+        # Deep copy of the caller's env without its render handles
+        env = self.base_env
+        memo = {id(getattr(env, name)): None for name in ("renderer", "render_process")
+                if getattr(env, name, None) is not None}
+        return copy.deepcopy(env, memo)
+
+    def build_model(self):
+        t0 = time.perf_counter()
+        A = self.n_actions
+        queue = []
+        self.expanded = np.zeros(self.max_states, dtype=bool)
+
+        # Start cells from real env states spread over the episode: each start is a reset
+        # followed by a random number of days under random lattice actions. They run on a
+        # private copy of the env, and the global RNG streams its reset and step draw from
+        # are restored afterwards, so the caller's env and random state are left as they were
+        rng = np.random.default_rng(self.seed)
+        env = self._private_env()
+        np_state, py_state = np.random.get_state(), random.getstate()
+        try:
+            for _ in range(self.n_start_states):
+                env.reset(seed=int(rng.integers(2**31)))
+                for _ in range(rng.integers(0, env.max_days - 1)):
+                    env.step(self.actions[rng.integers(A)].astype(np.float32))
+                self.sim.n_members = 1
+                self.sim.load_env_state(env.get_state(), fish_subsample=self.fish_subsample)
+                members = self._read_members()
+                codes, keys = self._discretize(self.sim.observations())
+                self._add_samples(members, codes, keys, queue)
+        finally:
+            np.random.set_state(np_state)
+            random.setstate(py_state)
+
+        rows, cols, probs, rewards = [], [], [], {}
+        head = 0
+        while head < len(queue):
+            idx = queue[head]
+            head += 1
+            samples = self.samples[idx]
+            n = len(samples["day"])
+            self._write_members(samples, A)
+            reward, terminated = self.sim.step(np.tile(self.actions, (n, 1)))
+            self.expanded[idx] = True
+
+            next_members = self._read_members()
+            codes, keys = self._discretize(self.sim.observations())
+            self._add_samples(next_members, codes, keys, queue)
+
+            rewards[idx] = reward.reshape(n, A).mean(axis=0)
+            alive = ~terminated
+            next_idx = np.array([self.cell_index.get(k, -1) for k in keys.tolist()], dtype=np.int64)
+            alive &= next_idx >= 0  # successors beyond max_states are cut off like terminal ones
+            action_idx = np.tile(np.arange(A), n)
+            rows.append(idx * A + action_idx[alive])
+            cols.append(next_idx[alive])
+            probs.append(np.full(alive.sum(), 1.0 / n))
+
+            if self.verbose and head % 50 == 0:
+                print(f"expanded {head} cells, {len(queue)} discovered, {time.perf_counter() - t0:.1f}s")
+
+        n_states = len(self.cells)
+        self.expanded = self.expanded[:n_states]
+        self.rewards = np.zeros((n_states, A))
+        for idx, r in rewards.items():
+            self.rewards[idx] = r
+
+        # Coalesce duplicate (row, next cell) pairs into one COO entry
+        rows, cols, probs = np.concatenate(rows), np.concatenate(cols), np.concatenate(probs)
+        pair = rows * n_states + cols
+        unique, inverse = np.unique(pair, return_inverse=True)
+        self.rows, self.cols = unique // n_states, unique % n_states
+        self.probs = np.bincount(inverse, weights=probs)
+
+        stats = {
+            "n_states": n_states,
+            "n_expanded": int(self.expanded.sum()),
+            "n_transitions": len(self.probs),
+            "build_s": time.perf_counter() - t0,
+        }
+        if self.verbose:
+            print(f"model: {stats['n_states']} cells ({stats['n_expanded']} expanded), "
+                  f"{stats['n_transitions']} transitions in {stats['build_s']:.1f}s")
+        return stats
+
+    # Planning ---------------------------------------------------------------
+
+    def _expected_next_value(self, V):
+        # P @ V over the COO entries; rows are flat (cell, action) indices
+        n_rows = len(V) * self.n_actions
+        return np.bincount(self.rows, weights=self.probs * V[self.cols], minlength=n_rows).reshape(len(V), -1)
+
+    def _q_values(self, V):
+        return self.rewards + self.gamma * self._expected_next_value(V)
+
+    def value_iteration(self, tol=1e-6, max_iter=100_000):
+        V = np.zeros(len(self.cells))
+        for it in range(1, max_iter + 1):
+            Q = self._q_values(V)
+            V_new = np.where(self.expanded, Q.max(axis=1), 0.0)
+            residual = np.abs(V_new - V).max()
+            V = V_new
+            if residual < tol:
+                break
+        return V, {"iterations": it, "residual": residual}
+
+    def policy_iteration(self, tol=1e-6, max_iter=1000, eval_sweeps=50):
+        # Modified policy iteration: a fixed number of evaluation sweeps per improvement step
+        n = len(self.cells)
+        V = np.zeros(n)
+        policy = np.zeros(n, dtype=np.int64)
+        for it in range(1, max_iter + 1):
+            for _ in range(eval_sweeps):
+                V = np.where(self.expanded, self._q_values(V)[np.arange(n), policy], 0.0)
+            Q = self._q_values(V)
+            new_policy = Q.argmax(axis=1)
+            residual = np.abs(np.where(self.expanded, Q.max(axis=1), 0.0) - V).max()
+            stable = np.array_equal(new_policy, policy)
+            policy = new_policy
+            if stable and residual < tol:
+                break
+        return V, {"iterations": it, "residual": residual}
+
+    def solve(self, method="value", tol=1e-6, max_iter=None):
+        """
+        Build the model if needed, solve it and fill `agent.q_table`.
+        `method` is "value" or "policy". Returns a stats dict.
+        """
+        stats = {}
+        if self.rows is None:
+            stats.update(self.build_model())
+        t0 = time.perf_counter()
+        if method == "value":
+            V, solve_stats = self.value_iteration(tol, max_iter or 100_000)
+        elif method == "policy":
+            V, solve_stats = self.policy_iteration(tol, max_iter or 1000)
+        else:
+            raise ValueError(f"Unknown method '{method}', expected 'value' or 'policy'")
+        stats.update(solve_stats)
+        stats["solve_s"] = time.perf_counter() - t0
+
+        self.values = V
+        self.q_values = self._q_values(V)
+        for idx in np.flatnonzero(self.expanded):
+            self.agent.q_table[self.cells[idx]] = self.q_values[idx].astype(self.agent.q_dtype)
+        if self.verbose:
+            print(f"{method} iteration: {stats['iterations']} iterations, residual {stats['residual']:.2e}, "
+                  f"{stats['solve_s']:.2f}s")
+        return stats
+
+    def policy_table(self):
+        # Observation tuple -> greedy action index, for every expanded cell
+        greedy = self.q_values.argmax(axis=1)
+        return {self.cells[idx]: int(greedy[idx]) for idx in np.flatnonzero(self.expanded)}
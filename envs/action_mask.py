@@ -0,0 +1,65 @@
+import numpy as np
+
+from model.individual_growth_model import IndividualGrowthModel
+
+
+class ActionPruner:
+    """
+    Per-state masks over a discrete (feed, setpoint, aeration) action table
+    that drop actions another action in the table dominates.
+
+    Setpoints: while the tank is at or above the setpoint the heater stays
+    off (TemperatureModel.set_temperature), so every setpoint at or below the
+    tank temperature leads to the same next temperature, but the heat cost
+    still grows with the setpoint. Only the lowest of them is kept. This is
+    exact for the daily model; with sub-daily steps the heater can switch on
+    during the day, so pass `prune_setpoints=False` there.
+
+    Feed (opt-in, `prune_feed=True`): a feed rate is dropped when a lower
+    rate in the table has at least the same feed efficiency. Over one day
+    the lower rate costs less, releases less ammonia and grows the fish at
+    least as much. In practice this removes the tail above f_opt, and the
+    rule does not depend on the state. Unlike the setpoint rule it is a
+    one-step heuristic, not exact dominance. The kept rate's extra growth
+    raises later feed cost (feed is dosed per unit of biomass) and UIA
+    exposure, so over a whole episode it is not always the better choice.
+
+    All masks are computed once, one per number of setpoints at or below
+    the tank temperature. `mask(T)` returns one of them as a read-only array.
+    """
+
+    def __init__(self, action_table, prune_setpoints=True, prune_feed=False):
+        # The float32 values step() actually applies
+        table = np.asarray(action_table, dtype=np.float32).astype(np.float64)
+        feed, setpoint = table[:, 0], table[:, 1]
+        self.prune_setpoints = prune_setpoints
+
+        keep = np.ones(len(table), dtype=bool)
+        if prune_feed:
+            levels = np.unique(feed)
+            efficiency = IndividualGrowthModel.feed_efficiency_array(levels)
+            best_below = np.concatenate([[-np.inf], np.maximum.accumulate(efficiency)[:-1]])
+            keep &= (efficiency > best_below)[np.searchsorted(levels, feed)]
+
+        self.setpoints = np.unique(setpoint)
+        level = np.searchsorted(self.setpoints, setpoint)
+        masks = []
+        for n_off in range(len(self.setpoints) + 1):
+            # Levels below n_off leave the heater off; all but the lowest are dominated
+            masks.append(keep & ~((level < n_off) & (level > 0)))
+        self.masks = np.stack(masks)
+        self.masks.setflags(write=False)
+        self.indices = [np.flatnonzero(m) for m in self.masks]
+
+    def _row(self, temperature):
+        if not self.prune_setpoints:
+            return 0
+        return int(np.searchsorted(self.setpoints, temperature, side="right"))
+
+    def mask(self, temperature):
+        """Boolean mask over the action table for a tank at `temperature` (°C)."""
+        return self.masks[self._row(temperature)]
+
+    def surviving(self, temperature):
+        """Indices of the actions `mask(temperature)` keeps."""
+        return self.indices[self._row(temperature)]
@@ -2,25 +2,75 @@ import numpy as np
 import gymnasium as gym
 from gymnasium import spaces
 import random
+from typing import NamedTuple
 
 from envs.renderer import Renderer
 from model.fish import Fish, FishStage
 from model.individual_growth_model import IndividualGrowthModel
 from model.uia_model import UIAModel
-from model.temperature_model import TemperatureModel
+from model.temperature_model import TemperatureModel, load_temperature_history
 from model.reward_cost import RewardCost
+from model.scenario_bank import ScenarioBank
+from utils.config import Config
+from utils.profiler import StageProfiler
+
+class EnvState(NamedTuple):
+    fish: np.ndarray       # structured array, model.fish.FISH_STATE_DTYPE
+    scalars: np.ndarray    # float64, ordered as AquacultureEnv.STATE_SCALARS
+    scalar_types: tuple    # original scalar types; float32/float64/int mixes affect NumPy promotion
+    np_rng: tuple          # np.random.get_state()
+    py_rng: tuple          # random.getstate()
+    ambient_trace: np.ndarray  # episode weather; shared, never modified in place
+
+    def scalar(self, name, owner=None):
+        index = AquacultureEnv.STATE_SCALARS.index((owner, name))
+        return self.scalar_types[index](self.scalars[index])
+
 
 class AquacultureEnv(gym.Env):
-    metadata = {"render_modes": ["human"]}
+    metadata = {"render_modes": ["human", "async"]}
     ALLOWED_REGIONS = ["guangdong", "north_sulawesi", "kafr_el_sheikh"]
+    PROFILE_STAGES = ["growth", "thermal", "water_quality", "reward", "obs", "render"]
+
+    # (owner, attribute) pairs captured by get_state(); owner None is the env itself
+    STATE_SCALARS = (
+        (None, "day"),
+        (None, "temperature"),
+        (None, "dissolved_oxygen"),
+        (None, "un_ionized_ammonia"),
+        (None, "feed_today"),
+        (None, "feed_yesterday"),
+        (None, "feed_rate_today"),
+        (None, "feed_rate_yesterday"),
+        (None, "prev_biomass"),
+        ("temperature_model", "current_T"),
+        ("temperature_model", "day_of_year"),
+        ("uia_model", "UIA"),
+        ("growth_model", "day_of_year"),
+        ("growth_model", "rho"),
+    )
 
-    def __init__(self, region="guangdong"):
+    def __init__(self, region="guangdong", profile=False, profile_in_info=False, reward_weights=None,
+                 weather=None, reuse_buffers=False, scenarios=None, stage_obs=False, substeps=1,
+                 precision="float64"):
         if region not in self.ALLOWED_REGIONS:
             raise ValueError(f"Invalid region '{region}'. Allowed regions: {self.ALLOWED_REGIONS}")
         super().__init__()
 
         self.region = region
 
+        # Floating-point precision of the stored simulation state: fish weights, temperatures,
+        # UIA, biomass and feed. "float32" rounds each of them to float32 after every update.
+        # Per-fish growth is still evaluated in float64 by the scalar math (math.exp) and cast
+        # back, and each weight is a NumPy float32 object (larger than a Python float). So this
+        # mode reproduces float32 storage, not float32 arithmetic, and saves neither time nor
+        # memory here. The savings are in BatchSimulator and float32 Q tables. Observations are
+        # float32 in both modes.
+        if precision not in ("float64", "float32"):
+            raise ValueError(f"precision must be 'float64' or 'float32', got '{precision}'")
+        self.dtype = np.dtype(precision)
+        self._scalar = float if precision == "float64" else np.float32
+
         # State space (observation) boundaries:
         # State variables include:
         # [0] Total Biomass (ξ): range 0.05 kg - 30000 kg → scaled here to [50, 3e7] grams
@@ -30,6 +80,11 @@ class AquacultureEnv(gym.Env):
         # [4] Un-ionized Ammonia (UIA): range 0.06 mg/L - 1.8 mg/L
         self.obs_low  = np.array([50, 50, 24, 0.3, 0.06], dtype=np.float32)
         self.obs_high = np.array([3e7, 500, 40, 1.0, 1.8 ], dtype=np.float32)
+        # With stage_obs=True, also [5..7] biomass (g) of fingerlings, juveniles and adults, range 0 - 3e7
+        self.stage_obs = stage_obs
+        if stage_obs:
+            self.obs_low = np.concatenate([self.obs_low, np.zeros(3, dtype=np.float32)])
+            self.obs_high = np.concatenate([self.obs_high, np.full(3, 3e7, dtype=np.float32)])
 
         self.observation_space = spaces.Box(
             low = np.zeros_like(self.obs_low),
@@ -63,25 +118,137 @@ class AquacultureEnv(gym.Env):
         self.growth_model = IndividualGrowthModel()
         self.temperature_model = TemperatureModel(region=region)
         self.uia_model = UIAModel(region=region)
-        self.reward_model = RewardCost(region=region)
+        self.reward_model = RewardCost(region=region, weights=reward_weights)
+
+        # Ambient weather: None draws a synthetic series per episode at reset; a path to a
+        # historical (n_years, 365) `.npy` (or a directory of `<region>.npy`) replays real years
+        self.weather_history = None
+        if weather is not None:
+            self.weather_history = load_temperature_history(weather, region)
+
+        # Optional ScenarioBank directory; reset(options={"scenario": i}) then starts from
+        # pre-sampled population i instead of drawing a new one
+        self.scenario_bank = None
+        if scenarios is not None:
+            self.scenario_bank = ScenarioBank.load(scenarios)
+        # Fish per stage and biomass per stage (indexed by FishStage codes), kept current during
+        # growth; stage_events lists the (fish index, old code, new code) changes of the last day
+        self.stage_counts = np.zeros(len(FishStage.NAMES), dtype=np.int64)
+        self.stage_biomass = np.zeros(len(FishStage.NAMES), dtype=self.dtype)
+        self.stage_events = []
         self._initialize_population()
         self.prev_biomass = self._compute_total_biomass()
+        self._apply_precision()
+        self._refresh_stage_stats()
+
+        # Physics sub-steps per env step (one day). With substeps > 1 temperature, DO, UIA and
+        # growth are integrated over the day with the diurnal forcing of the sub_daily config;
+        # substeps=1 is the plain daily model. The agent still acts once per step either way.
+        if substeps < 1:
+            raise ValueError(f"substeps must be >= 1, got {substeps}")
+        self.substeps = substeps
+        self.sub_daily = None
+        if substeps > 1:
+            sd = Config.sub_daily
+            hours = (np.arange(substeps) + 0.5) * 24 / substeps
+            DO_wave = sd.DO_amplitude * np.cos(2 * np.pi * (hours - sd.DO_peak_hour) / 24)
+            T_wave = sd.air_T_amplitude * np.cos(2 * np.pi * (hours - sd.air_T_peak_hour) / 24)
+            # Share of the daily ration fed in each sub-step
+            slots = (np.asarray(sd.feeding_hours) * substeps // 24).astype(int) % substeps
+            feed_share = np.bincount(slots, minlength=substeps) / len(sd.feeding_hours)
+            self._sub_DO_wave = DO_wave.astype(self.dtype)
+            self._sub_T_wave = T_wave.astype(self.dtype)
+            self._sub_feed_share = feed_share.astype(self.dtype)
 
         self.renderer = Renderer(self)
-        
+        # Separate render process for render(mode="async"), started on first use
+        self.render_process = None
+
+        # Opt-in per-stage timing; `None` keeps the step path free of timing calls
+        self.profiler = None
+        self.profile_in_info = profile_in_info
+        if profile:
+            self.enable_profiling(profile_in_info)
+
+        # Opt-in allocation-free step path. With `reuse_buffers=True`, step() and
+        # reset() return the same float32 observation array and step() the same info
+        # dict every call; both are overwritten in place by the next step/reset, so
+        # callers that keep them (replay buffers, trajectory lists) must copy.
+        self._action_buf = None
+        self._raw_buf = None
+        self._obs_buf = None
+        self._info_buf = None
+        if reuse_buffers:
+            self._action_buf = np.empty(3, dtype=np.float32)
+            self._raw_buf = np.empty(len(self.obs_low), dtype=np.float32)
+            self._obs_buf = np.empty(len(self.obs_low), dtype=np.float32)
+            self._obs_range = self.obs_high - self.obs_low
+            self._info_buf = {}
+
+    def enable_profiling(self, attach_to_info=False):
+        self.profiler = StageProfiler(self.PROFILE_STAGES)
+        self.profile_in_info = attach_to_info
+
+    def disable_profiling(self):
+        self.profiler = None
+
+    def get_profile_stats(self):
+        if self.profiler is None:
+            return {}
+        return self.profiler.stats()
+
     def _initialize_population(self):
         self.fishes = [
             Fish.generate_random(self.growth_model)
             for _ in range(self.initial_fish_count)
         ]
 
+    def _apply_precision(self):
+        # Cast the float state to float32 after it was (re)built from Python floats or a
+        # float64 snapshot; a no-op at float64
+        if self.dtype != np.float32:
+            return
+        for fish in self.fishes:
+            fish.weight = np.float32(fish.weight)
+        for owner, name in self.STATE_SCALARS:
+            target = self if owner is None else getattr(self, owner)
+            value = getattr(target, name)
+            if isinstance(value, (float, np.floating)) and name != "rho":
+                setattr(target, name, np.float32(value))
+        trace = self.temperature_model.ambient_trace
+        if trace is not None and trace.dtype != np.float32:
+            self.temperature_model.ambient_trace = trace.astype(np.float32)
+
     def _compute_total_biomass(self):
         return sum(f.weight for f in self.fishes)
 
     def _compute_fish_count(self):
         return len(self.fishes)
 
+    def _refresh_stage_stats(self):
+        # Full pass over the population; only needed after the population is replaced
+        self.stage_counts[:] = 0
+        self.stage_biomass[:] = 0.0
+        for fish in self.fishes:
+            self.stage_counts[fish.stage_code] += 1
+            self.stage_biomass[fish.stage_code] += fish.weight
+        self.stage_events = []
+
     def _get_observation(self, biomass, fish_count, temp):
+        if self._obs_buf is not None:
+            # Same float32 arithmetic as below, written into the preallocated buffers
+            raw, obs = self._raw_buf, self._obs_buf
+            raw[0] = biomass
+            raw[1] = fish_count
+            raw[2] = temp
+            raw[3] = self.dissolved_oxygen
+            raw[4] = self.un_ionized_ammonia
+            if self.stage_obs:
+                raw[5:] = self.stage_biomass
+            np.subtract(raw, self.obs_low, out=obs)
+            np.divide(obs, self._obs_range, out=obs)
+            return np.clip(obs, 0.0, 1.0, out=obs)
+
         raw = np.array([
             biomass,
             fish_count,
@@ -89,63 +256,282 @@ class AquacultureEnv(gym.Env):
             self.dissolved_oxygen,
             self.un_ionized_ammonia
         ], dtype=np.float32)
+        if self.stage_obs:
+            raw = np.concatenate([raw, self.stage_biomass.astype(np.float32)])
         norm = (raw - self.obs_low) / (self.obs_high - self.obs_low)
         return np.clip(norm, 0.0, 1.0)
     
     def denormalize(self, obs_norm: np.ndarray) -> np.ndarray:
+        # Observations are float32; a float64 input is not allowed to change the result's dtype
+        obs_norm = np.asarray(obs_norm, dtype=self.obs_low.dtype)
         return obs_norm * (self.obs_high - self.obs_low) + self.obs_low
 
-    def step(self, action):
-        action = np.clip(action, self.action_space.low, self.action_space.high)
-        feed_rate, temp_setpoint, aeration_rate = action
+    def _simulate_day(self, feed_rate, temp_setpoint, aeration_rate):
+        # Advance the simulation by one day with an already clipped action.
+        # Returns (biomass, biomass_gain, reward, fish_value, feed_cost, heat_cost, oxy_cost);
+        # the raw inputs of the reward are kept on self._last_transition for info
+        if self.substeps > 1:
+            return self._simulate_day_substeps(feed_rate, temp_setpoint, aeration_rate)
+        prof = self.profiler
+        t = None
+        if prof is not None:
+            t = prof.start()
 
-        self.dissolved_oxygen = float(aeration_rate)
+        self.dissolved_oxygen = self._scalar(aeration_rate)
         self.temperature_model.set_day_of_year(self.day)
         ambient_temp = self.temperature_model.get_ambient_temperature()
         temp_heated  = max(temp_setpoint - ambient_temp, 0.0)
-        self.temperature = self.temperature_model.set_temperature(temp_setpoint)
+        self.temperature = self.temperature_model.set_temperature(temp_setpoint, T_amb=ambient_temp)
+        if prof is not None:
+            t = prof.lap("thermal", t)
 
-        for fish in self.fishes:
-            fish.grow(feed_rate, self.temperature, self.dissolved_oxygen, self.un_ionized_ammonia)
-
-        biomass = self._compute_total_biomass()
-        fish_count = self._compute_fish_count()
+        # One pass grows every fish and collects total biomass, per-stage biomass and stage changes
+        events = self.stage_events
+        if self._info_buf is None:
+            events = self.stage_events = []
+        else:
+            events.clear()
+        stage_mass = [0.0] * len(FishStage.NAMES)
+        biomass = 0.0
+        for i, fish in enumerate(self.fishes):
+            previous = fish.grow(feed_rate, self.temperature, self.dissolved_oxygen, self.un_ionized_ammonia)
+            if previous is not None:
+                events.append((i, previous, fish.stage_code))
+            stage_mass[fish.stage_code] += fish.weight
+            biomass += fish.weight
+        self.stage_biomass[:] = stage_mass
+        for _, previous, code in events:
+            self.stage_counts[previous] -= 1
+            self.stage_counts[code] += 1
         biomass_gain = biomass - self.prev_biomass
+        if prof is not None:
+            t = prof.lap("growth", t)
 
         feed_amount_total = feed_rate * 0.1 * biomass
+        self.un_ionized_ammonia = self.uia_model.get_uia(feed_amount_total, self.temperature)
+        if prof is not None:
+            t = prof.lap("water_quality", t)
+
+        return self._close_day(feed_rate, biomass, biomass_gain, feed_amount_total, temp_heated, prof, t)
+
+    def _simulate_day_substeps(self, feed_rate, temp_setpoint, aeration_rate):
+        # Same contract as _simulate_day, integrated over self.substeps equal sub-steps.
+        # Everything that does not depend on fish weight (ambient, tank temperature, DO and
+        # the temperature/DO growth factors) is computed for all sub-steps up front, so the
+        # sub-step loop is a handful of array operations over the population.
+        prof = self.profiler
+        t = None
+        if prof is not None:
+            t = prof.start()
+
+        n = self.substeps
+        dt = 1.0 / n
+        self.dissolved_oxygen = self._scalar(aeration_rate)
+        self.temperature_model.set_day_of_year(self.day)
+        T_amb = self.temperature_model.get_ambient_temperature() + self._sub_T_wave
+        temp_heated = self._scalar(np.maximum(temp_setpoint - T_amb, 0.0).mean())
+        T_sub = self.temperature_model.set_temperature_substeps(temp_setpoint, T_amb).astype(self.dtype, copy=False)
+        self.temperature = self.temperature_model.current_T = self._scalar(self.temperature_model.current_T)
+        DO_sub = np.maximum(self.dissolved_oxygen + self._sub_DO_wave, 0.0)
+        if prof is not None:
+            t = prof.lap("thermal", t)
+
+        # Anabolism per unit w**m without the UIA factor (nu = 1 at UIA_crit), spread over the
+        # feedings, and catabolism per unit w**n for a sub-step of length dt
+        ig, bm = Config.ind_growth_model, Config.biomass_model
+        gm = self.growth_model
+        ana = gm.compute_anabolism_array(self._scalar(feed_rate), T_sub, DO_sub, ig.UIA_crit, 1.0) * self._sub_feed_share
+        cat = gm.compute_catabolism_array(T_sub, 1.0) * dt
+
+        w0 = np.fromiter((fish.weight for fish in self.fishes), dtype=self.dtype, count=len(self.fishes))
+        w = w0.copy()
+        uia = self.un_ionized_ammonia
+        UIA_sub = np.empty(n, dtype=self.dtype)
+        feed_amount_total = 0.0
+        for k in range(n):
+            feed_g = 0.0
+            if self._sub_feed_share[k]:
+                feed_g = feed_rate * 0.1 * w.sum() * self._sub_feed_share[k]
+                feed_amount_total += feed_g
+            log_w = np.log(w)
+            slowdown = 1.0 / (1.0 + np.exp(ig.slowdown_gamma * (w - ig.w_threshold)))
+            w += (ana[k] * gm.nu(uia) * np.exp(bm.m * log_w) - cat[k] * np.exp(bm.n * log_w)) * slowdown
+            uia = self.uia_model.get_uia_substep(feed_g, T_sub[k], dt)
+            UIA_sub[k] = uia
+        self.un_ionized_ammonia = uia
+        self.sub_daily = {"ambient": T_amb, "temperature": T_sub, "dissolved_oxygen": DO_sub, "uia": UIA_sub}
+
+        events = self.stage_events
+        if self._info_buf is None:
+            events = self.stage_events = []
+        else:
+            events.clear()
+        stage_mass = [0.0] * len(FishStage.NAMES)
+        biomass = 0.0
+        for i, (fish, growth) in enumerate(zip(self.fishes, (w - w0).tolist())):
+            previous = fish.apply_growth(growth)
+            if previous is not None:
+                events.append((i, previous, fish.stage_code))
+            stage_mass[fish.stage_code] += fish.weight
+            biomass += fish.weight
+        self.stage_biomass[:] = stage_mass
+        for _, previous, code in events:
+            self.stage_counts[previous] -= 1
+            self.stage_counts[code] += 1
+        biomass_gain = biomass - self.prev_biomass
+        if prof is not None:
+            t = prof.lap("growth", t)
+
+        return self._close_day(feed_rate, biomass, biomass_gain, feed_amount_total, temp_heated, prof, t)
+
+    def _close_day(self, feed_rate, biomass, biomass_gain, feed_amount_total, temp_heated, prof, t):
+        # Feed bookkeeping and reward shared by the daily and sub-daily paths
         self.feed_yesterday = self.feed_today
         self.feed_today = feed_amount_total
         self.feed_rate_yesterday = self.feed_rate_today
         self.feed_rate_today = feed_rate
-        self.un_ionized_ammonia = self.uia_model.get_uia(feed_amount_total, self.temperature)
-
-        fish_value = self.reward_model.fish_value_gain(self.prev_biomass / 1000, biomass / 1000) * 2
-        feed_cost = self.reward_model.feed_cost(feed_amount_total / 1000) * 0.9
-        heat_cost = self.reward_model.heat_cost(delta_T=temp_heated) * 0.75
-        oxy_cost = self.reward_model.oxygenation_cost(DO_level=self.dissolved_oxygen) * 0.75
 
+        fish_value, feed_cost, heat_cost, oxy_cost = self.reward_model.reward_components(
+            self.prev_biomass, biomass, feed_amount_total, temp_heated, self.dissolved_oxygen
+        )
         reward = fish_value - feed_cost - heat_cost - oxy_cost
 
+        self._last_transition = (self.prev_biomass, feed_amount_total, temp_heated)
         self.prev_biomass = biomass
         self.day += 1
+        if prof is not None:
+            prof.lap("reward", t)
+
+        return biomass, biomass_gain, reward, fish_value, feed_cost, heat_cost, oxy_cost
+
+    def _is_terminal(self, biomass):
+        return bool(self.day >= self.max_days or biomass <= 100)
+
+    def _clip_action(self, action):
+        if self._action_buf is not None:
+            return np.clip(action, self.action_space.low, self.action_space.high, out=self._action_buf)
+        return np.clip(action, self.action_space.low, self.action_space.high)
+
+    def step(self, action):
+        action = self._clip_action(action)
+        feed_rate, temp_setpoint, aeration_rate = action
+
+        biomass, biomass_gain, reward, fish_value, feed_cost, heat_cost, oxy_cost = \
+            self._simulate_day(feed_rate, temp_setpoint, aeration_rate)
 
-        obs = self._get_observation(biomass, fish_count, self.temperature)
-        terminated = bool(self.day >= self.max_days or biomass <= 100)
+        prof = self.profiler
+        if prof is not None:
+            t = prof.start()
+
+        obs = self._get_observation(biomass, self._compute_fish_count(), self.temperature)
+        terminated = self._is_terminal(biomass)
         truncated = False
+        prev_biomass, feed_amount, heat_delta_T = self._last_transition
+        info = self._info_buf
+        if info is None:
+            info = {}
+        elif "profile" in info:
+            del info["profile"]
+        info["biomass_gain"] = biomass_gain
+        info["uia"] = self.un_ionized_ammonia
+        info["reward"] = reward
+        info["feed_rate"] = feed_rate
+        info["temperature"] = self.temperature
+        info["dissolved_oxygen"] = self.dissolved_oxygen
+        info["fish_value"] = fish_value
+        info["feed_cost"] = feed_cost
+        info["heat_cost"] = heat_cost
+        info["oxygenation_cost"] = oxy_cost
+        # Raw reward inputs (grams, degC, mg/L) for RewardCost.relabel
+        info["prev_biomass"] = prev_biomass
+        info["biomass"] = biomass
+        info["feed_amount"] = feed_amount
+        info["heat_delta_T"] = heat_delta_T
+        # Stage bookkeeping; copies unless buffers are reused, in which case the env's own arrays
+        if self._info_buf is None:
+            info["stage_counts"] = self.stage_counts.copy()
+            info["stage_biomass"] = self.stage_biomass.copy()
+        else:
+            info["stage_counts"] = self.stage_counts
+            info["stage_biomass"] = self.stage_biomass
+        info["stage_transitions"] = self.stage_events
+        if self.sub_daily is not None:
+            # Per-sub-step arrays of the day just simulated; replaced, not reused, every step
+            info["sub_daily"] = self.sub_daily
+        if prof is not None:
+            prof.lap("obs", t)
+            if terminated and self.profile_in_info:
+                info["profile"] = prof.stats()
+
+        return obs, float(reward), terminated, truncated, info
+
+    def step_n(self, action, days, return_daily=False):
+        """
+        Hold `action` constant for up to `days` days in one call (action repeat).
+
+        Stops early when the episode terminates partway through. Returns the
+        observation after the last simulated day and the summed reward; `info`
+        holds the number of days actually simulated and the summed cost terms,
+        and with `return_daily=True` also per-day arrays under "daily".
+        """
+        if days < 1:
+            raise ValueError(f"days must be >= 1, got {days}")
+        action = self._clip_action(action)
+        feed_rate, temp_setpoint, aeration_rate = action
+
+        if return_daily:
+            daily = {
+                key: np.zeros(days, dtype=np.float64)
+                for key in ("reward", "biomass", "fish_value", "feed_cost", "heat_cost", "oxygenation_cost")
+            }
+
+        total_reward = total_value = total_feed = total_heat = total_oxy = 0.0
+        transitions = []
+        biomass_start = self.prev_biomass
+        terminated = False
+        n = 0
+        while n < days and not terminated:
+            biomass, _, reward, fish_value, feed_cost, heat_cost, oxy_cost = \
+                self._simulate_day(feed_rate, temp_setpoint, aeration_rate)
+            total_reward += reward
+            total_value += fish_value
+            total_feed += feed_cost
+            total_heat += heat_cost
+            total_oxy += oxy_cost
+            transitions.extend(self.stage_events)
+            if return_daily:
+                daily["reward"][n] = reward
+                daily["biomass"][n] = biomass
+                daily["fish_value"][n] = fish_value
+                daily["feed_cost"][n] = feed_cost
+                daily["heat_cost"][n] = heat_cost
+                daily["oxygenation_cost"][n] = oxy_cost
+            n += 1
+            terminated = self._is_terminal(biomass)
+
+        obs = self._get_observation(biomass, self._compute_fish_count(), self.temperature)
         info = {
-            "biomass_gain": biomass_gain,
+            "days": n,
+            "biomass_gain": biomass - biomass_start,
             "uia": self.un_ionized_ammonia,
-            "reward": reward,
+            "reward": total_reward,
             "feed_rate": feed_rate,
             "temperature": self.temperature,
             "dissolved_oxygen": self.dissolved_oxygen,
-            "fish_value": fish_value,
-            "feed_cost": feed_cost,
-            "heat_cost": heat_cost,
-            "oxygenation_cost": oxy_cost
+            "fish_value": total_value,
+            "feed_cost": total_feed,
+            "heat_cost": total_heat,
+            "oxygenation_cost": total_oxy,
+            "stage_counts": self.stage_counts.copy(),
+            "stage_biomass": self.stage_biomass.copy(),
+            "stage_transitions": transitions
         }
+        if return_daily:
+            info["daily"] = {key: values[:n] for key, values in daily.items()}
+        if terminated and self.profiler is not None and self.profile_in_info:
+            info["profile"] = self.profiler.stats()
 
-        return obs, float(reward), terminated, truncated, info
+        return obs, float(total_reward), terminated, False, info
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
@@ -154,13 +540,32 @@ class AquacultureEnv(gym.Env):
             random.seed(seed)
 
         self.day = 0
-        self._initialize_population()
+        options = options or {}
+        if options.get("scenario") is not None:
+            if self.scenario_bank is None:
+                raise ValueError("reset option 'scenario' needs an env created with scenarios=<bank dir>")
+            population = self.scenario_bank.population(options["scenario"], self.initial_fish_count)
+            self.fishes = Fish.unpack(population, self.growth_model, self.fishes)
+        else:
+            self._initialize_population()
         self.prev_biomass = self._compute_total_biomass()
+        self._refresh_stage_stats()
 
-        self.uia_model = UIAModel(region=self.region)
-        self.temperature_model = TemperatureModel(region=self.region)
+        self.uia_model.reset()
+        self.temperature_model.reset()
+        n_days = self.max_days + 1
+        if self.weather_history is None:
+            self.temperature_model.generate_ambient_trace(n_days)
+        else:
+            if "weather_year" in options:
+                year = options["weather_year"]
+            else:
+                year = int(self.np_random.integers(self.weather_history.shape[0]))
+            self.temperature_model.load_ambient_trace(
+                self.weather_history, n_days, year=year, start_day=options.get("weather_start_day", 0)
+            )
         ambient_temp = self.temperature_model.get_ambient_temperature()
-        self.temperature = self.temperature_model.set_temperature(ambient_temp)
+        self.temperature = self.temperature_model.set_temperature(ambient_temp, T_amb=ambient_temp)
         
         self.dissolved_oxygen = 0.6
         self.un_ionized_ammonia = 0.06
@@ -169,16 +574,61 @@ class AquacultureEnv(gym.Env):
         self.feed_rate_today = 0.0
         self.feed_rate_yesterday = 0.0
         self.uia_model.temperature = self.temperature
+        self._apply_precision()
 
         obs = self._get_observation(self.prev_biomass, self._compute_fish_count(), self.temperature)
         return obs, {}
 
+    def get_state(self) -> EnvState:
+        """
+        Snapshot the full simulator state, including the global NumPy and
+        `random` RNG states the dynamics draw from. Restoring it with
+        `set_state` continues the episode bit-exactly.
+        """
+        values = [
+            getattr(self if owner is None else getattr(self, owner), name)
+            for owner, name in self.STATE_SCALARS
+        ]
+        return EnvState(
+            fish=Fish.pack(self.fishes),
+            scalars=np.array(values, dtype=np.float64),
+            scalar_types=tuple(type(v) for v in values),
+            np_rng=np.random.get_state(),
+            py_rng=random.getstate(),
+            ambient_trace=self.temperature_model.ambient_trace,
+        )
+
+    def set_state(self, state: EnvState):
+        self.fishes = Fish.unpack(state.fish, self.growth_model, self.fishes)
+        for (owner, name), value, value_type in zip(self.STATE_SCALARS, state.scalars.tolist(), state.scalar_types):
+            setattr(self if owner is None else getattr(self, owner), name, value_type(value))
+        self.temperature_model.ambient_trace = state.ambient_trace
+        np.random.set_state(state.np_rng)
+        random.setstate(state.py_rng)
+        self._apply_precision()
+        self._refresh_stage_stats()
+
     def render(self, mode='human'):
         if mode not in self.metadata['render_modes']:
             raise ValueError(f"Unsupported render mode: {mode}")
-        self.renderer.render()
+        prof = self.profiler
+        if prof is not None:
+            t = prof.start()
+        if mode == "async":
+            # Publish a snapshot for the render process and return; drawing never blocks stepping
+            if self.render_process is None:
+                from envs.render_process import RenderProcess
+                self.render_process = RenderProcess(self.region, self.initial_fish_count)
+            self.render_process.publish(self)
+        else:
+            self.renderer.render()
+        if prof is not None:
+            prof.lap("render", t)
 
     def close(self):
+        if getattr(self, "render_process", None) is not None:
+            self.render_process.close()
+            self.render_process = None
         if hasattr(self, "renderer"):
             try:
                 self.renderer.close()
@@ -0,0 +1,229 @@
+import numpy as np
+
+from model.individual_growth_model import IndividualGrowthModel
+from model.uia_model import UIAModel
+from model.reward_cost import RewardCost
+from utils.config import Config
+
+
+class BatchSimulator:
+    """
+    Vectorized AquacultureEnv dynamics for K independent members.
+
+    Every member carries its own population (weights of shape (K, N)),
+    temperature, UIA accumulator, day and previous biomass, and all members
+    advance together with NumPy array operations. The day-to-day equations
+    are the ones in `AquacultureEnv._simulate_day`. Fish age and stage never
+    feed back into growth, water quality or reward, so they are only tracked
+    for envs with `stage_obs=True`, whose observations carry the biomass per
+    stage. The age of a fish that lost weight advances with probability 0.3
+    as in `Fish.apply_growth`, drawn from the simulator's Generator.
+
+    Ambient-temperature noise comes from the simulator's own Generator, so
+    rollouts never touch the global RNG the env draws from and a planner does
+    not see the episode's future weather. With `shared_weather=True` all
+    members see the same draw each day (common random numbers).
+
+    `set_parameters` gives every member its own model constants, for
+    sensitivity studies over uncertain parameters.
+
+    `dtype` (default: the env's precision) is the dtype of every state array
+    and of the rewards; float32 halves the memory of large batches.
+    """
+
+    # Qualified parameter names accepted by set_parameters, by section
+    PARAMETER_SECTIONS = ("ind_growth_model", "biomass_model", "reward", "uia", "thermal")
+    UIA_PARAMETERS = ("tank_volume", "decay_rate", "pH")
+    THERMAL_PARAMETERS = ("alpha", "beta")
+
+    def __init__(self, env, n_members=1, seed=None, shared_weather=False, dtype=None):
+        self.region = env.region
+        self.n_members = n_members
+        self.max_days = env.max_days
+        self.dtype = np.dtype(dtype if dtype is not None else getattr(env, "dtype", np.float64))
+        self.action_low = env.action_space.low.astype(self.dtype)
+        self.action_high = env.action_space.high.astype(self.dtype)
+        self.obs_low = env.obs_low
+        self.obs_high = env.obs_high
+        self.rng = np.random.default_rng(seed)
+        self.shared_weather = shared_weather
+        self.stage_obs = getattr(env, "stage_obs", False)
+
+        self.growth_model = IndividualGrowthModel()
+        self.growth_model.rho = env.growth_model.rho
+        self.uia_model = UIAModel(region=self.region)
+        self.reward_model = RewardCost(region=self.region, weights=env.reward_model.weights)
+
+        tm = env.temperature_model
+        self.T_mean = tm.T_mean
+        self.T_amp = tm.T_amp
+        self.phase_shift = tm.phase_shift
+        self.season_period = tm.season_period
+        self.Tmin = tm.Tmin
+        self.Tmax = tm.Tmax
+        self.alpha = tm.alpha
+        self.beta = tm.beta
+
+        self.fish_scale = 1.0
+        self.ambient_trace = None
+        self.load_env_state(env.get_state())
+
+    def load_env_state(self, state, fish_subsample=None, replay_weather=False):
+        """
+        Broadcast one `AquacultureEnv.get_state()` snapshot to every member.
+
+        With `fish_subsample=n` only n fish spread evenly over the sorted
+        weight distribution are simulated and biomass is scaled by N / n,
+        which trades accuracy for speed in large populations.
+
+        With `replay_weather=True` the members follow the episode's own
+        ambient trace instead of fresh draws, to reproduce an env run.
+        """
+        dtype = self.dtype
+        self.ambient_trace = np.asarray(state.ambient_trace, dtype=dtype) if replay_weather else None
+        fish = state.fish
+        weights = np.asarray(fish["weight"], dtype=dtype)
+        self.fish_count = len(weights)
+        if fish_subsample is not None and fish_subsample < len(weights):
+            ranks = np.linspace(0, len(weights) - 1, fish_subsample).round().astype(int)
+            fish = fish[np.argsort(weights, kind="stable")[ranks]]
+            weights = np.asarray(fish["weight"], dtype=dtype)
+            self.fish_scale = self.fish_count / fish_subsample
+        else:
+            self.fish_scale = 1.0
+
+        K = self.n_members
+        self.weights = np.tile(weights, (K, 1))
+        if self.stage_obs:
+            # Stage thresholds are fixed per fish; only age changes
+            self.age = np.tile(fish["age_days"], (K, 1))
+            self.to_juvenile_weight = np.asarray(fish["to_juvenile_weight"], dtype=dtype)
+            self.to_juvenile_days = fish["to_juvenile_days"].copy()
+            self.to_adult_weight = np.asarray(fish["to_adult_weight"], dtype=dtype)
+            self.to_adult_days = fish["to_adult_days"].copy()
+        else:
+            self.age = None
+        self.day = np.full(K, state.scalar("day"), dtype=np.int64)
+        self.temperature = np.full(K, state.scalar("current_T", "temperature_model"), dtype=dtype)
+        self.dissolved_oxygen = np.full(K, state.scalar("dissolved_oxygen"), dtype=dtype)
+        self.uia = np.full(K, state.scalar("un_ionized_ammonia"), dtype=dtype)
+        self.uia_model.UIA = np.full(K, state.scalar("UIA", "uia_model"), dtype=dtype)
+        self.prev_biomass = np.full(K, state.scalar("prev_biomass"), dtype=dtype)
+        self.growth_model.rho = state.scalar("rho", "growth_model")
+
+    def set_parameters(self, params):
+        """
+        Per-member model constants. `params` maps qualified names to arrays of
+        shape (K,):
+          "ind_growth_model.<name>" / "biomass_model.<name>"  growth constants (kappa, k_min, j, m, ...)
+          "reward.<key>"                                     RewardCost.PRICE_KEYS (P_s, P_f, V, ...)
+          "uia.<name>"                                       tank_volume, decay_rate, pH
+          "thermal.<name>"                                   alpha, beta
+        """
+        for name, values in params.items():
+            section, _, key = name.partition(".")
+            values = np.asarray(values, dtype=self.dtype)
+            if values.shape != (self.n_members,):
+                raise ValueError(f"Parameter '{name}' needs shape ({self.n_members},), got {values.shape}")
+            if section in ("ind_growth_model", "biomass_model"):
+                if getattr(getattr(Config, section), key) is None:
+                    raise ValueError(f"Unknown {section} parameter '{key}'")
+                self.growth_model.overrides[key] = values[:, None]
+            elif section == "reward" and key in RewardCost.PRICE_KEYS:
+                setattr(self.reward_model, key, values)
+            elif section == "uia" and key in self.UIA_PARAMETERS:
+                setattr(self.uia_model, key, values)
+            elif section == "thermal" and key in self.THERMAL_PARAMETERS:
+                setattr(self, key, values)
+            else:
+                raise ValueError(f"Unknown parameter '{name}'. Sections: {self.PARAMETER_SECTIONS}")
+
+    def biomass(self):
+        return self.weights.sum(axis=1) * self.fish_scale
+
+    def stage_biomass(self):
+        # (K, 3) biomass of fingerlings, juveniles and adults, with the stage rule of Fish._compute_stage_code
+        adult = (self.weights >= self.to_adult_weight) | (self.age >= self.to_adult_days)
+        juvenile = ~adult & ((self.weights >= self.to_juvenile_weight) | (self.age >= self.to_juvenile_days))
+        fingerling = ~adult & ~juvenile
+        return np.stack([
+            np.where(mask, self.weights, 0.0).sum(axis=1) for mask in (fingerling, juvenile, adult)
+        ], axis=1) * self.fish_scale
+
+    def ambient_temperature(self):
+        if self.ambient_trace is not None:
+            return self.ambient_trace[self.day]
+        seasonal = self.T_mean + self.T_amp * np.sin(2 * np.pi * (self.day - self.phase_shift) / self.season_period)
+        noise = self.rng.normal(0.0, 1.0, 1 if self.shared_weather else self.n_members)
+        return (seasonal + noise).astype(self.dtype, copy=False)
+
+    def step(self, actions):
+        """
+        Advance every member one day. `actions` has shape (K, 3) or (3,).
+        Returns (reward, terminated), both of shape (K,).
+        """
+        actions = np.asarray(actions, dtype=self.dtype)
+        actions = np.clip(np.broadcast_to(actions, (self.n_members, 3)), self.action_low, self.action_high)
+        feed_rate, temp_setpoint, aeration_rate = actions[:, 0], actions[:, 1], actions[:, 2]
+        self.dissolved_oxygen = aeration_rate.copy()
+
+        # Thermal update; like the env, heating cost and the thermal step see the same ambient value
+        T_amb = self.ambient_temperature()
+        temp_heated = np.maximum(temp_setpoint - T_amb, 0.0)
+        T_set = np.clip(temp_setpoint, self.Tmin, self.Tmax)
+        alpha_eff = np.where(self.temperature < T_set, self.alpha, 0.0).astype(self.dtype, copy=False)
+        T_next = self.temperature + alpha_eff * (T_set - self.temperature) + self.beta * (T_amb - self.temperature)
+        self.temperature = np.clip(T_next, self.Tmin, self.Tmax)
+
+        growth = self.growth_model.compute_growth_array(
+            feed_rate[:, None], self.temperature[:, None], aeration_rate[:, None], self.uia[:, None], self.weights
+        )
+        self.weights += growth
+        if self.age is not None:
+            self.age += (growth >= 0) | (self.rng.random(growth.shape) < 0.3)
+        biomass = self.biomass()
+
+        feed_amount_total = feed_rate * 0.1 * biomass
+        self.uia = self.uia_model.get_uia(feed_amount_total, self.temperature)
+
+        fish_value, feed_cost, heat_cost, oxy_cost = self.reward_model.reward_components(
+            self.prev_biomass, biomass, feed_amount_total, temp_heated, aeration_rate
+        )
+        reward = fish_value - feed_cost - heat_cost - oxy_cost
+
+        self.prev_biomass = biomass
+        self.day += 1
+        terminated = (self.day >= self.max_days) | (biomass <= 100)
+        return reward, terminated
+
+    def rollout(self, action_sequences, gamma=1.0):
+        """
+        Roll every member forward through its own action sequence of shape
+        (K, H, 3). Rewards after a member terminates are ignored.
+        Returns the (discounted) return per member, shape (K,).
+        """
+        horizon = action_sequences.shape[1]
+        returns = np.zeros(self.n_members, dtype=self.dtype)
+        alive = np.ones(self.n_members, dtype=bool)
+        discount = 1.0
+        for h in range(horizon):
+            reward, terminated = self.step(action_sequences[:, h])
+            returns += discount * np.where(alive, reward, 0.0)
+            alive &= ~terminated
+            if not alive.any():
+                break
+            discount *= gamma
+        return returns
+
+    def observations(self):
+        raw = np.stack([
+            self.biomass(),
+            np.full(self.n_members, self.fish_count, dtype=np.float64),
+            self.temperature,
+            self.dissolved_oxygen,
+            self.uia,
+        ], axis=1).astype(np.float32)
+        if self.stage_obs:
+            raw = np.concatenate([raw, self.stage_biomass().astype(np.float32)], axis=1)
+        norm = (raw - self.obs_low) / (self.obs_high - self.obs_low)
+        return np.clip(norm, 0.0, 1.0)
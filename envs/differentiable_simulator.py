@@ -0,0 +1,266 @@
+import math
+import numpy as np
+
+from utils.config import Config
+
+
+class DifferentiableSimulator:
+    """
+    Open-loop AquacultureEnv dynamics with the analytic gradient of episode
+    profit with respect to the whole (H, 3) feed/temperature/aeration schedule.
+
+    The forward pass follows `AquacultureEnv._simulate_day` day by day on an
+    ambient-temperature trace. `profit_and_grad` then runs a hand-derived
+    adjoint (reverse) sweep over the stored intermediates, so one gradient
+    costs about two simulations regardless of the horizon.
+
+    `weather` picks the trace. "seasonal" (the default) is the region's mean
+    seasonal curve, which is all a planner knows at reset. "oracle" is the
+    env's actual episode trace, noise included. It is future weather the
+    agent cannot know, so use it only for upper bounds and for checking the
+    simulator against the env. A 1-D array gives ambient temperatures from
+    day 0 of the episode. Callers may also replace `self.ambient` after
+    `load_env_state`.
+
+    Three branches are replaced by smooth surrogates while `smooth=True`.
+    Heating cost uses softplus(T_set - T_amb) instead of max(., 0), and the
+    heater on/off test uses a sigmoid of (T_set - T); `heat_sharpness` and
+    `heater_sharpness` (1/degC) set their slopes. Anabolism is continued
+    through f == 0, where the env switches it off. The remaining clips (tank
+    temperature bounds, UIA bounds, the sigma/nu ramps) are piecewise linear
+    and use their one-sided derivatives. The biomass <= 100 termination is
+    not modelled. With `smooth=False` and the oracle trace, `simulate`
+    reproduces the env's rewards up to floating-point rounding as long as
+    the biomass stays above that threshold.
+    """
+
+    def __init__(self, env, heat_sharpness=4.0, heater_sharpness=4.0, weather="seasonal"):
+        if isinstance(weather, str) and weather not in ("seasonal", "oracle"):
+            raise ValueError(f"weather must be 'seasonal', 'oracle' or an array, got '{weather}'")
+        self.env = env
+        self.heat_sharpness = heat_sharpness
+        self.heater_sharpness = heater_sharpness
+        self.weather = weather
+        self.action_low = env.action_space.low.astype(np.float64)
+        self.action_high = env.action_space.high.astype(np.float64)
+
+        Config.load()
+        self.ig = Config.ind_growth_model
+        self.bm = Config.biomass_model
+        tm = env.temperature_model
+        self.alpha, self.beta = tm.alpha, tm.beta
+        self.Tmin, self.Tmax = tm.Tmin, tm.Tmax
+        um = env.uia_model
+        self.pH, self.decay, self.volume = um.pH, um.decay_rate, um.tank_volume
+
+        rm = env.reward_model
+        w = rm.weights
+        self.c_value = rm.P_s / 1000 * w["fish_value"]
+        self.c_feed = rm.P_f / 1000 * w["feed"]
+        self.c_heat = rm.P_e * rm.c_p * rm.V * rm.m / 3600 * w["heat"]
+        self.c_oxy = 24 * rm.P_e * rm.P_max * w["oxygenation"]
+        self.load_env_state()
+
+    def load_env_state(self):
+        """Start from the env's current state, with the ambient trace from `weather` for the remaining days."""
+        env = self.env
+        self.day = env.day
+        self.weights = np.array([f.weight for f in env.fishes], dtype=np.float64)
+        self.T0 = float(env.temperature_model.current_T)
+        self.acc0 = float(env.uia_model.UIA)
+        self.U0 = float(env.un_ionized_ammonia)
+        self.B0 = float(env.prev_biomass)
+        self.rho = env.growth_model.rho
+        self.horizon = env.max_days - env.day
+        if isinstance(self.weather, str) and self.weather == "oracle":
+            trace = env.temperature_model.ambient_trace
+            if trace is None or len(trace) < env.max_days:
+                raise ValueError("weather='oracle' needs the env's ambient trace; reset the env first")
+        elif isinstance(self.weather, str):
+            trace = env.temperature_model.seasonal_temperature(np.arange(env.max_days))
+        else:
+            trace = self.weather
+        self.ambient = np.asarray(trace[self.day:env.max_days], dtype=np.float64)
+
+    # Pieces shared by the forward and adjoint passes ------------------------
+
+    def _tau(self, T):
+        # tau and d tau / dT
+        ig = self.ig
+        if T >= ig.T_opt:
+            x, dx = (T - ig.T_opt) / (ig.T_max - ig.T_opt), 1 / (ig.T_max - ig.T_opt)
+        else:
+            x, dx = (ig.T_opt - T) / (ig.T_opt - ig.T_min), -1 / (ig.T_opt - ig.T_min)
+        tau = math.exp(-ig.kappa * x**4)
+        return tau, -ig.kappa * 4 * x**3 * dx * tau
+
+    def _feed_efficiency(self, f, smooth):
+        # Feed response around f_opt = 0.68 with width 0.4, and its derivative
+        if f == 0 and not smooth:
+            return 0.0, 0.0  # the env skips anabolism without feed
+        z = (f - 0.68) / 0.4
+        e = math.exp(-abs(z) ** 2.8)
+        return e, -2.8 * abs(z) ** 1.8 * math.copysign(1.0, z) / 0.4 * e
+
+    def _ramp(self, x, lo, hi):
+        # clip((x - lo) / (hi - lo), 0, 1) and its derivative, one-sided at the ends
+        v = (x - lo) / (hi - lo)
+        if v < 0.0:
+            return 0.0, 0.0
+        if v > 1.0:
+            return 1.0, 0.0
+        return v, 1 / (hi - lo)
+
+    def _uia_fraction(self, T):
+        e = 10 ** (0.09018 + 2729.92 / (T + 273.15) - self.pH)
+        frac = 1 / (1 + e)
+        return frac, frac * frac * e * math.log(10) * 2729.92 / (T + 273.15) ** 2
+
+    # Forward ------------------------------------------------------------------
+
+    def simulate(self, schedule, smooth=True, tape=None):
+        """
+        Run the schedule (H, 3) from the loaded state. Returns per-day rewards.
+        `tape`, if a list, receives the intermediates needed by the adjoint pass.
+        """
+        ig, bm = self.ig, self.bm
+        schedule = np.clip(np.asarray(schedule, dtype=np.float64), self.action_low, self.action_high)
+        H = min(len(schedule), self.horizon)
+        k_ana = ig.h * self.rho * ig.b * (1 - ig.a)
+        tan_per_g = 0.30 * 0.16 * 0.90 * 1000 / self.volume
+
+        w = self.weights.copy()
+        T, acc, U, B_prev = self.T0, self.acc0, self.U0, self.B0
+        rewards = np.zeros(H)
+        for k in range(H):
+            f, S, D = schedule[k]
+            a = self.ambient[k]
+
+            x = S - a
+            if smooth:
+                bh = self.heat_sharpness
+                heated = (max(x, 0.0) + math.log1p(math.exp(-abs(bh * x))) / bh)
+                gate = 1 / (1 + math.exp(-self.heater_sharpness * (S - T)))
+            else:
+                heated = max(x, 0.0)
+                gate = 1.0 if T < S else 0.0
+            T_raw = T + self.alpha * gate * (S - T) + self.beta * (a - T)
+            T_new = min(max(T_raw, self.Tmin), self.Tmax)
+
+            E, dE = self._feed_efficiency(f, smooth)
+            tau, dtau = self._tau(T_new)
+            sg, dsg = self._ramp(D, ig.DO_min, ig.DO_crit)
+            nu, dnu = self._ramp(-U, -ig.UIA_max, -ig.UIA_crit)
+            base = k_ana * w ** bm.m
+            A = base * (E * tau * sg * nu)
+            C = ig.k_min * math.exp(ig.j * (T_new - ig.T_min)) * w ** bm.n
+            s = 1 / (1 + np.exp(ig.slowdown_gamma * (w - ig.w_threshold)))
+            w_new = w + (A - C) * s
+            B = w_new.sum()
+
+            F = f * 0.1 * B
+            L = F / (1 + ig.UIA_slowdown * F)
+            frac, dfrac = self._uia_fraction(T_new)
+            acc_new = acc * (1 - self.decay) + L * tan_per_g * frac
+            U_new = min(max(acc_new, 0.06), 1.8)
+
+            rewards[k] = (self.c_value * (B - B_prev) - self.c_feed * F
+                          - self.c_heat * heated - self.c_oxy * D)
+
+            if tape is not None:
+                tape.append((f, S, D, a, x, gate, T, T_raw, E, dE, tau, dtau, sg, dsg, nu, dnu,
+                             w, base, A, C, s, B, F, frac, dfrac, acc_new, L))
+            w, T, acc, U, B_prev = w_new, T_new, acc_new, U_new, B
+        return rewards
+
+    # Adjoint ------------------------------------------------------------------
+
+    def profit_and_grad(self, schedule, smooth=True):
+        """
+        Episode profit of `schedule` (H, 3) and its gradient with respect to
+        every entry, shape (H, 3). Entries outside the action bounds get the
+        gradient of their clipped value.
+        """
+        ig, bm = self.ig, self.bm
+        tape = []
+        rewards = self.simulate(schedule, smooth=smooth, tape=tape)
+        H = len(tape)
+        tan_per_g = 0.30 * 0.16 * 0.90 * 1000 / self.volume
+        bh, bt = self.heat_sharpness, self.heater_sharpness
+
+        grad = np.zeros((len(schedule), 3))
+        lam_w = np.zeros_like(self.weights)
+        lam_T = lam_acc = lam_U = 0.0
+        for k in reversed(range(H)):
+            (f, S, D, a, x, gate, T, T_raw, E, dE, tau, dtau, sg, dsg, nu, dnu,
+             w, base, A, C, s, B, F, frac, dfrac, acc_new, L) = tape[k]
+
+            # Reward: B enters today's value gain and, as B_prev, tomorrow's
+            lam_B = self.c_value - (self.c_value if k + 1 < H else 0.0)
+            lam_F = -self.c_feed
+            if smooth:
+                d_heated = 1 / (1 + math.exp(-bh * x))
+            else:
+                d_heated = 1.0 if x > 0 else 0.0
+            g_S = -self.c_heat * d_heated
+            g_D = -self.c_oxy
+
+            # UIA accumulator; lam_U arrives from tomorrow's growth through clip(acc_new)
+            lam_accn = lam_acc + (lam_U if 0.06 < acc_new < 1.8 else 0.0)
+            lam_acc = lam_accn * (1 - self.decay)
+            lam_L = lam_accn * tan_per_g * frac
+            lam_Tn = lam_T + lam_accn * L * tan_per_g * dfrac
+            lam_F += lam_L / (1 + ig.UIA_slowdown * F) ** 2
+
+            # Feed and biomass
+            g_f = lam_F * 0.1 * B
+            lam_B += lam_F * 0.1 * f
+            lam_wn = lam_w + lam_B
+
+            # Growth g = (A - C) * s per fish
+            lam_g = lam_wn * s
+            factors = E * tau * sg * nu
+            g_f += np.dot(lam_g, base) * dE * tau * sg * nu
+            g_D += np.dot(lam_g, base) * E * tau * dsg * nu
+            lam_Tn += np.dot(lam_g, base * E * dtau * sg * nu - C * ig.j)
+            lam_U = -np.dot(lam_g, base) * E * tau * sg * dnu  # nu ramps on -U
+            ds = -ig.slowdown_gamma * s * (1 - s)
+            dg_dw = (base * factors * bm.m - C * bm.n) / w * s + (A - C) * ds
+            lam_w = lam_wn * (1 + dg_dw)
+
+            # Thermal step
+            lam_Traw = lam_Tn if self.Tmin < T_raw < self.Tmax else 0.0
+            if smooth:
+                dgate = gate * (1 - gate) * bt
+            else:
+                dgate = 0.0
+            g_S += lam_Traw * self.alpha * (gate + (S - T) * dgate)
+            lam_T = lam_Traw * (1 - self.alpha * gate - self.beta - self.alpha * (S - T) * dgate)
+
+            grad[k] = g_f, g_S, g_D
+
+        # Entries clipped in the forward pass do not move the result
+        schedule = np.asarray(schedule, dtype=np.float64)
+        grad[:H] *= (schedule[:H] >= self.action_low) & (schedule[:H] <= self.action_high)
+        return rewards.sum(), grad
+
+    def check_gradient(self, schedule, n_checks=10, eps=1e-5, smooth=True, seed=None):
+        """
+        Compare the adjoint gradient with central finite differences at
+        `n_checks` random entries. Returns the max relative error and the pairs.
+        """
+        rng = np.random.default_rng(seed)
+        schedule = np.asarray(schedule, dtype=np.float64)
+        _, grad = self.profit_and_grad(schedule, smooth=smooth)
+        pairs = []
+        for _ in range(n_checks):
+            k, i = rng.integers(min(len(schedule), self.horizon)), rng.integers(3)
+            step = eps * (self.action_high[i] - self.action_low[i])
+            plus, minus = schedule.copy(), schedule.copy()
+            plus[k, i] += step
+            minus[k, i] -= step
+            fd = (self.simulate(plus, smooth).sum() - self.simulate(minus, smooth).sum()) / (2 * step)
+            pairs.append((grad[k, i], fd))
+        pairs = np.array(pairs)
+        scale = np.maximum(np.abs(pairs).max(axis=1), 1e-8)
+        return float((np.abs(pairs[:, 0] - pairs[:, 1]) / scale).max()), pairs
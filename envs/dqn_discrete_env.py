@@ -2,10 +2,11 @@ from gymnasium import Env
 from gymnasium.spaces import Discrete
 import numpy as np
 from envs.aquaculture_env import AquacultureEnv
+from envs.action_mask import ActionPruner
 
 class DiscretizedAquacultureEnv(Env):
-    def __init__(self, region="guangdong"):
-        self.base_env = AquacultureEnv(region=region)
+    def __init__(self, region="guangdong", reuse_buffers=False, substeps=1, prune_feed=False):
+        self.base_env = AquacultureEnv(region=region, reuse_buffers=reuse_buffers, substeps=substeps)
         
         self.feed_bins = 40
         self.temp_bins = 16
@@ -17,19 +18,32 @@ class DiscretizedAquacultureEnv(Env):
             for temp in np.linspace(self.base_env.action_space.low[1], self.base_env.action_space.high[1], self.temp_bins)
             for air in np.linspace(self.base_env.action_space.low[2], self.base_env.action_space.high[2], self.air_bins)
         ]
-        
+        # Same actions as one float32 table, so step() indexes a row instead of converting a tuple
+        self.action_table = np.array(self.discrete_actions, dtype=np.float32)
+        # Dominated actions for the current tank temperature, reported as info["action_mask"]
+        self.pruner = ActionPruner(self.action_table, prune_setpoints=substeps == 1, prune_feed=prune_feed)
+
         self.action_space = Discrete(len(self.discrete_actions))
         self.observation_space = self.base_env.observation_space
 
+    def action_masks(self):
+        return self.pruner.mask(self.base_env.temperature)
+
     def reset(self, **kwargs):
         obs, info = self.base_env.reset(**kwargs)
+        info["action_mask"] = self.action_masks()
         return obs, info
 
     def step(self, action_idx):
-        action = np.array(self.discrete_actions[action_idx], dtype=np.float32)
+        action = self.action_table[action_idx]
         obs, reward, terminated, truncated, info = self.base_env.step(action)
+        info["action_mask"] = self.action_masks()
         return obs, reward, terminated, truncated, info
 
+    def step_n(self, action_idx, days, return_daily=False):
+        action = self.action_table[action_idx]
+        return self.base_env.step_n(action, days, return_daily=return_daily)
+
     def render(self, mode='human'):
         return self.base_env.render()
 
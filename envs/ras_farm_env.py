@@ -0,0 +1,138 @@
+import numpy as np
+import gymnasium as gym
+from gymnasium import spaces
+
+from model.fish import Fish
+from model.individual_growth_model import IndividualGrowthModel
+from model.temperature_model import TemperatureModel
+from model.reward_cost import RewardCost
+from model.ras_farm_model import RASFarmModel
+
+
+class RASFarmEnv(gym.Env):
+    """
+    Farm of `n_tanks` tanks sharing one recirculating water treatment loop.
+
+    One controller sets a feeding rate per tank plus the shared heater
+    setpoint and aeration. Tank temperatures and TAN/UIA are advanced together
+    by RASFarmModel. Each tank's fish grow with IndividualGrowthModel
+    (vectorized over a (n_tanks, fish_per_tank) weight array). The reward uses
+    the same RewardCost terms as AquacultureEnv, summed over the farm.
+    """
+
+    metadata = {"render_modes": []}
+    ALLOWED_REGIONS = ["guangdong", "north_sulawesi", "kafr_el_sheikh"]
+
+    def __init__(self, region="guangdong", n_tanks=8, fish_per_tank=100, reward_weights=None):
+        if region not in self.ALLOWED_REGIONS:
+            raise ValueError(f"Invalid region '{region}'. Allowed regions: {self.ALLOWED_REGIONS}")
+        super().__init__()
+
+        self.region = region
+        self.n_tanks = n_tanks
+        self.fish_per_tank = fish_per_tank
+        self.max_days = 180
+
+        # Observation: per tank [biomass g, temperature degC, UIA mg/L], then shared [DO mg/L, sump temperature degC],
+        # normalized with the same bounds as AquacultureEnv
+        tank_low = np.array([50, 24, 0.06], dtype=np.float32)
+        tank_high = np.array([3e7, 40, 1.8], dtype=np.float32)
+        self.obs_low = np.concatenate([np.tile(tank_low, n_tanks), [0.3, 24]]).astype(np.float32)
+        self.obs_high = np.concatenate([np.tile(tank_high, n_tanks), [1.0, 40]]).astype(np.float32)
+        self.observation_space = spaces.Box(
+            low=np.zeros_like(self.obs_low),
+            high=np.ones_like(self.obs_high),
+            dtype=np.float32
+        )
+
+        # Action: [f_1 .. f_N] feeding rate per tank [0, 1], then shared T_set [24, 40] and DO_set [0.3, 1]
+        self.action_space = spaces.Box(
+            low=np.concatenate([np.zeros(n_tanks), [24.0, 0.3]]).astype(np.float32),
+            high=np.concatenate([np.ones(n_tanks), [40.0, 1.0]]).astype(np.float32),
+            dtype=np.float32
+        )
+
+        self.growth_model = IndividualGrowthModel()
+        self.temperature_model = TemperatureModel(region=region)
+        self.farm = RASFarmModel(n_tanks)
+        self.reward_model = RewardCost(region=region, weights=reward_weights)
+        # Heating is priced per volume heated: all tanks plus the sump, relative to the single-tank V
+        self.heat_scale = (self.farm.tank_volume.sum() + self.farm.sump_volume) / self.reward_model.V
+
+        self.reset()
+
+    def _biomass(self):
+        return self.weights.sum(axis=1)
+
+    def _get_observation(self):
+        per_tank = np.stack([self.prev_biomass, self.farm.T, self.uia], axis=1).ravel()
+        raw = np.concatenate([per_tank, [self.dissolved_oxygen, self.farm.T_sump]]).astype(np.float32)
+        norm = (raw - self.obs_low) / (self.obs_high - self.obs_low)
+        return np.clip(norm, 0.0, 1.0)
+
+    def step(self, action):
+        action = np.clip(action, self.action_space.low, self.action_space.high)
+        feed_rate = action[:self.n_tanks].astype(np.float64)
+        temp_setpoint, aeration_rate = float(action[-2]), float(action[-1])
+
+        self.dissolved_oxygen = aeration_rate
+        self.temperature_model.set_day_of_year(self.day)
+        ambient_temp = self.temperature_model.get_ambient_temperature()
+        temp_heated = max(temp_setpoint - ambient_temp, 0.0)
+        T = self.farm.step_temperature(temp_setpoint, ambient_temp)
+
+        # Growth sees today's temperature and yesterday's UIA, as in AquacultureEnv
+        self.weights += self.growth_model.compute_growth_array(
+            feed_rate[:, None], T[:, None], self.dissolved_oxygen, self.uia[:, None], self.weights
+        )
+        np.maximum(self.weights, 0.0, out=self.weights)
+        biomass = self._biomass()
+
+        feed_amount = feed_rate * 0.1 * biomass
+        self.uia = np.clip(self.farm.step_water_quality(feed_amount), 0.06, 1.8)
+
+        fish_value, feed_cost, heat_cost, oxy_cost = self.reward_model.reward_components(
+            self.prev_biomass, biomass, feed_amount, temp_heated * self.heat_scale, self.dissolved_oxygen * self.n_tanks
+        )
+        fish_value, feed_cost = fish_value.sum(), feed_cost.sum()
+        reward = fish_value - feed_cost - heat_cost - oxy_cost
+
+        biomass_gain = biomass - self.prev_biomass
+        self.prev_biomass = biomass
+        self.day += 1
+
+        obs = self._get_observation()
+        terminated = bool(self.day >= self.max_days or biomass.sum() <= 100 * self.n_tanks)
+        info = {
+            "biomass": biomass,
+            "biomass_gain": biomass_gain,
+            "uia": self.uia,
+            "temperature": T,
+            "sump_temperature": self.farm.T_sump,
+            "feed_amount": feed_amount,
+            "dissolved_oxygen": self.dissolved_oxygen,
+            "reward": reward,
+            "fish_value": fish_value,
+            "feed_cost": feed_cost,
+            "heat_cost": heat_cost,
+            "oxygenation_cost": oxy_cost
+        }
+        return obs, float(reward), terminated, False, info
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        if seed is not None:
+            np.random.seed(seed)
+
+        self.day = 0
+        self.weights = Fish.sample_initial_weights((self.n_tanks, self.fish_per_tank))
+        self.prev_biomass = self._biomass()
+
+        self.temperature_model.reset()
+        self.temperature_model.generate_ambient_trace(self.max_days + 1)
+        ambient_temp = self.temperature_model.get_ambient_temperature()
+        self.farm.reset(temperature=ambient_temp)
+
+        self.dissolved_oxygen = 0.6
+        self.uia = np.full(self.n_tanks, 0.06)
+        return self._get_observation(), {}
@@ -0,0 +1,268 @@
+import multiprocessing as mp
+import time
+import numpy as np
+
+from model.fish import FishStage
+
+_SCALARS = (
+    "day", "fish_count", "biomass", "temperature", "ambient_temperature", "dissolved_oxygen",
+    "uia", "feed_rate_today", "feed_rate_yesterday", "feed_today",
+)
+
+
+def snapshot_dtype(n_fish):
+    # One published frame of env state: what Renderer draws, nothing more
+    return np.dtype([
+        ("seq", np.int64),
+        ("day", np.int64),
+        ("fish_count", np.int64),
+        ("biomass", np.float64),
+        ("temperature", np.float64),
+        ("ambient_temperature", np.float64),
+        ("dissolved_oxygen", np.float64),
+        ("uia", np.float64),
+        ("feed_rate_today", np.float64),
+        ("feed_rate_yesterday", np.float64),
+        ("feed_today", np.float64),
+        ("weight", np.float32, (n_fish,)),
+        ("to_juvenile_weight", np.float32, (n_fish,)),
+        ("stage_code", np.int8, (n_fish,)),
+    ])
+
+
+class SnapshotRing:
+    """
+    Fixed-size ring of env snapshots in one shared ctypes block, written by
+    the simulation process and read by the render process without locks.
+
+    Every slot carries a sequence number that the writer sets to -1 while it
+    fills the slot and to the snapshot's number once it is complete; the
+    header holds the number of the last complete snapshot. A reader copies
+    the newest slot and keeps the copy only if its sequence number did not
+    change meanwhile, so it never sees a torn frame and never waits.
+    """
+
+    def __init__(self, raw, n_fish, capacity):
+        self.n_fish = n_fish
+        self.capacity = capacity
+        self.dtype = snapshot_dtype(n_fish)
+        self.head = np.frombuffer(raw, dtype=np.int64, count=1)
+        self.slots = np.frombuffer(raw, dtype=self.dtype, count=capacity, offset=8)
+
+    @staticmethod
+    def nbytes(n_fish, capacity):
+        return 8 + capacity * snapshot_dtype(n_fish).itemsize
+
+    def write(self, snapshot):
+        seq = int(self.head[0]) + 1
+        slot = self.slots[seq % self.capacity]
+        slot["seq"] = -1
+        for name in self.dtype.names[1:]:
+            slot[name] = snapshot[name]
+        slot["seq"] = seq
+        self.head[0] = seq
+        return seq
+
+    def latest(self):
+        # Newest complete snapshot as a private copy, or None before the first write
+        for _ in range(3):
+            seq = int(self.head[0])
+            if seq == 0:
+                return None
+            slot = self.slots[seq % self.capacity]
+            copy = slot.copy()
+            if copy["seq"] == seq and slot["seq"] == seq:
+                return copy
+        return None
+
+
+def capture_snapshot(env, dtype=None):
+    """Snapshot of `env` as a 0-d structured array of `snapshot_dtype(initial_fish_count)`."""
+    n = env.initial_fish_count
+    snap = np.zeros((), dtype=dtype or snapshot_dtype(n))
+    fishes = env.fishes[:n]
+    count = len(fishes)
+    snap["day"] = env.day
+    snap["fish_count"] = count
+    snap["biomass"] = env._compute_total_biomass()
+    snap["temperature"] = env.temperature
+    snap["ambient_temperature"] = env.temperature_model.get_ambient_temperature()
+    snap["dissolved_oxygen"] = env.dissolved_oxygen
+    snap["uia"] = env.un_ionized_ammonia
+    snap["feed_rate_today"] = env.feed_rate_today
+    snap["feed_rate_yesterday"] = env.feed_rate_yesterday
+    snap["feed_today"] = env.feed_today
+    snap["weight"][:count] = [f.weight for f in fishes]
+    snap["to_juvenile_weight"][:count] = [f.to_juvenile_weight for f in fishes]
+    snap["stage_code"][:count] = [f.stage_code for f in fishes]
+    return snap
+
+
+class _FishView:
+    __slots__ = ("weight", "stage_code", "to_juvenile_weight")
+
+    @property
+    def stage(self):
+        return FishStage.NAMES[self.stage_code]
+
+
+class _AmbientView:
+    def __init__(self):
+        self.ambient = 0.0
+
+    def get_ambient_temperature(self):
+        return self.ambient
+
+
+class SnapshotView:
+    """Read-only stand-in for AquacultureEnv that Renderer draws from a snapshot."""
+
+    def __init__(self, region, n_fish):
+        self.region = region
+        self.initial_fish_count = n_fish
+        self.temperature_model = _AmbientView()
+        self.fishes = []
+        self.biomass = 0.0
+        self.day = 0
+        self.temperature = 0.0
+        self.dissolved_oxygen = 0.6
+        self.un_ionized_ammonia = 0.06
+        self.feed_rate_today = 0.0
+        self.feed_rate_yesterday = 0.0
+        self.feed_today = 0.0
+
+    def update(self, snap):
+        self.day = int(snap["day"])
+        self.biomass = float(snap["biomass"])
+        self.temperature = float(snap["temperature"])
+        self.temperature_model.ambient = float(snap["ambient_temperature"])
+        self.dissolved_oxygen = float(snap["dissolved_oxygen"])
+        self.un_ionized_ammonia = float(snap["uia"])
+        self.feed_rate_today = float(snap["feed_rate_today"])
+        self.feed_rate_yesterday = float(snap["feed_rate_yesterday"])
+        self.feed_today = float(snap["feed_today"])
+        count = int(snap["fish_count"])
+        if len(self.fishes) != count:
+            self.fishes = [_FishView() for _ in range(count)]
+        for fish, w, juv_w, code in zip(self.fishes, snap["weight"][:count].tolist(),
+                                        snap["to_juvenile_weight"][:count].tolist(),
+                                        snap["stage_code"][:count].tolist()):
+            fish.weight = w
+            fish.to_juvenile_weight = juv_w
+            fish.stage_code = code
+
+    def _compute_total_biomass(self):
+        return self.biomass
+
+    def _compute_fish_count(self):
+        return len(self.fishes)
+
+
+def _render_loop(raw, region, n_fish, capacity, fps, stop):
+    from envs.renderer import Renderer
+
+    ring = SnapshotRing(raw, n_fish, capacity)
+    view = SnapshotView(region, n_fish)
+    renderer = Renderer(view)
+    frame = 1.0 / fps
+    last_seq = 0
+    try:
+        while not stop.is_set():
+            start = time.perf_counter()
+            snap = ring.latest()
+            if snap is not None and snap["seq"] != last_seq:
+                # Only the newest snapshot is drawn; any published since the last frame are dropped
+                if snap["day"] < view.day:
+                    renderer.reset()
+                view.update(snap)
+                last_seq = int(snap["seq"])
+            if last_seq:
+                was_open = renderer.pygame_initialized
+                renderer.render()
+                if was_open and not renderer.pygame_initialized:
+                    break  # window closed
+            time.sleep(max(frame - (time.perf_counter() - start), 0.0))
+    finally:
+        renderer.close()
+
+
+class RenderProcess:
+    """
+    Draws env snapshots in a separate process at a fixed frame rate.
+
+    `publish(env)` copies the few arrays and scalars the renderer needs into
+    a SnapshotRing and returns immediately. The render process wakes every
+    1 / fps seconds, draws the newest snapshot and keeps animating fish and
+    particles between snapshots, so a slow window never slows stepping and
+    fast stepping simply skips frames. With `record=True` every published
+    snapshot is also kept for `save_recording` and `replay`.
+    """
+
+    def __init__(self, region="guangdong", n_fish=100, fps=30, capacity=8, record=False, start_method=None):
+        self.region = region
+        self.n_fish = n_fish
+        self.dtype = snapshot_dtype(n_fish)
+        self.record = record
+        self.recording = []
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+        raw = ctx.RawArray("b", SnapshotRing.nbytes(n_fish, capacity))
+        self.ring = SnapshotRing(raw, n_fish, capacity)
+        self.stop_event = ctx.Event()
+        self.process = ctx.Process(
+            target=_render_loop, args=(raw, region, n_fish, capacity, fps, self.stop_event), daemon=True
+        )
+        self.process.start()
+
+    @property
+    def alive(self):
+        return self.process.is_alive()
+
+    def publish(self, env):
+        snap = capture_snapshot(env, self.dtype)
+        self.publish_snapshot(snap)
+        return snap
+
+    def publish_snapshot(self, snap):
+        self.ring.write(snap)
+        if self.record:
+            self.recording.append(snap)
+
+    def save_recording(self, path):
+        np.save(path, np.stack(self.recording) if self.recording else np.zeros(0, dtype=self.dtype))
+
+    def replay(self, recording, days_per_second=30.0):
+        """
+        Publish a recorded episode (array of snapshots, or a path saved by
+        `save_recording`) at `days_per_second`; returns when it has been sent.
+        """
+        if isinstance(recording, str):
+            recording = np.load(recording)
+        interval = 1.0 / days_per_second
+        next_time = time.perf_counter()
+        for snap in recording:
+            if not self.alive:
+                break
+            self.ring.write(snap)
+            next_time += interval
+            time.sleep(max(next_time - time.perf_counter(), 0.0))
+
+    def close(self, timeout=2.0):
+        self.stop_event.set()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+def replay(recording, region="guangdong", days_per_second=30.0, fps=30, hold=1.0):
+    """Open a render window and play a recording saved by RenderProcess.save_recording."""
+    if isinstance(recording, str):
+        recording = np.load(recording)
+    n_fish = recording.dtype["weight"].shape[0]
+    process = RenderProcess(region, n_fish, fps=fps)
+    try:
+        process.replay(recording, days_per_second)
+        time.sleep(hold)
+    finally:
+        process.close()
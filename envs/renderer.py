@@ -2,6 +2,8 @@ import pygame
 import random
 import numpy as np
 
+from model.fish import FishStage
+
 class Renderer:
     def __init__(self, env):
         self.env = env
@@ -27,6 +29,8 @@ class Renderer:
         self.feeder_img = None
         self.airpump_img = None
 
+        # Own generator: drawing must not consume the `random` stream the env's fish aging uses
+        self.rng = random.Random()
         self.fish_positions = []
         self.heat_particles = []
         self.feed_particles = []
@@ -42,12 +46,12 @@ class Renderer:
             attempts = 0
             max_attempts = 200
             while attempts < max_attempts:
-                angle = random.uniform(0, 2 * np.pi)
-                r = random.uniform(0, 1) ** 0.5
+                angle = self.rng.uniform(0, 2 * np.pi)
+                r = self.rng.uniform(0, 1) ** 0.5
                 x = self.tank_center_x + int(r * (self.tank_radius_x - 50) * np.cos(angle))
                 y = self.tank_center_y + int(r * (self.tank_radius_y - 50) * np.sin(angle))
-                dx = random.uniform(-1, 1) * 0.5
-                dy = random.uniform(-1, 1) * 0.5
+                dx = self.rng.uniform(-1, 1) * 0.5
+                dy = self.rng.uniform(-1, 1) * 0.5
 
                 too_close = False
                 for px, py, _, _ in placed_positions:
@@ -69,8 +73,8 @@ class Renderer:
             if attempts >= max_attempts:
                 x = self.tank_center_x
                 y = self.tank_center_y
-                dx = random.uniform(-1, 1) * 0.5
-                dy = random.uniform(-1, 1) * 0.5
+                dx = self.rng.uniform(-1, 1) * 0.5
+                dy = self.rng.uniform(-1, 1) * 0.5
                 self.fish_positions.append([x, y, dx, dy])
                 placed_positions.append([x, y, dx, dy])
 
@@ -191,7 +195,7 @@ class Renderer:
             x, y, _, _ = self.fish_positions[i]
             weight = fish.weight
 
-            if fish.stage.lower() == "adult":
+            if fish.stage_code == FishStage.ADULT_CODE:
                 min_w, max_w = 50.0, 1000.0
                 min_s, max_s = 0.5, 1.5
                 if weight <= min_w:
@@ -202,7 +206,7 @@ class Renderer:
                     scale = min_s + (max_s - min_s) * (weight - min_w) / (max_w - min_w)
                 fish_image = self.fish_adult_img
 
-            elif fish.stage.lower() == "juvenile":
+            elif fish.stage_code == FishStage.JUVENILE_CODE:
                 min_w, max_w = 50.0, 1000.0
                 min_s, max_s = 0.5, 1.5
                 if weight <= min_w:
@@ -307,13 +311,13 @@ class Renderer:
 
         if self.env.feed_rate_today > 0:
             particle_spawn_rate = self.env.feed_rate_today * 0.5
-            if random.random() < particle_spawn_rate:
+            if self.rng.random() < particle_spawn_rate:
                 particle_x = horizontal_end_x
                 particle_y = pipe_start_y
-                particle_vx = random.uniform(-0.5, 0.5)
-                particle_vy = random.uniform(1, 2)
-                particle_radius = random.randint(2, 4)
-                particle_life = random.randint(60, 90)
+                particle_vx = self.rng.uniform(-0.5, 0.5)
+                particle_vy = self.rng.uniform(1, 2)
+                particle_radius = self.rng.randint(2, 4)
+                particle_life = self.rng.randint(60, 90)
                 particle_color = (139, 69, 19)
                 self.feed_particles.append([particle_x, particle_y, particle_vx, particle_vy, particle_radius, particle_life, particle_color])
 
@@ -402,13 +406,13 @@ class Renderer:
         tip_height = 35
         pygame.draw.rect(self.screen, pipe_color, (horizontal_end_x - tip_width // 2, pipe_start_y - tip_height // 2, tip_width, tip_height))
 
-        if random.random() < 0.3:
+        if self.rng.random() < 0.3:
             particle_x = horizontal_end_x
             particle_y = pipe_start_y
-            particle_vx = random.uniform(-0.2, 0.2)
-            particle_vy = random.uniform(-1.5, -0.5)
-            particle_radius = random.randint(3, 6)
-            particle_life = random.randint(60, 90)
+            particle_vx = self.rng.uniform(-0.2, 0.2)
+            particle_vy = self.rng.uniform(-1.5, -0.5)
+            particle_radius = self.rng.randint(3, 6)
+            particle_life = self.rng.randint(60, 90)
             particle_color = (200, 200, 255)
             self.bubble_particles.append([particle_x, particle_y, particle_vx, particle_vy, particle_radius, particle_life, particle_color])
 
@@ -457,14 +461,14 @@ class Renderer:
 
         # Spawn heat particles based on temp_heated
         particle_spawn_rate = temp_heated * 0.1  # Scale particle spawn rate with temp_heated
-        if random.random() < particle_spawn_rate:
-            particle_x = random.uniform(heater_x, heater_x + heater_width)
+        if self.rng.random() < particle_spawn_rate:
+            particle_x = self.rng.uniform(heater_x, heater_x + heater_width)
             particle_y = heater_y
-            particle_vy = random.uniform(-2, -1)
-            particle_vx = random.uniform(-0.2, 0.2)
-            particle_radius = random.randint(2, 4)
-            particle_life = random.randint(30, 60)
-            particle_color = (255, random.randint(69, 165), 0)
+            particle_vy = self.rng.uniform(-2, -1)
+            particle_vx = self.rng.uniform(-0.2, 0.2)
+            particle_radius = self.rng.randint(2, 4)
+            particle_life = self.rng.randint(30, 60)
+            particle_color = (255, self.rng.randint(69, 165), 0)
             self.heat_particles.append([particle_x, particle_y, particle_vx, particle_vy, particle_radius, particle_life, particle_color])
 
         new_particles = []
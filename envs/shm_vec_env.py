@@ -0,0 +1,331 @@
+import multiprocessing as mp
+import numbers
+import traceback
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnv
+
+# Commands written to the shared command slot of a worker before waking it
+_CMD_STEP = 0
+_CMD_RESET = 1
+_CMD_REMOTE = 2
+_CMD_CLOSE = 3
+
+
+class _SharedBuffers:
+    """
+    NumPy views over one shared ctypes block: actions, observations,
+    terminal observations, rewards, terminated/truncated flags and the
+    optional per-step info fields requested through `info_keys`.
+    """
+
+    def __init__(self, raw, num_envs, obs_shape, obs_dtype, act_shape, act_dtype, n_info):
+        layout = [
+            ("actions", (num_envs, *act_shape), act_dtype),
+            ("obs", (num_envs, *obs_shape), obs_dtype),
+            ("terminal_obs", (num_envs, *obs_shape), obs_dtype),
+            ("rewards", (num_envs,), np.float64),
+            ("dones", (num_envs,), np.bool_),
+            ("truncated", (num_envs,), np.bool_),
+            ("info", (num_envs, n_info), np.float64),
+            ("commands", (num_envs,), np.int32),  # one slot per worker; n_workers <= num_envs
+            ("failed", (num_envs,), np.bool_),  # per worker: set when the last command raised
+        ]
+        offset = 0
+        for name, shape, dtype in layout:
+            dtype = np.dtype(dtype)
+            offset = -(-offset // dtype.alignment) * dtype.alignment
+            count = int(np.prod(shape))
+            setattr(self, name, np.frombuffer(raw, dtype=dtype, count=count, offset=offset).reshape(shape))
+            offset += count * dtype.itemsize
+
+    @staticmethod
+    def nbytes(num_envs, obs_shape, obs_dtype, act_shape, act_dtype, n_info):
+        per_env = (
+            np.prod(act_shape, dtype=int) * np.dtype(act_dtype).itemsize
+            + 2 * np.prod(obs_shape, dtype=int) * np.dtype(obs_dtype).itemsize
+            + 8 + 2 + 8 * n_info + 4 + 1
+        )
+        return int(num_envs * per_env) + 64  # slack for alignment padding
+
+
+def _remote_command(name, targets, infos, reset_infos, args, kwargs):
+    if name == "get_attr":
+        return [env.get_wrapper_attr(args[0]) for env in targets]
+    if name == "set_attr":
+        return [setattr(env, args[0], args[1]) for env in targets]
+    if name == "env_method":
+        return [env.get_wrapper_attr(args[0])(*args[1], **kwargs) for env in targets]
+    if name == "get_infos":
+        return infos
+    if name == "get_reset_infos":
+        return reset_infos
+    if name == "is_wrapped":
+        from stable_baselines3.common.env_util import is_wrapped
+        return [is_wrapped(env, args[0]) for env in targets]
+    if name == "render":
+        return [env.render() for env in targets]
+    raise NotImplementedError(f"`{name}` is not implemented in the worker")
+
+
+def _worker(worker_idx, env_fns_wrapper, raw, buffer_args, env_slice, wake, finished, remote, info_keys):
+    buffers = _SharedBuffers(raw, *buffer_args)
+    envs = [fn() for fn in env_fns_wrapper.var]
+    start = env_slice.start
+    last_infos = [{} for _ in envs]
+    reset_infos = [{} for _ in envs]
+
+    while True:
+        wake.wait()
+        wake.clear()
+        cmd = buffers.commands[worker_idx]
+
+        if cmd == _CMD_STEP:
+            try:
+                for i, env in enumerate(envs):
+                    j = start + i
+                    action = buffers.actions[j]
+                    obs, reward, terminated, truncated, info = env.step(action)
+                    done = terminated or truncated
+                    if done:
+                        buffers.terminal_obs[j] = obs
+                        obs, reset_infos[i] = env.reset()
+                    buffers.obs[j] = obs
+                    buffers.rewards[j] = reward
+                    buffers.dones[j] = done
+                    buffers.truncated[j] = truncated and not terminated
+                    for k, key in enumerate(info_keys):
+                        value = info.get(key, np.nan)
+                        if not isinstance(value, (numbers.Real, np.bool_)):
+                            raise TypeError(f"info field '{key}' must be a real scalar to be shared, "
+                                            f"got {type(value).__name__}")
+                        buffers.info[j, k] = value
+                    last_infos[i] = info
+            except Exception:
+                # Reported through the pipe; the parent reads it only when the flag is set
+                buffers.failed[worker_idx] = True
+                remote.send(traceback.format_exc())
+
+        elif cmd == _CMD_RESET:
+            seeds, options = remote.recv()
+            try:
+                for i, env in enumerate(envs):
+                    maybe_options = {"options": options[i]} if options[i] else {}
+                    obs, reset_infos[i] = env.reset(seed=seeds[i], **maybe_options)
+                    buffers.obs[start + i] = obs
+            except Exception:
+                buffers.failed[worker_idx] = True
+                remote.send(traceback.format_exc())
+            else:
+                remote.send(list(reset_infos))
+
+        elif cmd == _CMD_REMOTE:
+            name, local_indices, args, kwargs = remote.recv()
+            targets = [envs[i] for i in local_indices]
+            try:
+                remote.send(_remote_command(
+                    name, targets, [last_infos[i] for i in local_indices],
+                    [reset_infos[i] for i in local_indices], args, kwargs,
+                ))
+            except Exception as e:
+                remote.send(e)
+
+        elif cmd == _CMD_CLOSE:
+            for env in envs:
+                env.close()
+            remote.close()
+            finished.set()
+            break
+
+        finished.set()
+
+
+class ShmVecEnv(VecEnv):
+    """
+    Subprocess VecEnv that exchanges step data through shared memory.
+
+    Each of `n_workers` processes hosts a contiguous slice of the envs and
+    steps them back to back. Actions, observations, rewards and done flags
+    live in shared NumPy buffers and the parent and workers only exchange
+    Event signals, so nothing is pickled on the step path. Per-step infos
+    carry only what SB3 needs (`terminal_observation`,
+    `TimeLimit.truncated`) plus the numeric fields named in `info_keys`.
+    Full info dicts stay in the workers until `get_infos()` is called.
+    `info_keys` fields must be real scalars (they are stored as float64);
+    anything else makes the step fail with a TypeError. Likewise the reset
+    infos of automatic resets inside `step` are not transferred and
+    `reset_infos` only reflects explicit `reset()` calls; fetch the latest
+    ones with `get_reset_infos()`.
+
+    An exception in a worker's step or reset is re-raised in the parent as
+    a RuntimeError carrying the worker's traceback, and a worker that dies
+    raises EOFError instead of blocking the parent.
+
+    Wrap in `VecMonitor` for episode statistics; per-env Monitor wrappers
+    would report through the info dicts this class does not transfer.
+    """
+
+    def __init__(self, env_fns, n_workers=None, info_keys=(), start_method=None, poll_interval=1.0):
+        self.closed = False
+        self.waiting = False
+        num_envs = len(env_fns)
+        n_workers = min(n_workers or mp.cpu_count(), num_envs)
+        self.info_keys = tuple(info_keys)
+        self.poll_interval = poll_interval
+
+        # Probe spaces in the parent so the shared block can be sized before workers start
+        probe = env_fns[0]()
+        observation_space, action_space = probe.observation_space, probe.action_space
+        probe.close()
+        if isinstance(action_space, spaces.Discrete):
+            act_shape, act_dtype = (), np.int64
+        else:
+            act_shape, act_dtype = action_space.shape, action_space.dtype
+        buffer_args = (num_envs, observation_space.shape, observation_space.dtype, act_shape, act_dtype, len(self.info_keys))
+
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+        raw = ctx.RawArray("b", _SharedBuffers.nbytes(*buffer_args))
+        self.buffers = _SharedBuffers(raw, *buffer_args)
+
+        bounds = np.linspace(0, num_envs, n_workers + 1).round().astype(int)
+        self.slices = [slice(bounds[w], bounds[w + 1]) for w in range(n_workers)]
+        self.wake = [ctx.Event() for _ in range(n_workers)]
+        self.finished = [ctx.Event() for _ in range(n_workers)]
+        self.remotes, self.processes = [], []
+        for w, env_slice in enumerate(self.slices):
+            parent_remote, work_remote = ctx.Pipe()
+            args = (
+                w, CloudpickleWrapper(env_fns[env_slice]), raw, buffer_args, env_slice,
+                self.wake[w], self.finished[w], work_remote, self.info_keys,
+            )
+            process = ctx.Process(target=_worker, args=args, daemon=True)
+            process.start()
+            work_remote.close()
+            self.remotes.append(parent_remote)
+            self.processes.append(process)
+
+        super().__init__(num_envs, observation_space, action_space)
+
+    def _signal(self, workers, cmd):
+        for w in workers:
+            self.buffers.commands[w] = cmd
+            self.wake[w].set()
+
+    def _wait(self, workers):
+        for w in workers:
+            while not self.finished[w].wait(self.poll_interval):
+                process = self.processes[w]
+                if not process.is_alive():
+                    raise EOFError(f"ShmVecEnv worker {w} died with exit code {process.exitcode}")
+            self.finished[w].clear()
+
+    def _raise_failures(self, workers, replies=None):
+        # Collect every failed worker's traceback first, so no reply is left in a pipe
+        errors = []
+        for w in workers:
+            if self.buffers.failed[w]:
+                self.buffers.failed[w] = False
+                tb = replies[w] if replies is not None else self.remotes[w].recv()
+                errors.append(f"worker {w}:\n{tb}")
+        if errors:
+            raise RuntimeError("ShmVecEnv worker raised an exception\n" + "\n".join(errors))
+
+    def step_async(self, actions):
+        self.buffers.actions[:] = np.asarray(actions).reshape(self.buffers.actions.shape)
+        self._signal(range(len(self.slices)), _CMD_STEP)
+        self.waiting = True
+
+    def step_wait(self):
+        workers = range(len(self.slices))
+        try:
+            self._wait(workers)
+        finally:
+            self.waiting = False
+        self._raise_failures(workers)
+
+        b = self.buffers
+        infos = [{} for _ in range(self.num_envs)]
+        for k, key in enumerate(self.info_keys):
+            for i in range(self.num_envs):
+                infos[i][key] = b.info[i, k]
+        for i in np.flatnonzero(b.dones):
+            infos[i]["terminal_observation"] = b.terminal_obs[i].copy()
+            infos[i]["TimeLimit.truncated"] = bool(b.truncated[i])
+        return b.obs.copy(), b.rewards.copy(), b.dones.copy(), infos
+
+    def reset(self):
+        workers = range(len(self.slices))
+        self._signal(workers, _CMD_RESET)
+        for w in workers:
+            env_slice = self.slices[w]
+            self.remotes[w].send((self._seeds[env_slice], self._options[env_slice]))
+        replies = {w: self.remotes[w].recv() for w in workers}
+        self._wait(workers)
+        self._raise_failures(workers, replies)
+        for w in workers:
+            self.reset_infos[self.slices[w]] = replies[w]
+        self._reset_seeds()
+        self._reset_options()
+        return self.buffers.obs.copy()
+
+    def _remote_call(self, name, indices, args=(), kwargs=None):
+        # Route a rare, pickled request to the workers owning `indices`; results keep index order
+        per_worker = {}
+        for i in self._get_indices(indices):
+            w = next(w for w, s in enumerate(self.slices) if s.start <= i < s.stop)
+            per_worker.setdefault(w, []).append(i - self.slices[w].start)
+        self._signal(per_worker, _CMD_REMOTE)
+        for w, local_indices in per_worker.items():
+            self.remotes[w].send((name, local_indices, args, kwargs or {}))
+        # Drain every reply and finished Event before raising, so no worker is left out of step
+        replies = [self.remotes[w].recv() for w in per_worker]
+        self._wait(per_worker)
+        results = []
+        for reply in replies:
+            if isinstance(reply, Exception):
+                raise reply
+            results.extend(reply)
+        return results
+
+    def get_infos(self, indices=None):
+        """Full info dicts from the last step, pickled only on request."""
+        return self._remote_call("get_infos", indices)
+
+    def get_reset_infos(self, indices=None):
+        """Info dicts of each env's latest reset, including automatic resets inside `step`."""
+        return self._remote_call("get_reset_infos", indices)
+
+    def get_attr(self, attr_name, indices=None):
+        return self._remote_call("get_attr", indices, (attr_name,))
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._remote_call("set_attr", indices, (attr_name, value))
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return self._remote_call("env_method", indices, (method_name, method_args), method_kwargs)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return self._remote_call("is_wrapped", indices, (wrapper_class,))
+
+    def get_images(self):
+        return self._remote_call("render", None)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self.waiting:
+                self.waiting = False
+                self._wait(range(len(self.slices)))
+            workers = [w for w, process in enumerate(self.processes) if process.is_alive()]
+            self._signal(workers, _CMD_CLOSE)
+            self._wait(workers)
+        except EOFError:
+            pass  # a worker died; the rest are terminated below
+        for process in self.processes:
+            process.join(self.poll_interval)
+            if process.is_alive():
+                process.terminate()
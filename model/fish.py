@@ -8,6 +8,22 @@ class FishStage:
     JUVENILE = "juvenile"
     ADULT = "adult"
 
+    # Integer codes stored on Fish.stage_code; NAMES[code] is the stage string
+    FINGERLING_CODE = 0
+    JUVENILE_CODE = 1
+    ADULT_CODE = 2
+    NAMES = (FINGERLING, JUVENILE, ADULT)
+
+# Packed per-fish state used for snapshots and bulk population handling
+FISH_STATE_DTYPE = np.dtype([
+    ("weight", np.float64),
+    ("age_days", np.int64),
+    ("to_juvenile_weight", np.float64),
+    ("to_juvenile_days", np.int64),
+    ("to_adult_weight", np.float64),
+    ("to_adult_days", np.int64),
+])
+
 class Fish:
     def __init__(self, weight: float, growth_model: IndividualGrowthModel):
         if not growth_model:
@@ -24,6 +40,7 @@ class Fish:
 
         self.to_juvenile_weight, self.to_adult_weight = sorted([self.to_juvenile_weight, self.to_adult_weight])
         self.to_juvenile_days, self.to_adult_days = map(int, sorted([self.to_juvenile_days, self.to_adult_days]))
+        self.stage_code = self._compute_stage_code()
 
     @staticmethod
     def generate_random(growth_model: IndividualGrowthModel):
@@ -36,20 +53,99 @@ class Fish:
 
         return Fish(weight=max(weight, 5), growth_model=growth_model)
         
-    @property
-    def stage(self) -> str:
+    def _compute_stage_code(self) -> int:
         if self.weight >= self.to_adult_weight or self.age_days >= self.to_adult_days:
-            return FishStage.ADULT
+            return FishStage.ADULT_CODE
         elif self.weight >= self.to_juvenile_weight or self.age_days >= self.to_juvenile_days:
-            return FishStage.JUVENILE
+            return FishStage.JUVENILE_CODE
         else:
-            return FishStage.FINGERLING
+            return FishStage.FINGERLING_CODE
+
+    @property
+    def stage(self) -> str:
+        # stage_code is kept current by grow(), so reading the stage costs no threshold checks
+        return FishStage.NAMES[self.stage_code]
+
+
+    @staticmethod
+    def sample_initial_weights(size):
+        # Vectorized version of the weight draw in generate_random
+        fingerling = np.random.random(size) < 0.5
+        weights = np.where(fingerling, np.random.normal(5.25, 0.5, size), np.random.normal(20, 4, size))
+        return np.maximum(np.round(weights, 2), 5)
 
+    @staticmethod
+    def sample_population(size):
+        """
+        Draw packed initial populations of shape `size` (e.g. (n_scenarios, n_fish))
+        in bulk, with the same distributions as generate_random and __init__.
+        """
+        state = np.empty(size, dtype=FISH_STATE_DTYPE)
+        state["weight"] = Fish.sample_initial_weights(size)
+        state["age_days"] = 0
+        juv_w = np.maximum(np.random.normal(15, 3, size), 5)
+        juv_d = np.maximum(np.random.normal(30, 10, size).astype(np.int64), 15)
+        adult_w = np.maximum(np.random.normal(250, 30, size), 180)
+        adult_d = np.maximum(np.random.normal(180, 15, size).astype(np.int64), 150)
+        state["to_juvenile_weight"] = np.minimum(juv_w, adult_w)
+        state["to_adult_weight"] = np.maximum(juv_w, adult_w)
+        state["to_juvenile_days"] = np.minimum(juv_d, adult_d)
+        state["to_adult_days"] = np.maximum(juv_d, adult_d)
+        return state
+
+    @staticmethod
+    def pack(fishes) -> np.ndarray:
+        state = np.empty(len(fishes), dtype=FISH_STATE_DTYPE)
+        state["weight"] = [f.weight for f in fishes]
+        state["age_days"] = [f.age_days for f in fishes]
+        state["to_juvenile_weight"] = [f.to_juvenile_weight for f in fishes]
+        state["to_juvenile_days"] = [f.to_juvenile_days for f in fishes]
+        state["to_adult_weight"] = [f.to_adult_weight for f in fishes]
+        state["to_adult_days"] = [f.to_adult_days for f in fishes]
+        return state
+
+    @staticmethod
+    def unpack(state: np.ndarray, growth_model: IndividualGrowthModel, fishes=None):
+        """
+        Rebuild a population from `pack` output without drawing random numbers.
+        Existing Fish objects in `fishes` are reused when the count matches.
+        """
+        if fishes is None or len(fishes) != len(state):
+            fishes = [Fish.__new__(Fish) for _ in range(len(state))]
+        columns = zip(
+            state["weight"].tolist(),
+            state["age_days"].tolist(),
+            state["to_juvenile_weight"].tolist(),
+            state["to_juvenile_days"].tolist(),
+            state["to_adult_weight"].tolist(),
+            state["to_adult_days"].tolist(),
+        )
+        for fish, (w, age, juv_w, juv_d, adult_w, adult_d) in zip(fishes, columns):
+            fish.weight = w
+            fish.age_days = age
+            fish.growth_model = growth_model
+            fish.to_juvenile_weight = juv_w
+            fish.to_juvenile_days = juv_d
+            fish.to_adult_weight = adult_w
+            fish.to_adult_days = adult_d
+            fish.stage_code = fish._compute_stage_code()
+        return fishes
 
     def grow(self, feeding_rate: float, temperature: float, dissolved_oxygen: float, uia: float):
+        """
+        Advance one day. Returns the previous stage code when the fish changed
+        stage today, otherwise None.
+        """
         growth = self.growth_model.compute_growth(
             feeding_rate, temperature, dissolved_oxygen, uia, self.weight
         )
+        return self.apply_growth(growth)
+
+    def apply_growth(self, growth: float):
+        """
+        Add one day's weight change computed elsewhere (e.g. integrated over
+        sub-daily steps) and advance age and stage as `grow` does.
+        """
         self.weight += growth
 
         if growth >= 0:
@@ -58,6 +154,12 @@ class Fish:
             if random.random() < 0.3:
                 self.age_days += 1
 
+        code = self._compute_stage_code()
+        if code != self.stage_code:
+            previous, self.stage_code = self.stage_code, code
+            return previous
+        return None
+
     def __str__(self):
         return (
             f"Fish(stage={self.stage}, weight={self.weight:.2f}g, "
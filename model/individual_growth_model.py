@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from datetime import datetime
 from utils.config import Config
 
@@ -11,6 +12,7 @@ class IndividualGrowthModel:
 
         self.day_of_year = datetime.now().timetuple().tm_yday
         self.rho = self._compute_photoperiod_factor(self.day_of_year, self.latitude)
+        self.overrides = {}  # per-member parameter arrays for the *_array methods
 
     def set_day_of_year(self, day_of_year):
         self.day_of_year = day_of_year
@@ -96,3 +98,52 @@ class IndividualGrowthModel:
 
         slowdown = 1.0 / (1.0 + math.exp( k * (w - w_mid) ))
         return base * slowdown
+
+    # Vectorized counterparts of the scalar methods above. Inputs are NumPy
+    # arrays that broadcast against each other, e.g. per-member controls of
+    # shape (K, 1) against a weight matrix of shape (K, N). Any constant of
+    # ind_growth_model / biomass_model can be overridden per member through
+    # `self.overrides[name]`, e.g. a (K, 1) array of kappa values.
+
+    def _param(self, name):
+        if name in self.overrides:
+            return self.overrides[name]
+        if name in ("m", "n"):
+            return getattr(Config.biomass_model, name)
+        return getattr(Config.ind_growth_model, name)
+
+    def tau_array(self, T):
+        p = self._param
+        T_opt = p("T_opt")
+        x = np.where(T >= T_opt, (T - T_opt) / (p("T_max") - T_opt), (T_opt - T) / (T_opt - p("T_min")))
+        return np.exp(-p("kappa") * x**4)
+
+    def sigma_array(self, DO):
+        DO_min = self._param("DO_min")
+        return np.clip((DO - DO_min) / (self._param("DO_crit") - DO_min), 0.0, 1.0)
+
+    def nu_array(self, UIA):
+        UIA_max = self._param("UIA_max")
+        return np.clip((UIA_max - UIA) / (UIA_max - self._param("UIA_crit")), 0.0, 1.0)
+
+    @staticmethod
+    def feed_efficiency_array(f):
+        f_opt = 0.68
+        width = 0.4  # left and right widths are equal
+        return np.where(f == 0, 0.0, np.exp(-(np.abs(f - f_opt) / width) ** 2.8))
+
+    def compute_anabolism_array(self, f, T, DO, UIA, w):
+        p = self._param
+        feed_efficiency = self.feed_efficiency_array(f)
+
+        return (p("h") * self.rho * feed_efficiency * p("b") * (1 - p("a"))
+                * self.tau_array(T) * self.sigma_array(DO) * self.nu_array(UIA) * (w ** p("m")))
+
+    def compute_catabolism_array(self, T, w):
+        p = self._param
+        return p("k_min") * np.exp(p("j") * (T - p("T_min"))) * (w ** p("n"))
+
+    def compute_growth_array(self, f, T, DO, UIA, w):
+        base = self.compute_anabolism_array(f, T, DO, UIA, w) - self.compute_catabolism_array(T, w)
+        slowdown = 1.0 / (1.0 + np.exp(self._param("slowdown_gamma") * (w - self._param("w_threshold"))))
+        return base * slowdown
@@ -0,0 +1,113 @@
+import numpy as np
+from utils.config import Config
+
+
+def solve_arrow(diag_tanks, coupling_tanks, rhs_tanks, diag_sump, coupling_sump, rhs_sump):
+    """
+    Solve the arrow-shaped sparse system of N tanks coupled only to one sump:
+
+        diag_tanks[i] * x[i] - coupling_tanks[i] * s           = rhs_tanks[i]
+        diag_sump * s        - sum_i coupling_sump[i] * x[i]   = rhs_sump
+
+    Eliminating the tank rows (Schur complement on the sump) gives an exact
+    O(N) solve with no matrix assembly. All arguments broadcast over leading
+    batch dimensions; the tank axis is the last one.
+    Returns (x, s).
+    """
+    inv_d = 1.0 / diag_tanks
+    schur = diag_sump - np.sum(coupling_sump * coupling_tanks * inv_d, axis=-1)
+    s = (rhs_sump + np.sum(coupling_sump * rhs_tanks * inv_d, axis=-1)) / schur
+    x = (rhs_tanks + coupling_tanks * s[..., None]) * inv_d
+    return x, s
+
+
+class RASFarmModel:
+    """
+    Water quality and temperature of N tanks sharing a sump and biofilter.
+
+    Each day, tank i exchanges `exchange_rate` tank volumes with the sump.
+    TAN decays slowly in the tanks and is nitrified in the biofilter at
+    `biofilter_removal`. The heater acts on the sump, and every volume loses
+    heat to ambient air. Both TAN and temperature advance with one implicit
+    Euler step of the coupled system. That system is arrow-shaped (tanks
+    couple only to the sump), so `solve_arrow` solves it exactly in O(N).
+    Per-tank UIA is the un-ionized fraction of TAN at the tank temperature,
+    as in UIAModel.
+    """
+
+    def __init__(self, n_tanks, tank_volume=None):
+        Config.load()
+        rf = Config.ras_farm
+        self.n_tanks = n_tanks
+        self.tank_volume = np.full(n_tanks, tank_volume or Config.reward_cost_parameters.common.V, dtype=np.float64)
+        self.sump_volume = rf.sump_volume
+        self.exchange_rate = np.full(n_tanks, rf.exchange_rate, dtype=np.float64)
+        self.tank_decay = rf.tank_TAN_decay
+        self.biofilter_removal = rf.biofilter_removal
+        self.heater_gain = rf.heater_gain
+        self.ambient_loss = rf.ambient_loss
+        self.pH = rf.pH
+        self.Tmin = Config.ind_growth_model.T_min
+        self.Tmax = Config.ind_growth_model.T_max
+        self.reset()
+
+    def reset(self, temperature=None):
+        self.TAN = np.zeros(self.n_tanks)            # mg/L per tank
+        self.TAN_sump = 0.0
+        T0 = Config.ind_growth_model.T_opt if temperature is None else temperature
+        self.T = np.full(self.n_tanks, T0, dtype=np.float64)
+        self.T_sump = float(T0)
+
+    def tan_load(self, feed_g):
+        # mg of ammonia nitrogen excreted per tank for a day's feed, as in UIAModel.get_uia
+        log_feed = feed_g / (1 + Config.ind_growth_model.UIA_slowdown * feed_g)
+        return log_feed * 0.30 * 0.16 * 0.90 * 1000
+
+    def uia_fraction(self, temperature):
+        pKa = 0.09018 + (2729.92 / (temperature + 273.15))
+        return 1 / (1 + 10 ** (pKa - self.pH))
+
+    def uia(self):
+        return self.TAN * self.uia_fraction(self.T)
+
+    def step_temperature(self, T_set, T_amb):
+        """
+        Advance tank and sump temperatures one day under the shared heater
+        setpoint `T_set` and ambient temperature `T_amb`. Returns tank temperatures.
+        """
+        q = self.exchange_rate
+        a = q * self.tank_volume / self.sump_volume  # sump-side coupling per tank
+
+        # Heater acts at the sump and only below setpoint; every volume loses heat to ambient
+        T_set = np.clip(T_set, self.Tmin, self.Tmax)
+        heater = self.heater_gain if self.T_sump < T_set else 0.0
+        T, T_sump = solve_arrow(
+            diag_tanks=1 + q + self.ambient_loss,
+            coupling_tanks=q,
+            rhs_tanks=self.T + self.ambient_loss * T_amb,
+            diag_sump=1 + a.sum() + self.ambient_loss,
+            coupling_sump=a,
+            rhs_sump=self.T_sump + heater * (T_set - self.T_sump) + self.ambient_loss * T_amb,
+        )
+        self.T = np.clip(T, self.Tmin, self.Tmax)
+        self.T_sump = float(np.clip(T_sump, self.Tmin, self.Tmax))
+        return self.T
+
+    def step_water_quality(self, feed_g):
+        """
+        Advance TAN one day given the feed per tank (grams, shape (N,)).
+        Returns per-tank UIA in mg/L at the current tank temperatures.
+        """
+        q = self.exchange_rate
+        a = q * self.tank_volume / self.sump_volume
+
+        # Tanks receive the excretion load; the sump row carries biofilter removal
+        self.TAN, self.TAN_sump = solve_arrow(
+            diag_tanks=1 + q + self.tank_decay,
+            coupling_tanks=q,
+            rhs_tanks=self.TAN + self.tan_load(feed_g) / self.tank_volume,
+            diag_sump=1 + a.sum() + self.biofilter_removal,
+            coupling_sump=a,
+            rhs_sump=self.TAN_sump,
+        )
+        return self.uia()
@@ -1,7 +1,14 @@
+import numpy as np
 from utils.config import Config
 
 class RewardCost:
-    def __init__(self, region: str = "guangdong"):
+    # Weights AquacultureEnv applies to each reward term
+    DEFAULT_WEIGHTS = {"fish_value": 2.0, "feed": 0.9, "heat": 0.75, "oxygenation": 0.75}
+    PRICE_KEYS = ("P_s", "P_f", "P_e", "c_p", "V", "m", "P_max")
+    # Raw per-transition quantities needed to recompute a reward, as reported in the env's info
+    TRANSITION_FIELDS = ("prev_biomass", "biomass", "feed_amount", "heat_delta_T", "dissolved_oxygen")
+
+    def __init__(self, region: str = "guangdong", prices=None, weights=None):
         Config.load()
 
         if not hasattr(Config.reward_cost_parameters, region):
@@ -19,6 +26,29 @@ class RewardCost:
         self.m = common_params.m         # Water mass
         self.P_max = common_params.P_max # Max power
 
+        # Optional overrides; values may be arrays of shape (S, 1) to evaluate S price scenarios at once
+        for key, value in (prices or {}).items():
+            if key not in self.PRICE_KEYS:
+                raise ValueError(f"Unknown price parameter '{key}'. Allowed: {self.PRICE_KEYS}")
+            setattr(self, key, value)
+        self.weights = dict(self.DEFAULT_WEIGHTS, **(weights or {}))
+
+    @classmethod
+    def scenarios(cls, price_sets, weights=None):
+        """
+        Build one RewardCost whose prices are (S, 1) arrays, one row per scenario.
+        Each entry of `price_sets` is a region name or a dict with a "region"
+        (default guangdong) plus price overrides.
+        """
+        rows = []
+        for entry in price_sets:
+            entry = {"region": entry} if isinstance(entry, str) else dict(entry)
+            base = cls(region=entry.pop("region", "guangdong"), prices=entry)
+            rows.append([getattr(base, key) for key in cls.PRICE_KEYS])
+        table = np.array(rows, dtype=np.float64)
+        prices = {key: table[:, j:j + 1] for j, key in enumerate(cls.PRICE_KEYS)}
+        return cls(prices=prices, weights=weights)
+
     def fish_value_gain(self, biomass_prev, biomass_curr, alpha=1.0): # biomass in kg
         """
         α · [(ξ_k+1 - ξ_k) · P_s] = fish value gain
@@ -43,3 +73,41 @@ class RewardCost:
         24 · P_e · P_max · u3, u3 = DO_level
         """
         return 24 * self.P_e * self.P_max * DO_level
+
+
+    def reward_components(self, biomass_prev, biomass_curr, feed_weight, delta_T, DO_level, weights=None):
+        """
+        Weighted (fish value, feed cost, heat cost, oxygenation cost) exactly as
+        AquacultureEnv applies them; biomass and feed in grams. Works on
+        scalars and on broadcastable arrays.
+        """
+        w = self.weights if weights is None else dict(self.weights, **weights)
+        fish_value = self.fish_value_gain(biomass_prev / 1000, biomass_curr / 1000) * w["fish_value"]
+        feed_cost = self.feed_cost(feed_weight / 1000) * w["feed"]
+        heat_cost = self.heat_cost(delta_T=delta_T) * w["heat"]
+        oxy_cost = self.oxygenation_cost(DO_level=DO_level) * w["oxygenation"]
+        return fish_value, feed_cost, heat_cost, oxy_cost
+
+    def relabel(self, transitions, weights=None, return_components=False):
+        """
+        Recompute rewards for stored transitions under this instance's prices.
+
+        `transitions` maps each name in TRANSITION_FIELDS to an array of shape
+        (n,). With scenario prices from `scenarios`, the result has shape (S, n).
+        """
+        missing = [key for key in self.TRANSITION_FIELDS if key not in transitions]
+        if missing:
+            raise ValueError(f"Transitions are missing fields: {missing}")
+        t = {key: np.asarray(transitions[key], dtype=np.float64) for key in self.TRANSITION_FIELDS}
+        fish_value, feed_cost, heat_cost, oxy_cost = self.reward_components(
+            t["prev_biomass"], t["biomass"], t["feed_amount"], t["heat_delta_T"], t["dissolved_oxygen"], weights
+        )
+        reward = fish_value - feed_cost - heat_cost - oxy_cost
+        if not return_components:
+            return reward
+        return reward, {
+            "fish_value": fish_value,
+            "feed_cost": feed_cost,
+            "heat_cost": heat_cost,
+            "oxygenation_cost": oxy_cost,
+        }
@@ -0,0 +1,66 @@
+import json
+import os
+import numpy as np
+
+from model.fish import Fish, FISH_STATE_DTYPE
+
+# Open banks, shared by every env in the process
+_BANK_CACHE = {}
+
+
+class ScenarioBank:
+    """
+    Pre-sampled initial populations, one memory-mapped `.npy` per stocking size.
+
+    `root/population_<n>.npy` holds a (n_scenarios, n) array of
+    FISH_STATE_DTYPE rows, and `root/bank.json` lists the sizes. Scenario
+    `i` of a given size is the same population for every env and process
+    that opens the bank. That makes paired policy comparisons start from
+    identical fish.
+    """
+
+    def __init__(self, root):
+        with open(os.path.join(root, "bank.json"), "r") as f:
+            self.meta = json.load(f)
+        self.root = root
+        self.populations = {
+            int(size): np.load(os.path.join(root, f"population_{size}.npy"), mmap_mode="r")
+            for size in self.meta["stocking_sizes"]
+        }
+
+    @staticmethod
+    def generate(root, stocking_sizes=(100,), n_scenarios=1000, seed=0):
+        # Bulk draw with the global np.random stream, restored afterwards so generation does not disturb envs
+        os.makedirs(root, exist_ok=True)
+        rng_state = np.random.get_state()
+        np.random.seed(seed)
+        try:
+            for size in stocking_sizes:
+                out = np.lib.format.open_memmap(
+                    os.path.join(root, f"population_{size}.npy"), mode="w+",
+                    dtype=FISH_STATE_DTYPE, shape=(n_scenarios, size)
+                )
+                out[:] = Fish.sample_population((n_scenarios, size))
+                out.flush()
+        finally:
+            np.random.set_state(rng_state)
+        with open(os.path.join(root, "bank.json"), "w") as f:
+            json.dump({"stocking_sizes": [int(s) for s in stocking_sizes], "n_scenarios": n_scenarios, "seed": seed}, f)
+        _BANK_CACHE.pop(os.path.abspath(root), None)
+        return ScenarioBank.load(root)
+
+    @staticmethod
+    def load(root):
+        root = os.path.abspath(root)
+        if root not in _BANK_CACHE:
+            _BANK_CACHE[root] = ScenarioBank(root)
+        return _BANK_CACHE[root]
+
+    def __len__(self):
+        return self.meta["n_scenarios"]
+
+    def population(self, index, stocking_size):
+        if stocking_size not in self.populations:
+            raise ValueError(f"Scenario bank '{self.root}' has no stocking size {stocking_size}; "
+                             f"available: {sorted(self.populations)}")
+        return np.array(self.populations[stocking_size][index])
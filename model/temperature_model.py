@@ -1,7 +1,30 @@
+import os
 import numpy as np
 import math
 from utils.config import Config
 
+# Memory-mapped historical series, shared by every model in the process
+_HISTORY_CACHE = {}
+
+def load_temperature_history(path, region):
+    """
+    Daily ambient temperatures for `region` as a read-only memmap of shape
+    (n_years, 365). `path` is either a `.npy` file or a directory holding
+    `<region>.npy`. Repeated loads return the same memmap, and separate
+    processes share the file pages through the OS cache.
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, f"{region}.npy")
+    path = os.path.abspath(path)
+    if path not in _HISTORY_CACHE:
+        history = np.load(path, mmap_mode="r")
+        if history.ndim == 1:
+            history = history.reshape(1, -1)
+        if history.shape[1] < 365:
+            raise ValueError(f"Temperature history '{path}' needs at least 365 days per year, got {history.shape[1]}")
+        _HISTORY_CACHE[path] = history
+    return _HISTORY_CACHE[path]
+
 class TemperatureModel:
 
     def __init__(
@@ -29,10 +52,36 @@ class TemperatureModel:
         self.day_of_year = 1
         self.current_T   = self.T_mean   
 
+        # Per-episode ambient series indexed by day_of_year; None falls back to per-call draws
+        self.ambient_trace = None
+
+    def reset(self):
+        # Start-of-episode state, without rebuilding the model (and re-reading the config)
+        self.day_of_year = 1
+        self.current_T = self.T_mean
+        self.ambient_trace = None
+
     def set_day_of_year(self, day):
         self.day_of_year = day
 
+    def seasonal_temperature(self, days):
+        return self.T_mean + self.T_amp * np.sin(2 * np.pi * (np.asarray(days) - self.phase_shift) / self.season_period)
+
+    def generate_ambient_trace(self, n_days):
+        # Whole-episode synthetic weather in one vectorized draw from the global RNG
+        days = np.arange(n_days)
+        self.ambient_trace = self.seasonal_temperature(days) + np.random.normal(0, 1, n_days)
+        return self.ambient_trace
+
+    def load_ambient_trace(self, history, n_days, year=0, start_day=0):
+        # Slice a historical (n_years, 365) series, wrapping around the year
+        days = (start_day + np.arange(n_days)) % history.shape[1]
+        self.ambient_trace = np.asarray(history[year % history.shape[0], days], dtype=np.float64)
+        return self.ambient_trace
+
     def get_ambient_temperature(self):
+        if self.ambient_trace is not None and 0 <= self.day_of_year < len(self.ambient_trace):
+            return self.ambient_trace[self.day_of_year]
         ambient = (
             self.T_mean
             + self.T_amp * math.sin(2 * math.pi * (self.day_of_year - self.phase_shift) / self.season_period)
@@ -41,9 +90,10 @@ class TemperatureModel:
         return ambient
 
     # https://ocw.mit.edu/courses/10-450-process-dynamics-operations-and-control-spring-2006/dc573f23401eeb5822818fbaa177eaac_5_heated_tank.pdf
-    def set_temperature(self, set_temperature):
+    def set_temperature(self, set_temperature, T_amb=None):
         T_set = np.clip(set_temperature, self.Tmin, self.Tmax)
-        T_amb = self.get_ambient_temperature()
+        if T_amb is None:
+            T_amb = self.get_ambient_temperature()
 
         heater_on = self.current_T < T_set
         alpha_eff = self.alpha if heater_on else 0.0
@@ -57,4 +107,27 @@ class TemperatureModel:
         T_next = np.clip(T_next, self.Tmin, self.Tmax)
         self.current_T = T_next
         self.day_of_year = 1 + (self.day_of_year % self.season_period)
-        return T_next
\ No newline at end of file
+        return T_next
+
+    def set_temperature_substeps(self, set_temperature, T_amb):
+        """
+        `set_temperature` integrated over n equal sub-steps of one day, with
+        `T_amb` holding the ambient temperature of each sub-step. alpha and
+        beta are daily response fractions and are converted per sub-step, so
+        each term alone relaxes by the same amount over a whole day. Returns the
+        tank temperature after every sub-step.
+        """
+        n = len(T_amb)
+        T_set = float(np.clip(set_temperature, self.Tmin, self.Tmax))
+        alpha = 1 - (1 - self.alpha) ** (1 / n)
+        beta = 1 - (1 - self.beta) ** (1 / n)
+        T = float(self.current_T)
+        out = np.empty(n)
+        for k, ambient in enumerate(np.asarray(T_amb, dtype=np.float64).tolist()):
+            alpha_eff = alpha if T < T_set else 0.0
+            T = T + alpha_eff * (T_set - T) + beta * (ambient - T)
+            T = min(max(T, self.Tmin), self.Tmax)
+            out[k] = T
+        self.current_T = T
+        self.day_of_year = 1 + (self.day_of_year % self.season_period)
+        return out
@@ -19,7 +19,11 @@ class UIAModel:
         self.decay_rate = 0.8
         self.tank_volume = common_params.V
 
-    def get_uia(self, feed_g, temperature):
+    def reset(self):
+        # Start-of-episode state, without rebuilding the model (and re-reading the config)
+        self.UIA = 0.06
+
+    def _uia_produced(self, feed_g, temperature):
         protein_fraction = 0.30
         N_fraction_in_protein = 0.16
         N_excreted_as_ammonia = 0.90
@@ -34,6 +38,15 @@ class UIAModel:
 
         pKa = 0.09018 + (2729.92 / (temperature + 273.15))
         UIA_fraction = 1 / (1 + 10 ** (pKa - self.pH))
-        UIA_produced = (TAN * UIA_fraction)
+        return TAN * UIA_fraction
+
+    def get_uia(self, feed_g, temperature):
+        UIA_produced = self._uia_produced(feed_g, temperature)
         self.UIA = self.UIA * (1 - self.decay_rate) + UIA_produced
+        return np.clip(self.UIA, 0.06, 1.8)
+
+    def get_uia_substep(self, feed_g, temperature, dt):
+        # One sub-step of length dt days; decay_rate is the daily fraction lost
+        UIA_produced = self._uia_produced(feed_g, temperature)
+        self.UIA = self.UIA * (1 - self.decay_rate) ** dt + UIA_produced
         return np.clip(self.UIA, 0.06, 1.8)
\ No newline at end of file
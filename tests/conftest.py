@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Config reads parameters.yaml relative to the working directory, and the packages live at the repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from envs.aquaculture_env import AquacultureEnv
+from envs.batch_simulator import BatchSimulator
+
+ACTION = np.array([0.6, 30.0, 0.8], dtype=np.float32)
+
+
+@pytest.mark.parametrize("stage_obs", [False, True])
+def test_observations_match_env_layout(stage_obs):
+    env = AquacultureEnv(stage_obs=stage_obs)
+    obs, _ = env.reset(seed=0)
+    sim = BatchSimulator(env, n_members=2, seed=0)
+    sim.load_env_state(env.get_state(), replay_weather=True)
+    assert sim.observations().shape == (2, *env.observation_space.shape)
+
+    for _ in range(100):
+        obs, _, terminated, _, _ = env.step(ACTION)
+        sim.step(ACTION)
+        np.testing.assert_allclose(sim.observations(), np.broadcast_to(obs, (2, len(obs))), atol=1e-6)
+        if terminated:
+            break
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from envs.aquaculture_env import AquacultureEnv
+
+
+def _rollout(env, actions):
+    out = []
+    for action in actions:
+        obs, reward, terminated, _, info = env.step(action)
+        out.append((obs.copy(), reward, info["biomass"], env.temperature, env.un_ionized_ammonia))
+        if terminated:
+            break
+    return out
+
+
+@pytest.mark.parametrize("precision", ["float64", "float32"])
+def test_set_state_continues_bit_exactly(precision):
+    rng = np.random.default_rng(0)
+    env = AquacultureEnv(precision=precision)
+    low, high = env.action_space.low, env.action_space.high
+    actions = rng.uniform(low, high, size=(60, 3)).astype(np.float32)
+
+    env.reset(seed=1)
+    _rollout(env, actions[:20])
+    state = env.get_state()
+    reference = _rollout(env, actions[20:])
+
+    # Restore into the same env after it has moved on, and into a fresh one
+    for target in (env, AquacultureEnv(precision=precision)):
+        if target is not env:
+            target.reset(seed=99)
+        target.set_state(state)
+        replay = _rollout(target, actions[20:])
+        assert len(replay) == len(reference)
+        for (obs, reward, biomass, temp, uia), (obs_r, reward_r, biomass_r, temp_r, uia_r) in zip(replay, reference):
+            np.testing.assert_array_equal(obs, obs_r)
+            assert (reward, biomass, temp, uia) == (reward_r, biomass_r, temp_r, uia_r)
+
+
+def test_get_state_is_a_snapshot():
+    env = AquacultureEnv()
+    env.reset(seed=0)
+    state = env.get_state()
+    fish = state.fish.copy()
+    env.step(np.array([0.6, 30.0, 0.8], dtype=np.float32))
+    np.testing.assert_array_equal(state.fish, fish)
+    assert state.scalar("day") == 0
@@ -0,0 +1,60 @@
+import numpy as np
+
+from utils.golden import (
+    batch_simulator_backend, compare_golden, differentiable_backend, env_backend, record_golden,
+)
+
+# Reference trajectories of the float64 AquacultureEnv. Regenerate after an intended change to the dynamics with
+#   record_golden("tests/golden/env_float64.npz", seeds=(0, 1), sample_every=20)
+GOLDEN = "tests/golden/env_float64.npz"
+
+
+def _statuses(rows, variables=None):
+    return {r["status"] for r in rows if variables is None or r["variable"] in variables}
+
+
+def test_env_matches_recorded_golden():
+    rows = compare_golden(GOLDEN, env_backend(), verbose=False)
+    assert _statuses(rows) <= {"exact", "close"}, [r for r in rows if r["status"] not in ("exact", "close")]
+
+
+def test_reuse_buffers_env_matches_recorded_golden():
+    rows = compare_golden(GOLDEN, env_backend(reuse_buffers=True), verbose=False)
+    assert _statuses(rows) <= {"exact", "close"}
+
+
+def test_batch_simulator_stays_within_tolerance():
+    rows = compare_golden(GOLDEN, batch_simulator_backend(), verbose=False)
+    # The batch simulator does not report the individual reward terms
+    assert _statuses(rows, {"fish_value", "feed_cost", "heat_cost", "oxygenation_cost"}) == {"missing"}
+    rest = [r for r in rows if r["status"] != "missing"]
+    assert rest and _statuses(rest) <= {"exact", "close"}
+
+
+def test_differentiable_simulator_rewards_stay_within_tolerance():
+    # Covers the ramp and extremes scripts, which feed f == 0 on some days
+    rows = [r for r in compare_golden(GOLDEN, differentiable_backend(), verbose=False) if r["variable"] == "reward"]
+    assert _statuses(rows) <= {"exact", "close"}
+
+
+def test_record_then_compare_is_exact(tmp_path):
+    path = tmp_path / "golden.npz"
+    record_golden(path, regions=["guangdong"], seeds=(3,), scripts=["random"], verbose=False)
+    rows = compare_golden(path, env_backend(), verbose=False)
+    assert _statuses(rows) == {"exact"}
+
+
+def test_perturbed_backend_is_reported_as_diverged(tmp_path):
+    path = tmp_path / "golden.npz"
+    record_golden(path, regions=["guangdong"], seeds=(3,), scripts=["constant"], verbose=False)
+    reference = env_backend()
+
+    def perturbed(region, seed, actions):
+        out = reference(region, seed, actions)
+        out["reward"] = out["reward"] + np.where(np.arange(len(out["reward"])) >= 40, 1e-3, 0.0)
+        return out
+
+    rows = {r["variable"]: r for r in compare_golden(path, perturbed, verbose=False)}
+    assert rows["reward"]["status"] == "diverged"
+    assert rows["reward"]["first_divergent_day"] == 40
+    assert rows["biomass"]["status"] == "exact"
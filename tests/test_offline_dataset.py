@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from envs.aquaculture_env import AquacultureEnv
+from utils.offline_dataset import ChunkedTransitionWriter, TransitionDataset, TRANSITION_FIELDS, generate_dataset
+
+
+@pytest.mark.parametrize("stage_obs", [False, True])
+def test_dataset_follows_observation_space(tmp_path, stage_obs):
+    generate_dataset(str(tmp_path), ["guangdong"], [0], {"random": ("random", {})}, episodes_per_job=2,
+                     n_workers=1, chunk_size=100, env_kwargs={"stage_obs": stage_obs})
+    dataset = TransitionDataset(str(tmp_path))
+    batch = dataset.get(np.arange(len(dataset)))
+
+    env = AquacultureEnv(stage_obs=stage_obs)
+    obs, _ = env.reset(seed=0)
+    assert batch["obs"].shape == (len(dataset), *env.observation_space.shape)
+    assert batch["raw_state"].shape == batch["obs"].shape
+    np.testing.assert_allclose(batch["obs"][0], obs)
+
+    # Rows stay in order across chunk boundaries
+    same = batch["episode"][1:] == batch["episode"][:-1]
+    np.testing.assert_array_equal(batch["next_obs"][:-1][same], batch["obs"][1:][same])
+    assert batch["terminal"].sum() == 2
+
+
+def test_append_spills_buffer_across_chunks(tmp_path):
+    writer = ChunkedTransitionWriter(str(tmp_path), chunk_size=7, buffer_size=3)
+    for i in range(20):
+        writer.append({field: np.full(shape, i, dtype=dtype) for field, (shape, dtype) in TRANSITION_FIELDS.items()})
+    index = writer.close()
+
+    assert [chunk["count"] for chunk in index["chunks"]] == [7, 7, 6]
+    episodes = [np.load(tmp_path / chunk["path"] / "episode.npy")[:chunk["count"]] for chunk in index["chunks"]]
+    assert np.concatenate(episodes).tolist() == list(range(20))
@@ -0,0 +1,37 @@
+import functools
+
+import numpy as np
+import pytest
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from envs.aquaculture_env import AquacultureEnv
+from envs.shm_vec_env import ShmVecEnv
+
+
+def _vec_envs(n_envs):
+    env_fns = [functools.partial(AquacultureEnv, region="guangdong") for _ in range(n_envs)]
+    shm, ref = ShmVecEnv(env_fns, n_workers=2), DummyVecEnv(env_fns)
+    for vec_env in (shm, ref):
+        vec_env.seed(0)
+        vec_env.reset()
+    return shm, ref
+
+
+def test_failed_remote_call_leaves_workers_in_step():
+    shm, ref = _vec_envs(4)
+    actions = np.tile(np.array([0.6, 30.0, 0.8], dtype=np.float32), (4, 1))
+    try:
+        shm.step(actions)
+        ref.step(actions)
+        with pytest.raises(AttributeError):
+            shm.get_attr("nonexistent")
+
+        actions[:, 0] = 0.3
+        obs, rewards, _, _ = shm.step(actions)
+        ref_obs, ref_rewards, _, _ = ref.step(actions)
+        np.testing.assert_allclose(rewards, ref_rewards, rtol=1e-6)  # DummyVecEnv keeps float32 rewards
+        np.testing.assert_array_equal(obs, ref_obs)
+        assert shm.get_attr("day") == [2, 2, 2, 2]
+    finally:
+        shm.close()
+        ref.close()
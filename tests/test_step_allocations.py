@@ -0,0 +1,63 @@
+import inspect
+
+import numpy as np
+
+from envs.aquaculture_env import AquacultureEnv
+from utils.profiler import step_allocations
+
+ACTION = np.array([0.6, 30.0, 0.8], dtype=np.float32)
+
+
+def test_reuse_buffers_step_retains_almost_nothing():
+    stats = step_allocations(AquacultureEnv(reuse_buffers=True), ACTION, n_steps=100, warmup=20)
+    assert stats["steps"] == 100
+    assert stats["net"] < 128  # bytes per step; about 35 B locally
+
+
+def test_reuse_buffers_retains_less_than_default_path():
+    reused = step_allocations(AquacultureEnv(reuse_buffers=True), ACTION, n_steps=100, warmup=20)
+    default = step_allocations(AquacultureEnv(), ACTION, n_steps=100, warmup=20)
+    assert reused["net"] < default["net"] / 4
+
+
+def _retained_step_allocations(env, n_steps=50):
+    # Blocks allocated on the step, observation and action lines that are still alive after
+    # n_steps, while every returned obs and info is kept as a caller would keep them
+    import tracemalloc
+
+    lines = set()
+    for fn in (AquacultureEnv.step, AquacultureEnv._get_observation, AquacultureEnv._clip_action):
+        source, start = inspect.getsourcelines(fn)
+        lines.update(range(start, start + len(source)))
+    env_file = inspect.getsourcefile(AquacultureEnv)
+
+    kept = []
+    tracemalloc.start()
+    try:
+        # Warm up under tracing, so the values the env holds from its latest step are in both snapshots
+        env.reset(seed=0)
+        for _ in range(20):
+            env.step(ACTION)
+        before = tracemalloc.take_snapshot()
+        for _ in range(n_steps):
+            obs, _, _, _, info = env.step(ACTION)
+            kept.append((obs, info))
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    only_env = [tracemalloc.Filter(True, env_file)]
+    diff = after.filter_traces(only_env).compare_to(before.filter_traces(only_env), "lineno")
+    return kept, [stat for stat in diff if stat.count_diff > 0 and stat.traceback[0].lineno in lines]
+
+
+def test_reuse_buffers_returns_the_same_obs_and_info():
+    kept, grown = _retained_step_allocations(AquacultureEnv(reuse_buffers=True))
+    assert all(obs is kept[0][0] and info is kept[0][1] for obs, info in kept)
+    assert grown == []
+
+
+def test_default_path_allocates_new_obs_and_info():
+    # The probe above sees the per-step arrays and dicts the default path hands out
+    kept, grown = _retained_step_allocations(AquacultureEnv())
+    assert len({id(obs) for obs, _ in kept}) == len(kept)
+    assert sum(stat.count_diff for stat in grown) >= 2 * len(kept)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from envs.aquaculture_env import AquacultureEnv
+
+ACTION = np.array([0.6, 30.0, 0.8], dtype=np.float32)
+
+
+def _stepped(region, seed, days):
+    env = AquacultureEnv(region=region)
+    env.reset(seed=seed)
+    rewards, biomass = [], []
+    for _ in range(days):
+        obs, reward, terminated, _, info = env.step(ACTION)
+        rewards.append(reward)
+        biomass.append(info["biomass"])
+        if terminated:
+            break
+    return env, obs, rewards, biomass, terminated
+
+
+@pytest.mark.parametrize("region", AquacultureEnv.ALLOWED_REGIONS)
+def test_step_n_matches_repeated_step(region):
+    days = 30
+    ref_env, ref_obs, ref_rewards, ref_biomass, _ = _stepped(region, 0, days)
+
+    env = AquacultureEnv(region=region)
+    env.reset(seed=0)
+    obs, reward, terminated, _, info = env.step_n(ACTION, days, return_daily=True)
+
+    assert info["days"] == len(ref_rewards)
+    np.testing.assert_array_equal(obs, ref_obs)
+    np.testing.assert_array_equal(info["daily"]["reward"], ref_rewards)
+    np.testing.assert_array_equal(info["daily"]["biomass"], ref_biomass)
+    assert reward == pytest.approx(sum(ref_rewards), rel=1e-12)
+    assert env.day == ref_env.day
+    assert env.temperature == ref_env.temperature
+    assert [f.weight for f in env.fishes] == [f.weight for f in ref_env.fishes]
+
+
+def test_step_n_stops_at_termination():
+    ref_env, _, ref_rewards, _, ref_terminated = _stepped("guangdong", 0, 1000)
+    env = AquacultureEnv(region="guangdong")
+    env.reset(seed=0)
+    _, _, terminated, _, info = env.step_n(ACTION, 1000)
+    assert terminated and ref_terminated
+    assert info["days"] == len(ref_rewards) == env.day
+
+
+def test_step_n_rejects_non_positive_days():
+    env = AquacultureEnv()
+    env.reset(seed=0)
+    with pytest.raises(ValueError):
+        env.step_n(ACTION, 0)
@@ -39,4 +39,127 @@ class Calculation:
         electricity_cost = heat_cost + oxygenation_cost
         if electricity_cost == 0:
             return None  # Avoid division by zero
-        return fish_value_gain / electricity_cost
\ No newline at end of file
+        return fish_value_gain / electricity_cost
+
+    # Array-native counterparts of the metrics above. They take per-episode
+    # arrays (or per-step arrays summed along `axis`) and return metric arrays,
+    # with NaN wherever the scalar version would return None.
+
+    @staticmethod
+    def compute_fcr_batch(feed_weight, final_weight, initial_weight):
+        feed_weight = np.asarray(feed_weight, dtype=np.float64)
+        gain = np.asarray(final_weight, dtype=np.float64) - np.asarray(initial_weight, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(gain > 0, feed_weight / gain, np.nan)
+
+    @staticmethod
+    def compute_feed_weight_batch(feed_rate, weight):
+        return np.asarray(feed_rate, dtype=np.float64) * np.asarray(weight, dtype=np.float64) * 0.1
+
+    @staticmethod
+    def compute_sgr_batch(initial_weight, final_weight, days=180):
+        initial_weight = np.asarray(initial_weight, dtype=np.float64)
+        final_weight = np.asarray(final_weight, dtype=np.float64)
+        valid = (initial_weight > 0) & (final_weight > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sgr = (np.log(final_weight) - np.log(initial_weight)) / days * 100
+        return np.where(valid, sgr, np.nan)
+
+    @staticmethod
+    def compute_profit_margin_batch(fish_value, cost, axis=-1):
+        # fish_value/cost: per-step arrays of shape (..., n_steps) summed along `axis`,
+        # or per-episode totals with axis=None
+        fish_value = np.asarray(fish_value, dtype=np.float64)
+        cost = np.asarray(cost, dtype=np.float64)
+        if fish_value.shape != cost.shape:
+            raise ValueError(f"fish_value and cost shapes differ: {fish_value.shape} vs {cost.shape}")
+        if axis is not None:
+            fish_value = fish_value.sum(axis=axis)
+            cost = cost.sum(axis=axis)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(fish_value != 0, (fish_value - cost) / fish_value * 100, np.nan)
+
+    @staticmethod
+    def compute_energy_efficiency_batch(fish_value_gain, heat_cost, oxygenation_cost):
+        electricity_cost = np.asarray(heat_cost, dtype=np.float64) + np.asarray(oxygenation_cost, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(electricity_cost != 0, np.asarray(fish_value_gain, dtype=np.float64) / electricity_cost, np.nan)
+
+    @staticmethod
+    def _group_index(groups):
+        # groups: {name: per-episode key array}; returns (unique key columns, group id per episode)
+        names = list(groups)
+        codes, uniques = [], []
+        for name in names:
+            u, inv = np.unique(np.asarray(groups[name]), return_inverse=True)
+            uniques.append(u)
+            codes.append(inv.ravel())
+        flat = np.ravel_multi_index(codes, [len(u) for u in uniques])
+        group_flat, group_id = np.unique(flat, return_inverse=True)
+        key_codes = np.unravel_index(group_flat, [len(u) for u in uniques])
+        keys = {name: u[c] for name, u, c in zip(names, uniques, key_codes)}
+        return keys, group_id.ravel(), len(group_flat)
+
+    @staticmethod
+    def group_aggregate(values, groups):
+        """
+        NaN-aware mean/std/count of `values` per unique combination of the
+        key arrays in `groups` (e.g. {"region": ..., "policy": ..., "seed": ...}).
+        Returns a dict with one entry per key column plus "mean", "std", "count".
+        """
+        values = np.asarray(values, dtype=np.float64)
+        keys, group_id, n_groups = Calculation._group_index(groups)
+        valid = ~np.isnan(values)
+        g, v = group_id[valid], values[valid]
+
+        count = np.bincount(g, minlength=n_groups)
+        total = np.bincount(g, weights=v, minlength=n_groups)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = total / count
+            sq_dev = np.bincount(g, weights=(v - mean[g]) ** 2, minlength=n_groups)
+            std = np.sqrt(sq_dev / count)
+
+        result = dict(keys)
+        result.update({"mean": mean, "std": std, "count": count})
+        return result
+
+    @staticmethod
+    def bootstrap_ci(values, n_boot=1000, ci=0.95, groups=None, seed=None, max_chunk_elements=10_000_000):
+        """
+        Percentile bootstrap confidence interval of the mean, ignoring NaN.
+
+        Resamples are drawn as one (n_boot, n) index matrix per group,
+        processed in chunks of at most `max_chunk_elements`. Without `groups`,
+        returns (low, high). With `groups`, returns the `group_aggregate`
+        dict extended with "ci_low" and "ci_high".
+        """
+        rng = np.random.default_rng(seed)
+        values = np.asarray(values, dtype=np.float64)
+        tail = (1 - ci) / 2 * 100
+
+        def interval(v):
+            v = v[~np.isnan(v)]
+            n = len(v)
+            if n == 0:
+                return np.nan, np.nan
+            chunk = max(1, min(n_boot, max_chunk_elements // n))
+            means = np.empty(n_boot)
+            for start in range(0, n_boot, chunk):
+                stop = min(start + chunk, n_boot)
+                means[start:stop] = v[rng.integers(0, n, size=(stop - start, n))].mean(axis=1)
+            low, high = np.percentile(means, [tail, 100 - tail])
+            return low, high
+
+        if groups is None:
+            return interval(values)
+
+        result = Calculation.group_aggregate(values, groups)
+        _, group_id, n_groups = Calculation._group_index(groups)
+        order = np.argsort(group_id, kind="stable")
+        bounds = np.searchsorted(group_id[order], np.arange(n_groups + 1))
+        low, high = np.empty(n_groups), np.empty(n_groups)
+        for k in range(n_groups):
+            low[k], high[k] = interval(values[order[bounds[k]:bounds[k + 1]]])
+        result["ci_low"] = low
+        result["ci_high"] = high
+        return result
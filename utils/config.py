@@ -9,6 +9,8 @@ class DotDict(dict):
             setattr(self, key, value)
 
     def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)  # dunder lookups (copy, pickle) must not find a None "method"
         return self.get(name)
 
     def __setattr__(self, name, value):
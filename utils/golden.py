@@ -0,0 +1,270 @@
+import hashlib
+import json
+import time
+
+import numpy as np
+
+from envs.aquaculture_env import AquacultureEnv
+
+# Per-day variables of a trajectory, each of shape (T,) except observation (T, 5) and weights (T, N)
+VARIABLES = (
+    "biomass", "temperature", "dissolved_oxygen", "uia", "uia_accumulator",
+    "reward", "fish_value", "feed_cost", "heat_cost", "oxygenation_cost",
+    "observation", "weights",
+)
+
+# (rtol, atol) per variable for backends that are not bit-exact
+DEFAULT_TOLERANCES = {
+    "biomass": (1e-6, 1e-3),
+    "temperature": (1e-9, 1e-9),
+    "dissolved_oxygen": (1e-6, 1e-9),
+    "uia": (1e-6, 1e-9),
+    "uia_accumulator": (1e-6, 1e-9),
+    "reward": (1e-6, 1e-6),
+    "fish_value": (1e-6, 1e-6),
+    "feed_cost": (1e-6, 1e-6),
+    "heat_cost": (1e-6, 1e-6),
+    "oxygenation_cost": (1e-6, 1e-6),
+    "observation": (1e-5, 1e-6),  # float32
+    "weights": (1e-6, 1e-6),
+}
+
+
+# Action scripts -------------------------------------------------------------
+
+def _constant(n_days, low, high, rng):
+    return np.tile(np.array([0.6, 30.0, 0.8]), (n_days, 1))
+
+
+def _ramp(n_days, low, high, rng):
+    # Feed ramps across the range, the setpoint swings around the middle and aeration steps weekly
+    t = np.arange(n_days) / max(n_days - 1, 1)
+    feed = low[0] + t * (high[0] - low[0])
+    setpoint = (low[1] + high[1]) / 2 + (high[1] - low[1]) / 3 * np.sin(2 * np.pi * 3 * t)
+    aeration = np.where((np.arange(n_days) // 7) % 2 == 0, 0.5, 0.9)
+    return np.stack([feed, setpoint, aeration], axis=1)
+
+
+def _random(n_days, low, high, rng):
+    return rng.uniform(low, high, size=(n_days, 3))
+
+
+def _extremes(n_days, low, high, rng):
+    # Alternates the box corners and overshoots them, so every clip is exercised
+    corners = np.array([low - 0.1 * (high - low), high + 0.1 * (high - low), low, high])
+    return corners[np.arange(n_days) % len(corners)]
+
+
+ACTION_SCRIPTS = {
+    "constant": _constant,
+    "ramp": _ramp,
+    "random": _random,
+    "extremes": _extremes,
+}
+
+
+# Backends ---------------------------------------------------------------------
+# A backend is a function (region, seed, actions) -> {variable: array}; it resets to `seed`,
+# applies the (T, 3) float32 actions until the episode terminates and may return any subset of VARIABLES.
+
+def env_backend(**env_kwargs):
+    """The reference AquacultureEnv, optionally with constructor options such as reuse_buffers."""
+    def run(region, seed, actions):
+        env = AquacultureEnv(region=region, **env_kwargs)
+        env.reset(seed=seed)
+        out = {name: [] for name in VARIABLES}
+        for action in actions:
+            obs, reward, terminated, _, info = env.step(action)
+            out["biomass"].append(info["biomass"])
+            out["temperature"].append(env.temperature)
+            out["dissolved_oxygen"].append(env.dissolved_oxygen)
+            out["uia"].append(env.un_ionized_ammonia)
+            out["uia_accumulator"].append(env.uia_model.UIA)
+            out["reward"].append(reward)
+            for key in ("fish_value", "feed_cost", "heat_cost", "oxygenation_cost"):
+                out[key].append(info[key])
+            out["observation"].append(obs[:5].copy())
+            out["weights"].append([fish.weight for fish in env.fishes])
+            if terminated:
+                break
+        env.close()
+        return {name: np.array(values, dtype=np.float64) for name, values in out.items()}
+    return run
+
+
+def batch_simulator_backend(fish_subsample=None):
+    """BatchSimulator with one member, replaying the env episode's weather."""
+    from envs.batch_simulator import BatchSimulator
+
+    def run(region, seed, actions):
+        env = AquacultureEnv(region=region)
+        env.reset(seed=seed)
+        sim = BatchSimulator(env, n_members=1)
+        sim.load_env_state(env.get_state(), fish_subsample=fish_subsample, replay_weather=True)
+        out = {name: [] for name in ("biomass", "temperature", "dissolved_oxygen", "uia", "uia_accumulator",
+                                     "reward", "observation", "weights")}
+        for action in actions:
+            reward, terminated = sim.step(action[None])
+            out["biomass"].append(sim.biomass()[0])
+            out["temperature"].append(sim.temperature[0])
+            out["dissolved_oxygen"].append(sim.dissolved_oxygen[0])
+            out["uia"].append(sim.uia[0])
+            out["uia_accumulator"].append(sim.uia_model.UIA[0])
+            out["reward"].append(reward[0])
+            out["observation"].append(sim.observations()[0])
+            if fish_subsample is None:
+                out["weights"].append(sim.weights[0].copy())
+            if terminated[0]:
+                break
+        if fish_subsample is not None:
+            del out["weights"]
+        return {name: np.array(values, dtype=np.float64) for name, values in out.items()}
+    return run
+
+
+def differentiable_backend():
+    """DifferentiableSimulator's exact (non-smoothed) forward pass on the episode's weather; rewards only."""
+    from envs.differentiable_simulator import DifferentiableSimulator
+
+    def run(region, seed, actions):
+        env = AquacultureEnv(region=region)
+        env.reset(seed=seed)
+        return {"reward": DifferentiableSimulator(env, weather="oracle").simulate(actions, smooth=False)}
+    return run
+
+
+# Recording and comparison ---------------------------------------------------
+
+def _digest(values):
+    return hashlib.sha256(np.ascontiguousarray(values, dtype=np.float64).tobytes()).hexdigest()
+
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def _sample_days(n_days, sample_every):
+    days = np.arange(0, n_days, sample_every)
+    if n_days and days[-1] != n_days - 1:
+        days = np.append(days, n_days - 1)
+    return days
+
+
+def record_golden(path, backend=None, regions=None, seeds=(0, 1, 2), scripts=None, sample_every=10,
+                  params_path="parameters.yaml", verbose=True):
+    """
+    Record reference trajectories for every (region, seed, action script)
+    case into `path` (.npz). Each case stores its action sequence, the
+    SHA-256 of every variable's full trajectory, and the variable's values on
+    every `sample_every`-th day plus the last day. The default backend is the
+    plain AquacultureEnv.
+    """
+    backend = backend or env_backend()
+    regions = regions or AquacultureEnv.ALLOWED_REGIONS
+    scripts = scripts or list(ACTION_SCRIPTS)
+    probe = AquacultureEnv(region=regions[0])
+    low = probe.action_space.low.astype(np.float64)
+    high = probe.action_space.high.astype(np.float64)
+
+    arrays = {}
+    cases = []
+    for region in regions:
+        for seed in seeds:
+            for script in scripts:
+                case = f"{region}/{seed}/{script}"
+                rng = np.random.default_rng(seed)
+                # Stored in the env's action dtype, so every backend sees the same inputs
+                actions = ACTION_SCRIPTS[script](probe.max_days, low, high, rng).astype(np.float32)
+                t0 = time.perf_counter()
+                trajectory = backend(region, seed, actions)
+                n_days = len(trajectory["reward"])
+                days = _sample_days(n_days, sample_every)
+                arrays[f"{case}/actions"] = actions
+                arrays[f"{case}/days"] = days
+                for name, values in trajectory.items():
+                    arrays[f"{case}/{name}"] = values[days]
+                cases.append({
+                    "case": case, "region": region, "seed": seed, "script": script, "n_days": n_days,
+                    "hashes": {name: _digest(values) for name, values in trajectory.items()},
+                })
+                if verbose:
+                    print(f"{case}: {n_days} days in {time.perf_counter() - t0:.2f}s")
+
+    manifest = {
+        "cases": cases,
+        "sample_every": sample_every,
+        "config": _file_digest(params_path),
+        "numpy": np.__version__,
+    }
+    np.savez_compressed(path, manifest=np.array(json.dumps(manifest)), **arrays)
+    return manifest
+
+
+def compare_golden(path, backend, tolerances=None, params_path="parameters.yaml", verbose=True):
+    """
+    Replay every recorded case through `backend` and compare per variable.
+    Status is "exact" when the full-trajectory hash matches, "close" when
+    every sampled value is within (rtol, atol), "diverged" otherwise
+    (including a different episode length) and "missing" when the backend
+    does not produce the variable. Returns a list of row dicts.
+    """
+    tolerances = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    golden = np.load(path)
+    manifest = json.loads(str(golden["manifest"]))
+    if verbose and manifest["config"] != _file_digest(params_path):
+        print(f"warning: {params_path} changed since the golden file was recorded")
+
+    rows = []
+    for entry in manifest["cases"]:
+        case = entry["case"]
+        actions = golden[f"{case}/actions"]
+        days = golden[f"{case}/days"]
+        trajectory = backend(entry["region"], entry["seed"], actions)
+        n_days = len(trajectory["reward"])
+        for name, reference_hash in entry["hashes"].items():
+            row = {"case": case, "variable": name, "status": "missing",
+                   "max_abs_err": np.nan, "max_rel_err": np.nan, "first_divergent_day": None}
+            values = trajectory.get(name)
+            if values is not None:
+                if n_days != entry["n_days"]:
+                    row["status"] = "diverged"
+                    row["first_divergent_day"] = min(n_days, entry["n_days"])
+                elif _digest(values) == reference_hash:
+                    row.update(status="exact", max_abs_err=0.0, max_rel_err=0.0)
+                else:
+                    reference = golden[f"{case}/{name}"]
+                    sampled = values[days]
+                    rtol, atol = tolerances[name]
+                    err = np.abs(sampled - reference)
+                    rel = err / np.maximum(np.abs(reference), 1e-300)
+                    bad = (err > atol + rtol * np.abs(reference)).reshape(len(days), -1).any(axis=1)
+                    row["max_abs_err"] = float(err.max())
+                    row["max_rel_err"] = float(rel.max())
+                    if bad.any():
+                        row["status"] = "diverged"
+                        row["first_divergent_day"] = int(days[np.argmax(bad)])
+                    else:
+                        row["status"] = "close"
+            rows.append(row)
+
+    if verbose:
+        print_report(rows)
+    return rows
+
+
+def print_report(rows):
+    # One line per variable: status counts over cases and the worst errors
+    print(f"{'variable':<18}{'exact':>7}{'close':>7}{'diverged':>10}{'missing':>9}{'max abs':>12}{'max rel':>12}")
+    for name in VARIABLES:
+        group = [r for r in rows if r["variable"] == name]
+        if not group:
+            continue
+        counts = {s: sum(r["status"] == s for r in group) for s in ("exact", "close", "diverged", "missing")}
+        abs_err = max((r["max_abs_err"] for r in group if not np.isnan(r["max_abs_err"])), default=np.nan)
+        rel_err = max((r["max_rel_err"] for r in group if not np.isnan(r["max_rel_err"])), default=np.nan)
+        print(f"{name:<18}{counts['exact']:>7}{counts['close']:>7}{counts['diverged']:>10}{counts['missing']:>9}"
+              f"{abs_err:>12.3g}{rel_err:>12.3g}")
+    for r in rows:
+        if r["status"] == "diverged":
+            print(f"  {r['case']} {r['variable']}: diverged from day {r['first_divergent_day']}")
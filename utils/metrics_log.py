@@ -0,0 +1,132 @@
+import json
+import os
+from collections import deque
+
+import numpy as np
+
+
+class MetricsLog:
+    """
+    Append-only columnar log of per-episode metrics.
+
+    Each column is a raw little-endian float64 file `<column>.f64` inside
+    `log_dir`, next to a `columns.json` manifest. Rows are buffered in memory
+    and flushed in batches of `flush_every`, so a crash loses at most one
+    batch. Reopening an existing log appends to it.
+    """
+
+    def __init__(self, log_dir, columns, flush_every=64):
+        self.log_dir = log_dir
+        self.columns = list(columns)
+        self.flush_every = flush_every
+        os.makedirs(log_dir, exist_ok=True)
+
+        manifest = os.path.join(log_dir, "columns.json")
+        if os.path.exists(manifest):
+            with open(manifest, "r") as f:
+                existing = json.load(f)
+            if existing != self.columns:
+                raise ValueError(f"Log in '{log_dir}' has columns {existing}, expected {self.columns}")
+        else:
+            with open(manifest, "w") as f:
+                json.dump(self.columns, f)
+
+        self._buffer = np.empty((flush_every, len(self.columns)), dtype="<f8")
+        self._n = 0
+
+    def append(self, row):
+        # `row` maps column name -> value; missing columns are stored as NaN
+        for j, column in enumerate(self.columns):
+            self._buffer[self._n, j] = row.get(column, np.nan)
+        self._n += 1
+        if self._n == self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._n == 0:
+            return
+        for j, column in enumerate(self.columns):
+            with open(os.path.join(self.log_dir, f"{column}.f64"), "ab") as f:
+                f.write(np.ascontiguousarray(self._buffer[:self._n, j]).tobytes())
+        self._n = 0
+
+    def close(self):
+        self.flush()
+
+
+def read_metrics_log(log_dir):
+    """Load a MetricsLog directory into {column: float64 array}."""
+    with open(os.path.join(log_dir, "columns.json"), "r") as f:
+        columns = json.load(f)
+    data = {}
+    for column in columns:
+        path = os.path.join(log_dir, f"{column}.f64")
+        data[column] = np.fromfile(path, dtype="<f8") if os.path.exists(path) else np.empty(0)
+    # Columns are flushed one after another; trim to the rows every column has
+    n = min(len(values) for values in data.values())
+    return {column: values[:n] for column, values in data.items()}
+
+
+class RollingStats:
+    """
+    O(1) rolling mean/std over the last `window` values, plus running
+    totals over everything seen (Welford's update for the overall std).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.win_sum = 0.0
+        self.win_sq_sum = 0.0
+        self._since_resum = 0
+
+        self.count = 0
+        self.total = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, x):
+        x = float(x)
+        if len(self.values) == self.window:
+            old = self.values[0]
+            self.win_sum -= old
+            self.win_sq_sum -= old * old
+        self.values.append(x)
+        self.win_sum += x
+        self.win_sq_sum += x * x
+        self._since_resum += 1
+        if self._since_resum >= self.window:
+            # Re-sum once per window to stop floating-point drift; amortized O(1)
+            self.win_sum = sum(self.values)
+            self.win_sq_sum = sum(v * v for v in self.values)
+            self._since_resum = 0
+
+        self.count += 1
+        self.total += x
+        delta = x - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (x - self._mean)
+
+    @property
+    def full(self):
+        return len(self.values) == self.window
+
+    @property
+    def mean(self):
+        return self.win_sum / len(self.values) if self.values else float("nan")
+
+    @property
+    def std(self):
+        n = len(self.values)
+        if n == 0:
+            return float("nan")
+        var = self.win_sq_sum / n - (self.win_sum / n) ** 2
+        return max(var, 0.0) ** 0.5
+
+    @property
+    def overall_mean(self):
+        return self._mean if self.count else float("nan")
+
+    @property
+    def overall_std(self):
+        return (self._m2 / self.count) ** 0.5 if self.count else float("nan")
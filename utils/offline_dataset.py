@@ -0,0 +1,326 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model.reward_cost import RewardCost
+
+
+def transition_fields(obs_shape=(5,)):
+    # name -> (per-transition shape, dtype); raw_state is the denormalized observation
+    # [biomass g, fish count, temperature degC, DO mg/L, UIA mg/L, (stage biomass g x3)] and
+    # reward_inputs are RewardCost.TRANSITION_FIELDS, so stored data can be relabeled under other prices
+    obs_shape = tuple(obs_shape)
+    return {
+        "obs": (obs_shape, np.float32),
+        "action": ((3,), np.float32),
+        "reward": ((), np.float32),
+        "next_obs": (obs_shape, np.float32),
+        "terminal": ((), np.bool_),
+        "raw_state": (obs_shape, np.float32),
+        "next_raw_state": (obs_shape, np.float32),
+        "reward_inputs": ((len(RewardCost.TRANSITION_FIELDS),), np.float64),
+        "episode": ((), np.int64),
+    }
+
+
+# Layout of the default env (stage_obs=False)
+TRANSITION_FIELDS = transition_fields()
+
+
+# Behaviour policies -------------------------------------------------------
+
+class RandomPolicy:
+    def __init__(self, env, seed=None):
+        self.low, self.high = env.action_space.low, env.action_space.high
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, obs, env):
+        return self.rng.uniform(self.low, self.high).astype(np.float32)
+
+
+class SB3Policy:
+    def __init__(self, env, algo, path, noise_std=0.0, seed=None):
+        import stable_baselines3
+        # Saved checkpoints carry pickled schedules that do not unpickle across versions; they are not needed to act
+        custom_objects = {"learning_rate": 0.0, "lr_schedule": lambda _: 0.0}
+        self.model = getattr(stable_baselines3, algo).load(path, custom_objects=custom_objects)
+        self.low, self.high = env.action_space.low, env.action_space.high
+        self.noise_std = (self.high - self.low) * noise_std
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, obs, env):
+        action, _ = self.model.predict(obs, deterministic=True)
+        if self.noise_std.any():
+            action = action + self.rng.normal(0.0, self.noise_std)
+        return np.clip(action, self.low, self.high).astype(np.float32)
+
+
+class SetpointPolicy:
+    """
+    Heuristic controller holding fixed setpoints. Feed is cut back linearly
+    once UIA rises above `uia_limit`, and `jitter` adds Gaussian noise as a
+    fraction of each action range.
+    """
+
+    def __init__(self, env, feed=0.68, temperature=33.0, aeration=1.0, uia_limit=0.4, jitter=0.0, seed=None):
+        self.low, self.high = env.action_space.low, env.action_space.high
+        self.setpoint = np.array([feed, temperature, aeration], dtype=np.float64)
+        self.uia_limit = uia_limit
+        self.jitter = (self.high - self.low) * jitter
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, obs, env):
+        action = self.setpoint.copy()
+        uia = env.un_ionized_ammonia
+        if uia > self.uia_limit:
+            action[0] *= max(0.0, 1.0 - (uia - self.uia_limit) / self.uia_limit)
+        if self.jitter.any():
+            action += self.rng.normal(0.0, self.jitter)
+        return np.clip(action, self.low, self.high).astype(np.float32)
+
+
+POLICIES = {"random": RandomPolicy, "sb3": SB3Policy, "setpoint": SetpointPolicy}
+
+
+def make_policy(spec, env, seed=None):
+    # spec: ("random", {}), ("sb3", {"algo": "TD3", "path": ...}), ("setpoint", {...})
+    name, kwargs = spec
+    return POLICIES[name](env, seed=seed, **kwargs)
+
+
+# Chunked memmap storage ---------------------------------------------------
+
+class ChunkedTransitionWriter:
+    """
+    Writes transitions into fixed-size chunks under `root`. Each chunk is a
+    directory holding one `.npy` memmap per field, preallocated to
+    `chunk_size` rows. `fields` is the layout from `transition_fields`.
+
+    `extend` writes a batch of transitions as slices. `append` collects
+    single transitions in an in-memory buffer of `buffer_size` rows that is
+    written the same way once full, so the memmaps are never written one
+    row at a time. `close()` flushes the buffer and records the field
+    layout and the filled row count per chunk in `root/index.json`.
+    """
+
+    def __init__(self, root, chunk_size=1 << 18, fields=None, buffer_size=4096):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.fields = fields if fields is not None else TRANSITION_FIELDS
+        self.chunks = []
+        self._arrays = None
+        self._n = 0
+        self._buffer = {
+            field: np.empty((buffer_size, *shape), dtype=dtype) for field, (shape, dtype) in self.fields.items()
+        }
+        self._buffered = 0
+        os.makedirs(root, exist_ok=True)
+
+    def _open_chunk(self):
+        self._close_chunk()
+        name = f"chunk_{len(self.chunks):05d}"
+        path = os.path.join(self.root, name)
+        os.makedirs(path, exist_ok=True)
+        self._arrays = {
+            field: np.lib.format.open_memmap(
+                os.path.join(path, f"{field}.npy"), mode="w+", dtype=dtype, shape=(self.chunk_size, *shape)
+            )
+            for field, (shape, dtype) in self.fields.items()
+        }
+        self.chunks.append({"path": name, "count": 0})
+        self._n = 0
+
+    def _close_chunk(self):
+        if self._arrays is None:
+            return
+        for array in self._arrays.values():
+            array.flush()
+        self.chunks[-1]["count"] = self._n
+        self._arrays = None
+
+    def _write(self, batch, n):
+        # Copy n rows into the open chunk as slices, spilling into new chunks as they fill
+        start = 0
+        while start < n:
+            if self._arrays is None or self._n == self.chunk_size:
+                self._open_chunk()
+            take = min(n - start, self.chunk_size - self._n)
+            for field, values in batch.items():
+                self._arrays[field][self._n:self._n + take] = values[start:start + take]
+            self._n += take
+            start += take
+
+    def _flush(self):
+        if self._buffered:
+            self._write({field: values[:self._buffered] for field, values in self._buffer.items()}, self._buffered)
+            self._buffered = 0
+
+    def append(self, transition):
+        for field, value in transition.items():
+            self._buffer[field][self._buffered] = value
+        self._buffered += 1
+        if self._buffered == len(self._buffer["episode"]):
+            self._flush()
+
+    def extend(self, batch):
+        """Write a dict of arrays with one row per transition for every field."""
+        self._flush()
+        batch = {field: np.asarray(values, dtype=self.fields[field][1]) for field, values in batch.items()}
+        self._write(batch, len(batch["episode"]))
+
+    def close(self):
+        self._flush()
+        self._close_chunk()
+        index = {
+            "chunk_size": self.chunk_size,
+            "fields": {field: {"shape": list(shape), "dtype": np.dtype(dtype).str}
+                       for field, (shape, dtype) in self.fields.items()},
+            "chunks": self.chunks,
+        }
+        with open(os.path.join(self.root, "index.json"), "w") as f:
+            json.dump(index, f, indent=1)
+        return index
+
+
+def _raw_state(env):
+    raw = np.array([
+        env.prev_biomass, env._compute_fish_count(), env.temperature, env.dissolved_oxygen, env.un_ionized_ammonia
+    ], dtype=np.float32)
+    if env.stage_obs:
+        raw = np.concatenate([raw, env.stage_biomass.astype(np.float32)])
+    return raw
+
+
+def _collect(job):
+    from envs.aquaculture_env import AquacultureEnv
+
+    root, region, env_kwargs, seed, policy_spec, n_episodes, chunk_size, episode_offset = job
+    env = AquacultureEnv(region=region, **env_kwargs)
+    policy = make_policy(policy_spec, env, seed=seed)
+    writer = ChunkedTransitionWriter(root, chunk_size, fields=transition_fields(env.observation_space.shape))
+    n_transitions = 0
+    for ep in range(n_episodes):
+        # Disjoint reset seeds per job seed so jobs never replay each other's episodes
+        obs, _ = env.reset(seed=seed * 100_000 + ep)
+        obs = np.array(obs, dtype=np.float32)
+        raw = _raw_state(env)
+        episode = {field: [] for field in writer.fields}
+        done = False
+        while not done:
+            action = policy(obs, env)
+            next_obs, reward, terminated, truncated, info = env.step(action)
+            next_raw = _raw_state(env)
+            # reset() and step() may hand back a reused buffer, so keep copies of the observations
+            next_obs = np.array(next_obs, dtype=np.float32)
+            episode["obs"].append(obs)
+            episode["action"].append(action)
+            episode["reward"].append(reward)
+            episode["next_obs"].append(next_obs)
+            episode["terminal"].append(terminated)
+            episode["raw_state"].append(raw)
+            episode["next_raw_state"].append(next_raw)
+            episode["reward_inputs"].append([info[key] for key in RewardCost.TRANSITION_FIELDS])
+            obs, raw = next_obs, next_raw
+            done = terminated or truncated
+        # One slice write per field and episode instead of one row write per field and step
+        episode["episode"] = np.full(len(episode["reward"]), episode_offset + ep)
+        writer.extend(episode)
+        n_transitions += len(episode["reward"])
+    env.close()
+    writer.close()
+    return n_transitions
+
+
+def generate_dataset(root, regions, seeds, policy_specs, episodes_per_job=10, n_workers=None, chunk_size=1 << 18,
+                     env_kwargs=None):
+    """
+    Collect transitions for every (region, seed, policy) combination on a
+    process pool. Each job writes its own chunk directory `root/job_XXXXX`,
+    and the parent writes `root/dataset.json`, which lists the jobs and
+    their metadata for TransitionDataset. `env_kwargs` are passed to every
+    AquacultureEnv (e.g. `{"stage_obs": True}`); the stored observation
+    shape follows the env's observation space.
+    """
+    env_kwargs = dict(env_kwargs or {})
+    os.makedirs(root, exist_ok=True)
+    jobs, meta = [], []
+    for region in regions:
+        for seed in seeds:
+            for policy_name, policy_spec in policy_specs.items():
+                job_id = len(jobs)
+                path = os.path.join(root, f"job_{job_id:05d}")
+                jobs.append((path, region, env_kwargs, seed, policy_spec, episodes_per_job, chunk_size,
+                             job_id * episodes_per_job))
+                meta.append({"path": os.path.basename(path), "region": region, "seed": seed, "policy": policy_name})
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        counts = list(pool.map(_collect, jobs))
+    for entry, count in zip(meta, counts):
+        entry["transitions"] = count
+
+    with open(os.path.join(root, "dataset.json"), "w") as f:
+        json.dump({"jobs": meta, "env_kwargs": env_kwargs, "fields": list(TRANSITION_FIELDS)}, f, indent=1)
+    return meta
+
+
+class TransitionDataset:
+    """
+    Read-only view over a generated dataset. Chunks are opened as
+    memmaps, so only sampled rows are paged in from disk.
+    """
+
+    def __init__(self, root):
+        with open(os.path.join(root, "dataset.json"), "r") as f:
+            self.meta = json.load(f)
+        self.fields = TRANSITION_FIELDS
+        self.chunks, counts, job_ids = [], [], []
+        for job_id, job in enumerate(self.meta["jobs"]):
+            job_root = os.path.join(root, job["path"])
+            with open(os.path.join(job_root, "index.json"), "r") as f:
+                index = json.load(f)
+            if isinstance(index["fields"], dict):
+                # Per-field shape and dtype as written by ChunkedTransitionWriter.close
+                self.fields = {field: (tuple(spec["shape"]), np.dtype(spec["dtype"]))
+                               for field, spec in index["fields"].items()}
+            else:
+                # Older datasets only list the field names and use the default layout
+                self.fields = TRANSITION_FIELDS
+            for chunk in index["chunks"]:
+                if chunk["count"] == 0:
+                    continue
+                chunk_path = os.path.join(job_root, chunk["path"])
+                self.chunks.append({
+                    field: np.load(os.path.join(chunk_path, f"{field}.npy"), mmap_mode="r")
+                    for field in self.fields
+                })
+                counts.append(chunk["count"])
+                job_ids.append(job_id)
+        self.counts = np.array(counts, dtype=np.int64)
+        self.job_ids = np.array(job_ids, dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def get(self, indices, fields=None):
+        # Gather global row indices chunk by chunk; rows come back in the order requested
+        indices = np.asarray(indices, dtype=np.int64)
+        fields = list(fields or self.fields)
+        chunk_idx = np.searchsorted(self.offsets, indices, side="right") - 1
+        out = {
+            field: np.empty((len(indices), *self.fields[field][0]), dtype=self.fields[field][1])
+            for field in fields
+        }
+        for c in np.unique(chunk_idx):
+            mask = chunk_idx == c
+            rows = indices[mask] - self.offsets[c]
+            order = np.argsort(rows)  # ascending reads are kinder to the page cache
+            for field in fields:
+                out[field][np.flatnonzero(mask)[order]] = self.chunks[c][field][rows[order]]
+        return out
+
+    def sample(self, batch_size, rng=None, fields=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        return self.get(rng.integers(0, len(self), size=batch_size), fields)
@@ -1,44 +1,117 @@
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from stable_baselines3.common.callbacks import BaseCallback
 
+from utils.metrics_log import MetricsLog, RollingStats
+
 class PlotCallback(BaseCallback):
     def __init__(self, window: int = 1, save_path: str = "training_rewards.png",
-                 title: str = "Training Rewards", verbose=0):
+                 title: str = "Training Rewards", verbose=0,
+                 log_dir: str = None, info_keys=(), flush_every: int = 64,
+                 plot_every: int = None):
+        """
+        :param log_dir: if set, stream per-episode metrics (reward, length and the
+            episode sums of `info_keys`, e.g. "feed_cost", "heat_cost") to a
+            columnar MetricsLog there in batches of `flush_every` episodes
+        :param plot_every: if set, redraw `save_path` on a background thread every
+            `plot_every` episodes; the training thread never waits for matplotlib
+        """
         super().__init__(verbose)
         self.window     = window
         self.save_path  = save_path
         self.title      = title
         self.episode_rewards = []
 
+        self.info_keys = list(info_keys)
+        self.log = None
+        if log_dir is not None:
+            self.log = MetricsLog(log_dir, ["reward", "length"] + self.info_keys, flush_every)
+        self.stats = RollingStats(max(window, 1))
+        self.moving_average = []  # rolling mean after each episode, maintained incrementally
+        self._info_sums = None
+
+        self.plot_every = plot_every
+        self._lock = threading.Lock()
+        self._plot_request = threading.Event()
+        self._stop = threading.Event()
+        self._plot_thread = None
+
+    def _on_training_start(self) -> None:
+        self._info_sums = np.zeros((self.training_env.num_envs, len(self.info_keys)))
+        if self.plot_every:
+            self._stop.clear()  # set by the previous learn() call when the instance is reused
+            self._plot_thread = threading.Thread(target=self._plot_loop, daemon=True)
+            self._plot_thread.start()
+
     def _on_step(self) -> bool:
         infos = self.locals.get("infos", [])
-        for info in infos:
+        for env_idx, info in enumerate(infos):
+            if self.info_keys:
+                for k, key in enumerate(self.info_keys):
+                    self._info_sums[env_idx, k] += info.get(key, 0.0)
             ep = info.get("episode")
             if ep is not None:
-                self.episode_rewards.append(ep["r"])
+                self._record_episode(ep, env_idx)
         return True
 
-    def _on_training_end(self) -> None:
-        data = np.array(self.episode_rewards)
-        total_reward = np.sum(data)
-        reward_std = np.std(data)
+    def _record_episode(self, ep, env_idx):
+        reward = ep["r"]
+        with self._lock:
+            self.episode_rewards.append(reward)
+            self.stats.update(reward)
+            self.moving_average.append(self.stats.mean)
 
-        if self.window > 1 and len(data) >= self.window:
-            ma = np.convolve(data, np.ones(self.window) / self.window, mode="valid")
-        else:
-            ma = data
+        if self.log is not None:
+            row = {"reward": reward, "length": ep["l"]}
+            for k, key in enumerate(self.info_keys):
+                row[key] = self._info_sums[env_idx, k]
+            self.log.append(row)
+        if self.info_keys:
+            self._info_sums[env_idx] = 0.0
 
-        # Plotting
-        plt.switch_backend('Agg')
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.plot(ma)
+        if self.plot_every and len(self.episode_rewards) % self.plot_every == 0:
+            self._plot_request.set()
+
+    def _curve(self):
+        # Same curve as a 'valid' convolution with a box window, without recomputing it
+        with self._lock:
+            if self.window > 1 and len(self.moving_average) >= self.window:
+                return np.array(self.moving_average[self.window - 1:])
+            return np.array(self.episode_rewards)
+
+    def _draw(self, curve):
+        # Figure + Agg canvas instead of pyplot, so drawing is safe off the main thread
+        fig = Figure(figsize=(10, 5))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.plot(curve)
         ax.set_title(self.title)
         ax.set_xlabel("Episode")
         ax.set_ylabel("Reward")
         ax.grid(True)
         fig.savefig(self.save_path)
-        plt.close(fig)
+
+    def _plot_loop(self):
+        while not self._stop.is_set():
+            if self._plot_request.wait(timeout=0.5):
+                self._plot_request.clear()
+                self._draw(self._curve())
+
+    def _on_training_end(self) -> None:
+        if self._plot_thread is not None:
+            self._stop.set()
+            self._plot_thread.join()
+            self._plot_thread = None
+        if self.log is not None:
+            self.log.flush()
+
+        total_reward = self.stats.total
+        reward_std = self.stats.overall_std if self.stats.count else 0.0
+
+        # Plotting
+        self._draw(self._curve())
 
         # Print reward summary
         print(f"✅ Training curve saved to: {self.save_path}")
@@ -0,0 +1,274 @@
+import asyncio
+import functools
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+OBS_SIZE = 5
+ACTION_SIZE = 3
+# TCP frames: one little-endian float32 observation in, one float32 action out
+_OBS_FRAME = struct.Struct(f"<{OBS_SIZE}f")
+_ACTION_FRAME = struct.Struct(f"<{ACTION_SIZE}f")
+
+
+def load_sb3_policy(path, algo="TD3", device="cpu"):
+    """Batched predict function (B, 5) -> (B, 3) for a saved Stable-Baselines3 model."""
+    import stable_baselines3
+    # Saved checkpoints carry pickled schedules that do not unpickle across versions; they are not needed to act
+    custom_objects = {"learning_rate": 0.0, "lr_schedule": lambda _: 0.0}
+    model = getattr(stable_baselines3, algo).load(path, device=device, custom_objects=custom_objects)
+
+    def predict(obs):
+        actions, _ = model.predict(obs, deterministic=True)
+        return actions
+
+    return predict
+
+
+class PolicyServer:
+    """
+    Micro-batching inference front end for one policy shared by many tanks.
+
+    `act(obs)` queues a single observation and awaits its action. A batcher
+    task takes the first waiting request, keeps collecting until
+    `max_batch_size` requests are queued or `max_latency_ms` has passed
+    since that first request, then runs one forward pass of
+    `predict_fn((B, 5)) -> (B, 3)` on a worker thread. The event loop keeps
+    accepting requests during the forward pass, so the next batch fills
+    while the current one runs.
+
+    `serve(host, port)` exposes the same path over TCP. Each connection
+    sends 20-byte float32 observation frames and receives a 12-byte float32
+    action frame per request.
+
+    `act` raises RuntimeError unless the server is started. `stop` fails
+    every queued or in-flight request with RuntimeError, and a stopped
+    server can be started again. A TCP connection whose request fails is
+    closed.
+
+    `latencies` records, per answered request, the seconds from enqueueing
+    it to setting its result, i.e. queueing, batching and the forward pass.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=256, max_latency_ms=2.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self._queue = None
+        self._batcher = None
+        self._executor = None
+        self._obs = np.empty((max_batch_size, OBS_SIZE), dtype=np.float32)
+        self.batch_sizes = []
+        self.latencies = []
+
+    async def start(self):
+        if self._batcher is None:
+            self._queue = asyncio.Queue()
+            self._executor = ThreadPoolExecutor(max_workers=1)
+            self._batcher = asyncio.get_running_loop().create_task(self._batch_loop())
+
+    async def stop(self):
+        if self._batcher is None:
+            return
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._batcher = None
+        queue, self._queue = self._queue, None
+        while not queue.empty():
+            _, future, _ = queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("PolicyServer stopped"))
+        self._executor.shutdown(wait=False)
+        self._executor = None
+
+    async def act(self, obs):
+        if self._queue is None:
+            raise RuntimeError("PolicyServer is not running; await start() first")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put_nowait((obs, future, loop.time()))
+        return await future
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            pending = [await queue.get()]
+            deadline = loop.time() + self.max_latency
+            while len(pending) < self.max_batch_size:
+                if queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        pending.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    pending.append(queue.get_nowait())
+
+            n = len(pending)
+            batch = self._obs[:n]
+            for i, (obs, _, _) in enumerate(pending):
+                batch[i] = obs
+            try:
+                actions = await loop.run_in_executor(self._executor, self.predict_fn, batch)
+            except asyncio.CancelledError:
+                for _, future, _ in pending:
+                    if not future.done():
+                        future.set_exception(RuntimeError("PolicyServer stopped"))
+                raise
+            except Exception as exc:
+                for _, future, _ in pending:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            self.batch_sizes.append(n)
+            now = loop.time()
+            for (_, future, enqueued), action in zip(pending, actions):
+                if not future.done():
+                    future.set_result(np.array(action, dtype=np.float32))
+                    self.latencies.append(now - enqueued)
+
+    # TCP front end ----------------------------------------------------------
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                frame = await reader.readexactly(_OBS_FRAME.size)
+                action = await self.act(np.array(_OBS_FRAME.unpack(frame), dtype=np.float32))
+                writer.write(_ACTION_FRAME.pack(*action.tolist()))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        except Exception:
+            pass  # the server stopped or predict_fn failed; closing tells the client
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        await self.start()
+        return await asyncio.start_server(self._handle, host, port)
+
+
+class TCPPolicyClient:
+    """One tank's connection to a PolicyServer started with `serve`."""
+
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765):
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def act(self, obs):
+        self.writer.write(_OBS_FRAME.pack(*np.asarray(obs, dtype=np.float32).tolist()))
+        frame = await self.reader.readexactly(_ACTION_FRAME.size)
+        return np.array(_ACTION_FRAME.unpack(frame), dtype=np.float32)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def _tank(client, env, seed, n_requests, latencies, interval, env_pool):
+    # Env steps run on `env_pool` so the simulated tanks do not block the server's event loop
+    loop = asyncio.get_running_loop()
+    obs, _ = await loop.run_in_executor(env_pool, functools.partial(env.reset, seed=seed))
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        action = await client.act(obs)
+        latencies.append(time.perf_counter() - start)
+        obs, _, terminated, truncated, _ = await loop.run_in_executor(env_pool, env.step, action)
+        if terminated or truncated:
+            obs, _ = await loop.run_in_executor(env_pool, env.reset)
+        if interval:
+            await asyncio.sleep(interval)
+
+
+async def run_load_test(predict_fn, n_tanks=200, requests_per_tank=50, max_batch_size=256, max_latency_ms=2.0,
+                        region="guangdong", interval=0.0, use_tcp=False, port=8765, env_workers=4):
+    """
+    Drive a PolicyServer with `n_tanks` simulated AquacultureEnv tanks. Each
+    tank sends its observation, waits for the action, steps its env and
+    repeats `requests_per_tank` times, optionally pausing `interval` seconds
+    between requests. With `use_tcp=True` requests go through the TCP front end.
+
+    Env resets and steps run on a pool of `env_workers` threads, off the
+    event loop. The latency percentiles (ms) are the server's, from enqueue
+    to result; `roundtrip_p50_ms`/`roundtrip_p99_ms` are as seen by the
+    tanks and also include TCP and scheduling. Throughput (requests/s) still
+    depends on how fast the tanks step their envs.
+    """
+    from envs.aquaculture_env import AquacultureEnv
+
+    server = PolicyServer(predict_fn, max_batch_size, max_latency_ms)
+    envs = [AquacultureEnv(region=region) for _ in range(n_tanks)]
+    env_pool = ThreadPoolExecutor(max_workers=env_workers)
+    roundtrips = []
+    tcp_server = None
+    if use_tcp:
+        tcp_server = await server.serve(port=port)
+        clients = [await TCPPolicyClient.connect(port=port) for _ in range(n_tanks)]
+    else:
+        await server.start()
+        clients = [server] * n_tanks
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _tank(client, env, seed, requests_per_tank, roundtrips, interval, env_pool)
+        for seed, (client, env) in enumerate(zip(clients, envs))
+    ])
+    elapsed = time.perf_counter() - start
+
+    if use_tcp:
+        for client in clients:
+            await client.close()
+        tcp_server.close()
+        await tcp_server.wait_closed()
+    await server.stop()
+    env_pool.shutdown()
+    for env in envs:
+        env.close()
+
+    latencies_ms = np.array(server.latencies) * 1000
+    roundtrips_ms = np.array(roundtrips) * 1000
+    return {
+        "requests": len(roundtrips),
+        "throughput_rps": len(roundtrips) / elapsed,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "roundtrip_p50_ms": float(np.percentile(roundtrips_ms, 50)),
+        "roundtrip_p99_ms": float(np.percentile(roundtrips_ms, 99)),
+        "mean_batch_size": float(np.mean(server.batch_sizes)),
+        "batches": len(server.batch_sizes),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load-test micro-batched policy inference")
+    parser.add_argument("--model", default="saved_model/td3_best_model.zip")
+    parser.add_argument("--algo", default="TD3")
+    parser.add_argument("--tanks", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--tcp", action="store_true")
+    parser.add_argument("--env-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    policy = load_sb3_policy(args.model, args.algo)
+    for batch_size in (1, args.batch_size):
+        stats = asyncio.run(run_load_test(policy, args.tanks, args.requests, batch_size, args.latency_ms,
+                                          use_tcp=args.tcp, env_workers=args.env_workers))
+        print(f"max_batch_size={batch_size:>4}: {stats['throughput_rps']:>8.0f} req/s, "
+              f"server p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, "
+              f"round trip p50 {stats['roundtrip_p50_ms']:.2f} ms, "
+              f"mean batch {stats['mean_batch_size']:.1f}")
@@ -0,0 +1,93 @@
+import time
+
+
+class StageProfiler:
+    """
+    Cumulative wall time and call counts per named stage.
+
+    Callers keep a running timestamp and hand it to `lap`, which charges the
+    time since that timestamp to a stage and returns the new timestamp:
+
+        t = profiler.start()
+        ...                       # work
+        t = profiler.lap("growth", t)
+
+    When profiling is disabled the owner simply holds `None` instead of a
+    profiler, so the disabled cost is a single `is not None` check per stage.
+    """
+
+    def __init__(self, stages=()):
+        self.clock = time.perf_counter
+        self.totals = {}
+        self.counts = {}
+        for stage in stages:
+            self.totals[stage] = 0.0
+            self.counts[stage] = 0
+
+    def start(self):
+        return self.clock()
+
+    def lap(self, stage, t_start):
+        now = self.clock()
+        self.totals[stage] = self.totals.get(stage, 0.0) + (now - t_start)
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+        return now
+
+    def reset(self):
+        for stage in self.totals:
+            self.totals[stage] = 0.0
+            self.counts[stage] = 0
+
+    def stats(self):
+        # {stage: {"calls": n, "total_s": seconds, "mean_s": seconds per call}}
+        return {
+            stage: {
+                "calls": self.counts[stage],
+                "total_s": total,
+                "mean_s": total / self.counts[stage] if self.counts[stage] else 0.0,
+            }
+            for stage, total in self.totals.items()
+        }
+
+    def summary(self):
+        grand_total = sum(self.totals.values()) or 1.0
+        lines = [f"{'stage':<16}{'calls':>10}{'total [s]':>14}{'mean [us]':>14}{'share':>9}"]
+        for stage, s in self.stats().items():
+            lines.append(
+                f"{stage:<16}{s['calls']:>10}{s['total_s']:>14.4f}"
+                f"{s['mean_s'] * 1e6:>14.1f}{s['total_s'] / grand_total:>9.1%}"
+            )
+        return "\n".join(lines)
+
+
+def step_allocations(env, action, n_steps=100, warmup=10, seed=0):
+    """
+    Measure memory allocated by `env.step(action)` in steady state with tracemalloc.
+
+    Steps `warmup` times first so caches and buffers exist, then traces
+    `n_steps` steps of the same episode (stopping early at termination).
+    Returns bytes per step: "net" is memory still held after each step
+    (leaks or growing state), "peak" is the transient high-water mark above
+    the pre-step level (temporaries that are allocated and freed again).
+    """
+    import tracemalloc
+
+    env.reset(seed=seed)
+    for _ in range(warmup):
+        env.step(action)
+
+    net, peak = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(n_steps):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            _, _, terminated, truncated, _ = env.step(action)
+            current, high = tracemalloc.get_traced_memory()
+            net.append(current - before)
+            peak.append(high - before)
+            if terminated or truncated:
+                break
+    finally:
+        tracemalloc.stop()
+    return {"steps": len(net), "net": sum(net) / len(net), "peak": max(peak), "mean_peak": sum(peak) / len(peak)}
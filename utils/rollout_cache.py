@@ -0,0 +1,296 @@
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.calculation import Calculation
+from utils.offline_dataset import make_policy
+
+# Source files a cached rollout's result depends on, relative to the repo root: the dynamics,
+# the config loader, the behaviour policies make_policy builds and the summary metrics
+SIMULATOR_SOURCES = (
+    "envs/aquaculture_env.py", "model/*.py", "utils/config.py", "utils/offline_dataset.py", "utils/calculation.py",
+)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAJECTORY_FIELDS = ("obs", "action", "reward", "biomass")
+
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def simulator_hash(root=REPO_ROOT):
+    # Resolved from this file rather than the working directory, so a notebook elsewhere hashes the same sources
+    h = hashlib.sha256()
+    found = False
+    for pattern in SIMULATOR_SOURCES:
+        for path in sorted(glob.glob(os.path.join(root, pattern))):
+            h.update(os.path.relpath(path, root).encode())
+            h.update(_file_hash(path).encode())
+            found = True
+    if not found:
+        raise FileNotFoundError(f"No simulator sources under '{root}'")
+    return h.hexdigest()
+
+
+def rollout_key(policy_spec, region, seed, options=None, env_kwargs=None, params_path="parameters.yaml",
+                simulator=None):
+    """
+    Cache key of one evaluation episode. Policy checkpoints (the "path" of an
+    sb3 spec), parameters.yaml and the simulator sources enter by content
+    hash, so a retrained checkpoint or an edited config never hits a stale
+    entry; seed, region, reset options and env kwargs enter by value.
+    """
+    name, kwargs = policy_spec
+    kwargs = dict(kwargs)
+    if "path" in kwargs:
+        kwargs["path"] = _file_hash(kwargs["path"])
+    payload = {
+        "policy": [name, kwargs],
+        "region": region,
+        "seed": seed,
+        "options": options or {},
+        "env": env_kwargs or {},
+        "config": _file_hash(params_path),
+        "simulator": simulator or simulator_hash(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+class RolloutCache:
+    """
+    Persistent store of evaluation rollouts under `root`.
+
+    A SQLite index (`index.sqlite`, WAL mode) maps each key to the episode
+    summary (JSON), the name of the optional trajectory file (`.npz`), the
+    entry's size and its last access time. Trajectory files are written under
+    a unique name and moved into place with os.replace, so a reader never
+    sees a partial file. Index updates run in IMMEDIATE transactions, so
+    pool workers can read and write the same cache concurrently. Once the
+    total size passes `max_bytes`, the least recently used entries are
+    evicted.
+    """
+
+    def __init__(self, root, max_bytes=1 << 30):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(root, "trajectories"), exist_ok=True)
+        self._conn = None
+        self._pid = None
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rollouts (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                trajectory TEXT,
+                nbytes INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS rollouts_lru ON rollouts (last_access)")
+
+    def _connection(self):
+        # One connection per process; a forked worker must not reuse its parent's
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(os.path.join(self.root, "index.sqlite"), timeout=60, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    def __getstate__(self):
+        return {"root": self.root, "max_bytes": self.max_bytes, "_conn": None, "_pid": None}
+
+    def _path(self, name):
+        return os.path.join(self.root, "trajectories", name)
+
+    def get(self, key, trajectory=False):
+        """
+        (summary, trajectory) for `key`, or None on a miss. The trajectory is
+        None unless requested; an entry stored without one is a miss when it is.
+        """
+        conn = self._connection()
+        row = conn.execute("SELECT summary, trajectory FROM rollouts WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        summary, name = json.loads(row[0]), row[1]
+        data = None
+        if trajectory:
+            if name is None:
+                return None
+            try:
+                with np.load(self._path(name)) as f:
+                    data = {field: f[field] for field in f.files}
+            except FileNotFoundError:
+                return None  # evicted between the lookup and the read
+        conn.execute("UPDATE rollouts SET last_access = ? WHERE key = ?", (time.time(), key))
+        return summary, data
+
+    def put(self, key, summary, trajectory=None):
+        name = None
+        nbytes = len(json.dumps(summary))
+        if trajectory is not None:
+            name = f"{key}_{uuid.uuid4().hex[:8]}.npz"
+            tmp = self._path(f"{name}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.savez(f, **trajectory)
+            os.replace(tmp, self._path(name))
+            nbytes += os.path.getsize(self._path(name))
+
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            old = conn.execute("SELECT trajectory FROM rollouts WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO rollouts VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(summary), name, nbytes, now, now),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if old is not None and old[0] is not None and old[0] != name:
+            self._remove(old[0])
+        self.evict()
+
+    def _remove(self, name):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def evict(self, max_bytes=None):
+        """Drop least recently used entries until the cache fits in `max_bytes`. Returns the number dropped."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            total = conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM rollouts").fetchone()[0]
+            doomed = []
+            if total > max_bytes:
+                for key, name, nbytes in conn.execute(
+                    "SELECT key, trajectory, nbytes FROM rollouts ORDER BY last_access"
+                ):
+                    if total <= max_bytes:
+                        break
+                    doomed.append((key, name))
+                    total -= nbytes
+                conn.executemany("DELETE FROM rollouts WHERE key = ?", [(key,) for key, _ in doomed])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        # Files go only after the rows are gone, so no reader is sent to a deleted file
+        for _, name in doomed:
+            if name is not None:
+                self._remove(name)
+        return len(doomed)
+
+    def __contains__(self, key):
+        return self._connection().execute("SELECT 1 FROM rollouts WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM rollouts").fetchone()[0]
+
+    def total_bytes(self):
+        return self._connection().execute("SELECT COALESCE(SUM(nbytes), 0) FROM rollouts").fetchone()[0]
+
+    def clear(self):
+        self.evict(max_bytes=-1)
+
+
+def run_episode(policy_spec, region, seed, options=None, env_kwargs=None, keep_trajectory=False):
+    """One evaluation episode; returns (summary dict, trajectory dict or None)."""
+    from envs.aquaculture_env import AquacultureEnv
+
+    env = AquacultureEnv(region=region, **(env_kwargs or {}))
+    policy = make_policy(policy_spec, env, seed=seed)
+    obs, _ = env.reset(seed=seed, options=options)
+    initial_biomass = env.prev_biomass
+    totals = {"reward": 0.0, "fish_value": 0.0, "feed_cost": 0.0, "heat_cost": 0.0, "oxygenation_cost": 0.0}
+    feed = 0.0
+    traj = {field: [] for field in TRAJECTORY_FIELDS}
+    done = False
+    while not done:
+        action = policy(obs, env)
+        next_obs, reward, terminated, truncated, info = env.step(action)
+        totals["reward"] += reward
+        for name in ("fish_value", "feed_cost", "heat_cost", "oxygenation_cost"):
+            totals[name] += info[name]
+        feed += info["feed_amount"]
+        if keep_trajectory:
+            traj["obs"].append(obs.copy())
+            traj["action"].append(action)
+            traj["reward"].append(reward)
+            traj["biomass"].append(info["biomass"])
+        obs = next_obs
+        done = terminated or truncated
+    env.close()
+
+    final_biomass = env.prev_biomass
+    fcr = Calculation.compute_fcr(feed / 1000, final_biomass / 1000, initial_biomass / 1000)
+    sgr = Calculation.compute_sgr(initial_biomass, final_biomass, days=max(env.day, 1))
+    summary = {name: float(value) for name, value in totals.items()}
+    summary.update({
+        "days": int(env.day),
+        "initial_biomass": float(initial_biomass),
+        "final_biomass": float(final_biomass),
+        "feed": float(feed),
+        "fcr": None if fcr is None else float(fcr),  # None when there was no weight gain
+        "sgr": None if sgr is None else float(sgr),
+    })
+    trajectory = None
+    if keep_trajectory:
+        trajectory = {name: np.asarray(values) for name, values in traj.items()}
+    return summary, trajectory
+
+
+def _cached_episode(job):
+    root, max_bytes, key, policy_spec, region, seed, options, env_kwargs, keep_trajectory = job
+    summary, trajectory = run_episode(policy_spec, region, seed, options, env_kwargs, keep_trajectory)
+    if root is not None:
+        RolloutCache(root, max_bytes).put(key, summary, trajectory)
+    return summary, trajectory
+
+
+def evaluate_policy(policy_spec, region, seeds, cache=None, options=None, env_kwargs=None, keep_trajectory=False,
+                    n_workers=None, params_path="parameters.yaml"):
+    """
+    Evaluate `policy_spec` (as in utils.offline_dataset.make_policy) for one
+    episode per seed, serving repeats from `cache` (a RolloutCache). Misses
+    run on a process pool when `n_workers` > 1, and each worker stores its
+    own results. Returns the summaries in seed order, plus the trajectories
+    when `keep_trajectory` is set.
+    """
+    simulator = simulator_hash()
+    keys = [rollout_key(policy_spec, region, seed, options, env_kwargs, params_path, simulator) for seed in seeds]
+    results = [cache.get(key, keep_trajectory) if cache is not None else None for key in keys]
+    missing = [i for i, hit in enumerate(results) if hit is None]
+
+    root = cache.root if cache is not None else None
+    max_bytes = cache.max_bytes if cache is not None else None
+    jobs = [(root, max_bytes, keys[i], policy_spec, region, seeds[i], options, env_kwargs, keep_trajectory)
+            for i in missing]
+    if n_workers is not None and n_workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            computed = list(pool.map(_cached_episode, jobs))
+    else:
+        computed = [_cached_episode(job) for job in jobs]
+    for i, result in zip(missing, computed):
+        results[i] = result
+
+    summaries = [summary for summary, _ in results]
+    if keep_trajectory:
+        return summaries, [trajectory for _, trajectory in results]
+    return summaries
@@ -0,0 +1,129 @@
+import time
+import numpy as np
+from scipy.stats import qmc
+
+from envs.batch_simulator import BatchSimulator
+from utils.calculation import Calculation
+
+METRICS = ("profit", "fcr", "final_biomass")
+
+
+def saltelli_sample(bounds, n, seed=None):
+    """
+    Saltelli design over `bounds` ({qualified name: (low, high)}).
+
+    Draws a scrambled Sobol sequence of dimension 2D, splits it into base
+    matrices A and B (n, D), and builds AB[i] = A with column i taken from B.
+    Returns (names, A, B, AB), with AB of shape (D, n, D). The model is run on
+    n * (D + 2) parameter sets in total. `n` should be a power of two.
+    """
+    names = list(bounds)
+    D = len(names)
+    low = np.array([bounds[k][0] for k in names], dtype=np.float64)
+    high = np.array([bounds[k][1] for k in names], dtype=np.float64)
+    base = qmc.Sobol(d=2 * D, scramble=True, seed=seed).random(n)
+    A = qmc.scale(base[:, :D], low, high)
+    B = qmc.scale(base[:, D:], low, high)
+    AB = np.repeat(A[None], D, axis=0)
+    for i in range(D):
+        AB[i, :, i] = B[:, i]
+    return names, A, B, AB
+
+
+def jansen_indices(y_A, y_B, y_AB):
+    """
+    First-order (S1) and total (ST) Sobol indices with Jansen's estimators:
+        S1_i = (V - mean((y_B - y_AB_i)^2) / 2) / V
+        ST_i = mean((y_A - y_AB_i)^2) / 2 / V
+    where V is the variance of the outputs on A and B. Rows with a NaN
+    output (e.g. an undefined FCR) are dropped per index.
+    """
+    V = np.nanvar(np.concatenate([y_A, y_B]))
+    if not V > 0:
+        nan = np.full(len(y_AB), np.nan)
+        return nan, nan.copy()
+    S1 = (V - 0.5 * np.nanmean((y_B[None] - y_AB) ** 2, axis=1)) / V
+    ST = 0.5 * np.nanmean((y_A[None] - y_AB) ** 2, axis=1) / V
+    return S1, ST
+
+
+def constant_policy(action):
+    action = np.asarray(action, dtype=np.float64)
+    return lambda obs: np.broadcast_to(action, (len(obs), 3))
+
+
+def evaluate_parameters(env, names, values, policy=None, batch_size=4096, fish_subsample=20, seed=None):
+    """
+    Run one episode per parameter row of `values` (M, D) from the env's
+    current state, in BatchSimulator batches of `batch_size` members.
+    `policy(obs)` maps normalized observations (K, 5) to actions (K, 3);
+    the default holds the middle of the action box. All members share the
+    initial population and each day's weather, so outputs differ only
+    through the parameters. Returns {metric: (M,) array} for METRICS.
+    """
+    if policy is None:
+        policy = constant_policy((env.action_space.low + env.action_space.high) / 2)
+    state = env.get_state()
+    if seed is None:
+        # One weather seed for every batch, so batches also share their weather
+        seed = int(np.random.default_rng().integers(2**32))
+    M = len(values)
+    out = {metric: np.empty(M) for metric in METRICS}
+    for start in range(0, M, batch_size):
+        stop = min(start + batch_size, M)
+        sim = BatchSimulator(env, n_members=stop - start, seed=seed, shared_weather=True)
+        sim.load_env_state(state, fish_subsample=fish_subsample)
+        sim.set_parameters({name: values[start:stop, j] for j, name in enumerate(names)})
+
+        initial = sim.biomass()
+        final = initial.copy()
+        profit = np.zeros(sim.n_members)
+        feed = np.zeros(sim.n_members)
+        alive = np.ones(sim.n_members, dtype=bool)
+        while alive.any():
+            actions = policy(sim.observations())
+            reward, terminated = sim.step(actions)
+            profit += np.where(alive, reward, 0.0)
+            feed += np.where(alive, Calculation.compute_feed_weight_batch(actions[:, 0], sim.biomass()), 0.0)
+            # A terminated member keeps the biomass of its last live day
+            final = np.where(alive, sim.biomass(), final)
+            alive &= ~terminated
+
+        out["profit"][start:stop] = profit
+        out["final_biomass"][start:stop] = final
+        out["fcr"][start:stop] = Calculation.compute_fcr_batch(feed / 1000, final / 1000, initial / 1000)
+    return out
+
+
+def sobol_sensitivity(env, bounds, n=1024, policy=None, batch_size=4096, fish_subsample=20, seed=None,
+                      verbose=True):
+    """
+    Global sensitivity of profit, FCR and final biomass to the parameters in
+    `bounds` (qualified names as in BatchSimulator.set_parameters, e.g.
+    {"ind_growth_model.kappa": (3.5, 5.5), "reward.P_f": (0.8, 1.4)}).
+    The parameters are sampled uniformly with a Saltelli design.
+
+    Returns {metric: {"S1": {name: index}, "ST": {name: index}}} plus the
+    raw samples and outputs under "samples".
+    """
+    t0 = time.perf_counter()
+    names, A, B, AB = saltelli_sample(bounds, n, seed=seed)
+    D = len(names)
+    values = np.concatenate([A, B, AB.reshape(D * n, D)])
+    outputs = evaluate_parameters(env, names, values, policy, batch_size, fish_subsample, seed)
+
+    result = {}
+    for metric in METRICS:
+        y = outputs[metric]
+        S1, ST = jansen_indices(y[:n], y[n:2 * n], y[2 * n:].reshape(D, n))
+        result[metric] = {"S1": dict(zip(names, S1.tolist())), "ST": dict(zip(names, ST.tolist()))}
+    result["samples"] = {"names": names, "values": values, "outputs": outputs}
+
+    if verbose:
+        print(f"{len(values)} parameter sets in {time.perf_counter() - t0:.1f}s")
+        for metric in METRICS:
+            print(f"\n{metric}")
+            print(f"{'parameter':<32}{'S1':>9}{'ST':>9}")
+            for name in names:
+                print(f"{name:<32}{result[metric]['S1'][name]:>9.3f}{result[metric]['ST'][name]:>9.3f}")
+    return result
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+
+def config_hash(config, params_path="parameters.yaml"):
+    # Trials are keyed by the hyperparameters *and* the simulator configuration they ran against
+    h = hashlib.sha256()
+    h.update(json.dumps(config, sort_keys=True, default=str).encode())
+    with open(params_path, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+class TrialCache:
+    """One JSON file per (config hash, budget) under `cache_dir`, written atomically."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key, budget):
+        return os.path.join(self.cache_dir, f"{key}_b{budget}.json")
+
+    def get(self, key, budget):
+        try:
+            with open(self._path(key, budget), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key, budget, result):
+        path = self._path(key, budget)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp, path)
+
+
+def _run_trial(trial_fn, config, budget, workdir):
+    rewards = trial_fn(config, budget, workdir)
+    return [float(r) for r in rewards]
+
+
+class ASHASweep:
+    """
+    Asynchronous successive halving (ASHA) over a list of configs.
+
+    Budgets form rungs `min_budget * eta**k` up to `max_budget`. Whenever a
+    worker frees up, the best not-yet-promoted config of the highest rung
+    that has one in its top 1/eta is promoted to the next rung. Otherwise a
+    fresh config starts at rung 0. Weak configs therefore stop after a small
+    budget.
+
+    `trial_fn(config, budget, workdir)` must be a picklable top-level
+    function. It trains until `budget` (e.g. total timesteps) and returns
+    the episode rewards observed up to that budget, never beyond it, so all
+    trials of a rung are compared on equal budgets. `workdir` is stable per config, so
+    a trial can save a checkpoint there and resume on promotion instead of
+    retraining from scratch.
+    Scores are the mean of the last `score_window` episode rewards.
+
+    Finished (config, budget) results are cached on disk, keyed by the
+    config and the contents of `parameters.yaml`, so re-running a sweep
+    only trains what is missing.
+    """
+
+    def __init__(
+        self,
+        trial_fn,
+        configs,
+        min_budget,
+        max_budget,
+        eta=3,
+        n_workers=None,
+        cache_dir="sweep_cache",
+        params_path="parameters.yaml",
+        score_window=10,
+        verbose=True
+    ):
+        self.trial_fn = trial_fn
+        self.configs = list(configs)
+        self.eta = eta
+        self.n_workers = n_workers or os.cpu_count()
+        self.cache = TrialCache(cache_dir)
+        self.score_window = score_window
+        self.verbose = verbose
+
+        n_rungs = int(math.floor(math.log(max_budget / min_budget, eta) + 1e-9)) + 1
+        self.budgets = [int(min_budget * eta**k) for k in range(n_rungs)]
+        self.budgets[-1] = max_budget
+        self.keys = [config_hash(c, params_path) for c in self.configs]
+        self.workdirs = [os.path.join(cache_dir, "work", key) for key in self.keys]
+
+        self.rung_scores = [dict() for _ in self.budgets]   # rung -> {config index: score}
+        self.promoted = [set() for _ in self.budgets]
+        self.rewards = {}                                   # (config index, rung) -> episode rewards
+
+    def score(self, rewards):
+        if len(rewards) == 0:
+            return -np.inf
+        return float(np.mean(rewards[-self.score_window:]))
+
+    def _next_job(self, pending, started):
+        for rung in reversed(range(len(self.budgets) - 1)):
+            scores = self.rung_scores[rung]
+            n_keep = len(scores) // self.eta
+            if n_keep == 0:
+                continue
+            ranked = sorted(scores, key=scores.get, reverse=True)[:n_keep]
+            for idx in ranked:
+                if idx not in self.promoted[rung] and (idx, rung + 1) not in pending:
+                    self.promoted[rung].add(idx)
+                    return idx, rung + 1
+        if started < len(self.configs):
+            return started, 0
+        return None
+
+    def _record(self, idx, rung, rewards, cached=False):
+        self.rewards[(idx, rung)] = rewards
+        self.rung_scores[rung][idx] = self.score(rewards)
+        if self.verbose:
+            tag = " (cached)" if cached else ""
+            print(f"[rung {rung} | budget {self.budgets[rung]}] config {idx}: "
+                  f"score = {self.rung_scores[rung][idx]:.2f}{tag}")
+
+    def run(self):
+        pending = {}
+        started = 0
+        with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+            while True:
+                while len(pending) < self.n_workers:
+                    job = self._next_job(pending.values(), started)
+                    if job is None:
+                        break
+                    idx, rung = job
+                    if rung == 0:
+                        started += 1
+                    budget = self.budgets[rung]
+                    cached = self.cache.get(self.keys[idx], budget)
+                    if cached is not None:
+                        self._record(idx, rung, cached["rewards"], cached=True)
+                        continue
+                    os.makedirs(self.workdirs[idx], exist_ok=True)
+                    future = pool.submit(_run_trial, self.trial_fn, self.configs[idx], budget, self.workdirs[idx])
+                    pending[future] = (idx, rung)
+
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx, rung = pending.pop(future)
+                    rewards = future.result()
+                    budget = self.budgets[rung]
+                    self.cache.put(self.keys[idx], budget, {
+                        "config": self.configs[idx], "budget": budget, "rewards": rewards
+                    })
+                    self._record(idx, rung, rewards)
+
+        return self.results()
+
+    def results(self):
+        # Best rung reached per config, sorted best first
+        out = []
+        for idx, config in enumerate(self.configs):
+            rungs = [r for r in range(len(self.budgets)) if idx in self.rung_scores[r]]
+            if not rungs:
+                continue
+            top = max(rungs)
+            out.append({
+                "config": config,
+                "budget": self.budgets[top],
+                "rung": top,
+                "score": self.rung_scores[top][idx],
+                "rewards": self.rewards[(idx, top)],
+            })
+        out.sort(key=lambda r: (r["rung"], r["score"]), reverse=True)
+        return out
+
+
+def sb3_trial(config, budget, workdir):
+    """
+    Train a Stable-Baselines3 agent on AquacultureEnv up to `budget` total timesteps.
+
+    `config` holds "algo" ("TD3", "SAC" or "DQN"), optional "region" and the
+    remaining keyword arguments for the algorithm constructor. The model and
+    its reward history are checkpointed in `workdir`, so a promoted trial
+    resumes from where its previous rung stopped. The history records the
+    timestep each episode ended at, and only episodes that ended within
+    `budget` are returned. A checkpoint already trained past `budget` (e.g.
+    by an earlier sweep with other rungs) is therefore scored on the same
+    budget as every other trial.
+    """
+    import stable_baselines3
+    from stable_baselines3.common.monitor import Monitor
+    from envs.aquaculture_env import AquacultureEnv
+    from envs.dqn_discrete_env import DiscretizedAquacultureEnv
+    from utils.plot_callback import PlotCallback
+
+    config = dict(config)
+    algo_name = config.pop("algo")
+    region = config.pop("region", "guangdong")
+    algo = getattr(stable_baselines3, algo_name)
+    env_cls = DiscretizedAquacultureEnv if algo_name == "DQN" else AquacultureEnv
+    env = Monitor(env_cls(region=region))
+
+    model_path = os.path.join(workdir, "model.zip")
+    history_path = os.path.join(workdir, "rewards.json")
+    history = None
+    if os.path.exists(model_path) and os.path.exists(history_path):
+        with open(history_path, "r") as f:
+            history = json.load(f)
+        if not isinstance(history, dict):
+            history = None  # older checkpoint without episode end timesteps; retrain
+    if history is not None:
+        model = algo.load(model_path, env=env)
+    else:
+        model = algo("MlpPolicy", env, verbose=0, **config)
+        history = {"rewards": [], "timesteps": []}
+
+    remaining = budget - model.num_timesteps
+    if remaining > 0:
+        callback = PlotCallback(save_path=os.path.join(workdir, f"rewards_b{budget}.png"),
+                                title=f"{algo_name} | budget {budget}")
+        start = model.num_timesteps
+        model.learn(total_timesteps=remaining, callback=callback, reset_num_timesteps=False)
+        ends = start + np.cumsum(env.get_episode_lengths())
+        history["rewards"].extend(float(r) for r in env.get_episode_rewards())
+        history["timesteps"].extend(int(t) for t in ends)
+
+        model.save(model_path)
+        with open(history_path, "w") as f:
+            json.dump(history, f)
+    env.close()
+    return [r for r, t in zip(history["rewards"], history["timesteps"]) if t <= budget]